@@ -28,7 +28,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY")
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = os.getenv("DJANGO_DEBUG") == "True"
 
 ALLOWED_HOSTS = ["minicrmdjangoold-production.up.railway.app"]
 
@@ -52,6 +52,7 @@ INSTALLED_APPS = [
     "django_extensions",
     "django_browser_reload",
     "silk",
+    "rest_framework",
     "data_browser",
     "corsheaders",
     "widget_tweaks",
@@ -64,7 +65,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "servestatic.middleware.ServeStaticMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -73,9 +74,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "debug_toolbar.middleware.DebugToolbarMiddleware",
     "django_browser_reload.middleware.BrowserReloadMiddleware",
-    "silk.middleware.SilkyMiddleware",
 ]
 
+# The middleware are all async capable, so the async views run on the event loop.
+# silk's isn't, it would run every request in a thread, so it only profiles in debug.
+if DEBUG:
+    MIDDLEWARE.append("silk.middleware.SilkyMiddleware")
+
 ROOT_URLCONF = "base.urls"
 
 TEMPLATES = [
@@ -102,6 +107,23 @@ WSGI_APPLICATION = "base.wsgi.application"
 DATABASES = {"default": dj_database_url.config()}
 
 
+# Cache
+# default is per process, for entries that may be stale for their timeout.
+# shared is read by the web and worker processes, for entries cleared on write,
+# so a worker's imports and purges clear what the web process serves.
+# Its table is created by createcachetable.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -176,3 +198,60 @@ INTERNAL_IPS = ["127.0.0.1"]
 
 # Django extension settings
 SHELL_PLUS = "ipython"
+
+# Prospects import
+# Number of rows read and upserted together while importing
+PROSPECTS_IMPORT_CHUNK_SIZE = 1000
+# Number of distinct addresses kept in the address normalization cache
+ADDRESS_NORMALIZATION_CACHE_SIZE = 50_000
+# Processes normalizing addresses and website URLs while importing, 1 to disable the pool
+PROSPECTS_IMPORT_WORKERS = int(os.getenv("PROSPECTS_IMPORT_WORKERS", 1))
+# Minutes without progress after which a running import job's worker is taken as dead
+IMPORT_JOB_STALE_MINUTES = 15
+
+# Seconds a prospect found by caller ID lookup stays cached
+PHONE_LOOKUP_CACHE_TIMEOUT = 30
+
+# Prospects list
+# Seconds the number of prospects matching the list filters stays cached
+PROSPECTS_COUNT_CACHE_TIMEOUT = 60
+# Seconds the prospects page header counters stay cached, writes also clear them
+DASHBOARD_STATS_CACHE_TIMEOUT = 300
+# Seconds the prospects found by a search query stay cached
+PROSPECT_SEARCH_CACHE_TIMEOUT = 30
+# Seconds a rendered prospect card stays cached, keyed by the prospect's last update
+PROSPECT_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Dialer
+# Local hours, start included and end excluded, prospects are called on weekdays
+DIALER_CALLING_HOURS = (9, 17)
+# Minutes a prospect stays claimed by the caller the dialer handed it to
+DIALER_CLAIM_MINUTES = 15
+
+# Call records
+# Call records fetched per round trip of the server-side cursor while exporting
+CALL_RECORDS_EXPORT_CHUNK_SIZE = 2000
+
+# Prospects export
+# Prospects fetched per round trip of the server-side cursor, and rows per parquet row group
+PROSPECTS_EXPORT_CHUNK_SIZE = 5000
+# Bytes read per block when streaming xlsx and parquet exports from their temporary file
+PROSPECTS_EXPORT_FILE_BLOCK_SIZE = 64 * 1024
+
+# Purge jobs
+# Minutes without progress after which a running purge job's worker is taken as dead
+PURGE_JOB_STALE_MINUTES = 15
+
+# Call analytics
+# Days of call rollups recomputed per transaction by refresh_call_rollups
+CALL_ROLLUP_DAYS_PER_BATCH = 31
+# Seconds the rollup watermark lags the refresh, to count calls committed meanwhile
+CALL_ROLLUP_WATERMARK_OVERLAP_SECONDS = 300
+
+# REST API
+REST_FRAMEWORK = {
+    "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+}
+# Rows per page of the API, clients can ask for up to API_MAX_PAGE_SIZE
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
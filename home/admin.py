@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.html import format_html
 
-from .models import ColdCallRecord, Prospect
+from . import services
+from .models import ColdCallRecord, ImportJob, ImportRun, Prospect, PurgeJob
 
 
 # Register your models here.
@@ -12,6 +15,7 @@ class ColdCallRecordAdmin(admin.ModelAdmin):
         for field in ColdCallRecord._meta.fields
         if field.name not in ["created_at", "updated_at"]
     ]
+    list_select_related = ["prospect"]
 
 
 class ColdCallRecordInline(admin.StackedInline):
@@ -28,11 +32,132 @@ class ProspectAdmin(admin.ModelAdmin):
         "phone_number",
         "display_website_url",
         "has_been_called",
+        "calls_count",
+        "last_called_at",
     ]
-    search_fields = ["business_name"]
+    search_fields = services.PROSPECT_SEARCH_FIELDS
+    search_help_text = "Business name, city, industry, address or phone number"
+    list_filter = ["existence_status"]
     inlines = [ColdCallRecordInline]
+    actions = ["mark_exists", "mark_does_not_exist", "mark_unknown"]
+
+    def get_queryset(self, request):
+        # annotated so `has_been_called` doesn't query for every row
+        return services.prospects_with_call_status(super().get_queryset(request))
+
+    def get_search_results(self, request, queryset, search_term):
+        # the prospect search's conditions, every one served by a trigram
+        # index, phone numbers are matched in phone_e164
+        for word in search_term.split():
+            queryset = queryset.filter(services.prospect_search_condition(word))
+        return queryset, False
+
+    def set_existence_status(self, request, queryset, existence_status: str):
+        updated = services.set_existence_status(queryset, existence_status)
+        self.message_user(request, f"Prospects updated: {updated}")
+
+    @admin.action(description="Mark selected prospects as existing")
+    def mark_exists(self, request, queryset):
+        self.set_existence_status(request, queryset, Prospect.ExistenceChoices.EXISTS)
+
+    @admin.action(description="Mark selected prospects as not existing")
+    def mark_does_not_exist(self, request, queryset):
+        self.set_existence_status(
+            request, queryset, Prospect.ExistenceChoices.DOES_NOT_EXIST
+        )
+
+    @admin.action(description="Mark selected prospects as unknown")
+    def mark_unknown(self, request, queryset):
+        self.set_existence_status(request, queryset, Prospect.ExistenceChoices.UNKNOWN)
 
     def display_website_url(self, obj: Prospect):
         return format_html(
             "<a href='{url}' target='_blank'>{url}</a>", url=obj.website_url
         )
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "file",
+        "industry",
+        "status",
+        "rows_read",
+        "rows_inserted",
+        "rows_updated",
+        "rows_unchanged",
+        "rows_skipped",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["status"]
+
+
+@admin.register(ImportRun)
+class ImportRunAdmin(admin.ModelAdmin):
+    list_display = [
+        "created_at",
+        "source",
+        "file_name",
+        "industry",
+        "rows_read",
+        "display_rows_per_second",
+        "total_seconds",
+        "validation_seconds",
+        "read_seconds",
+        "dedup_seconds",
+        "normalization_seconds",
+        "write_seconds",
+        "error",
+    ]
+    list_filter = ["source", "industry"]
+    ordering = ["-created_at"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description="rows/sec")
+    def display_rows_per_second(self, obj: ImportRun):
+        if obj.rows_per_second is None:
+            return None
+        return round(obj.rows_per_second)
+
+
+@admin.register(PurgeJob)
+class PurgeJobAdmin(admin.ModelAdmin):
+    list_display = [
+        "target",
+        "archive",
+        "status",
+        "stage",
+        "rows_deleted",
+        "rows_total",
+        "created_at",
+        "finished_at",
+    ]
+    list_filter = ["status", "target"]
+    readonly_fields = [
+        "status",
+        "stage",
+        "last_pk",
+        "rows_total",
+        "rows_deleted",
+        "error",
+        "started_at",
+        "finished_at",
+    ]
+    actions = ["resume"]
+
+    @admin.action(description="Resume selected failed or abandoned jobs")
+    def resume(self, request, queryset):
+        # running jobs are only resumed once their worker is taken as dead
+        abandoned = services.claimable_jobs(settings.PURGE_JOB_STALE_MINUTES) & Q(
+            status=PurgeJob.StatusChoices.RUNNING
+        )
+        resumed = queryset.filter(
+            Q(status=PurgeJob.StatusChoices.FAILED) | abandoned
+        ).update(status=PurgeJob.StatusChoices.PENDING)
+        self.message_user(request, f"Purge jobs resumed: {resumed}")
@@ -0,0 +1,134 @@
+import hashlib
+
+from django.conf import settings
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.routers import DefaultRouter
+
+from . import filters, services
+from .models import ColdCallRecord, Prospect
+from .serializers import ColdCallRecordSerializer, ProspectSerializer, requested_fields
+
+
+class ProspectsPagination(CursorPagination):
+    ordering = "pk"
+    page_size = settings.API_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class CallRecordsPagination(ProspectsPagination):
+    # newest calls first
+    ordering = "-pk"
+
+
+def make_etag(request, *versions) -> str:
+    """
+    Returns a quoted ETag of the response to the request, for the given
+    versions of the data it returns.
+    """
+    parts = [request.get_full_path(), request.accepted_renderer.format, *versions]
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+class ConditionalGetMixin:
+    """
+    Answers GETs with `304 Not Modified` when the `If-None-Match` header
+    has the ETag of the rows the response would return.
+
+    The ETag of a list is built from the primary keys and `updated_at` of
+    the rows of the page, so the rows are only serialized when one of them
+    was saved, added or deleted since the client's copy. Versioning the
+    whole filtered queryset would scan every row for every cursor page.
+    """
+
+    def not_modified(self, request, etag: str) -> Response | None:
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match and etag in parse_etags(if_none_match):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        return None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        etag = make_etag(
+            request,
+            [(row.pk, row.updated_at) for row in page],
+            # the neighbour page links
+            self.paginator.has_next,
+            self.paginator.has_previous,
+        )
+        response = self.not_modified(request, etag)
+        if response is None:
+            serializer = self.get_serializer(page, many=True)
+            response = self.get_paginated_response(serializer.data)
+            response["ETag"] = etag
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = make_etag(request, instance.updated_at)
+        response = self.not_modified(request, etag)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+            response["ETag"] = etag
+        return response
+
+
+class SparseFieldsViewMixin:
+    """
+    Loads only the columns of the fields requested with the `fields` query
+    param, see `serializers.SparseFieldsMixin`, and `updated_at` the ETag
+    is built from.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        requested = requested_fields(self.request)
+        if requested is None:
+            return queryset
+        columns = {field.name for field in queryset.model._meta.concrete_fields}
+        return queryset.only("updated_at", *sorted(requested & columns))
+
+
+class ProspectViewSet(
+    SparseFieldsViewMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet
+):
+    """
+    Prospects with their call summary, filtered like the prospects list.
+
+    Pass `fields` with comma separated field names to get only those.
+    """
+
+    serializer_class = ProspectSerializer
+    pagination_class = ProspectsPagination
+    filterset_class = filters.ProspectsFilter
+
+    def get_queryset(self):
+        requested = requested_fields(self.request)
+        if requested is not None and "has_been_called" not in requested:
+            return Prospect.objects.all()
+        # annotated so `has_been_called` doesn't query for every prospect
+        return services.prospects_with_call_status()
+
+
+class ColdCallRecordViewSet(
+    SparseFieldsViewMixin, ConditionalGetMixin, viewsets.ReadOnlyModelViewSet
+):
+    """
+    Call records, filtered like the call records list.
+
+    Pass `fields` with comma separated field names to get only those.
+    """
+
+    queryset = ColdCallRecord.objects.all()
+    serializer_class = ColdCallRecordSerializer
+    pagination_class = CallRecordsPagination
+    filterset_class = filters.CallRecordsFilter
+
+
+router = DefaultRouter()
+router.register("prospects", ProspectViewSet, basename="api-prospect")
+router.register("call-records", ColdCallRecordViewSet, basename="api-call-record")
@@ -0,0 +1,236 @@
+import csv
+import random
+import resource
+import time
+import urllib.parse
+from contextlib import contextmanager
+from pathlib import Path
+
+import openpyxl
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from . import services
+from .models import Prospect
+from .normalization import normalize_address_ca, normalize_website_url
+
+CITIES = [
+    ("Toronto", "ON", "M5V"),
+    ("Ottawa", "ON", "K1P"),
+    ("Thunder Bay", "ON", "P7E"),
+    ("Montreal", "QC", "H2X"),
+    ("Saint-Jean-sur-Richelieu", "QC", "J3B"),
+    ("Halifax", "NS", "B3H"),
+    ("Winnipeg", "MB", "R3C"),
+    ("Regina", "SK", "S4P"),
+    ("Calgary", "AB", "T2P"),
+    ("Edmonton", "AB", "T5J"),
+    ("Vancouver", "BC", "V5T"),
+    ("Victoria", "BC", "V8W"),
+]
+STREETS = ["King St W", "Main St", "Portage Avenue", "Broadway", "Queen St E"]
+NAME_WORDS = ["Maple", "Northern", "Royal", "Golden", "Prairie", "Harbour", "Elm"]
+NAME_KINDS = ["Cafe", "Plumbing", "Dental", "Auto Repair", "Bakery", "Day Nursery"]
+CHAINS = ["Tim Hortons", "Canadian Tire", "Shoppers Drug Mart"]
+PHONE_FORMATS = ["{}-{}-{}", "({}) {}-{}", "{}.{}.{}", "1-{}-{}-{}"]
+
+STAGES = ["read", "dedup", "url_parse", "address_parse", "db_write"]
+
+
+def generate_yellow_pages_rows(count: int, seed: int = 0) -> list[dict]:
+    """
+    Generates rows shaped like a yellow pages CA export.
+
+    About 5% of the rows repeat an earlier phone number in another format,
+    8% have no address, 40% have no website and a third are chain locations
+    sharing a handful of addresses. Websites are yellow pages redirect links.
+
+    Args:
+        count (int): Number of rows.
+        seed (int): Random seed, the same seed generates the same rows.
+
+    Returns:
+        list[dict]: Rows keyed by yellow pages CA column names.
+    """
+    rng = random.Random(seed)
+    chain_addresses = [_random_address(rng) for _ in range(20)]
+    digits_list = []
+    rows = []
+    for index in range(count):
+        if digits_list and rng.random() < 0.05:
+            digits = rng.choice(digits_list)
+        else:
+            digits = (rng.randint(200, 999), rng.randint(200, 999), index % 10_000)
+            digits_list.append(digits)
+        area_code, exchange, line = digits
+        phone = rng.choice(PHONE_FORMATS).format(area_code, exchange, f"{line:04}")
+
+        if rng.random() < 1 / 3:
+            name = rng.choice(CHAINS)
+            address = rng.choice(chain_addresses)
+        else:
+            name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_KINDS)}"
+            address = _random_address(rng)
+        if rng.random() < 0.08:
+            address = None
+
+        website = None
+        if rng.random() < 0.6:
+            url = f"http://www.{name.lower().replace(' ', '')}{index}.ca/"
+            website = f"/gourl/{index:x}?redirect={urllib.parse.quote(url, safe='')}"
+
+        slug = name.replace(" ", "-")
+        rows.append(
+            {
+                "Name": name,
+                "Website": website,
+                "Phone": phone,
+                "Address": address,
+                "Link": f"https://www.yellowpages.ca/bus/{slug}/{100000 + index}.html",
+            }
+        )
+    return rows
+
+
+def _random_address(rng: random.Random) -> str:
+    city, province, postal_prefix = rng.choice(CITIES)
+    return (
+        f"{rng.randint(1, 9999)} {rng.choice(STREETS)}, {city}, "
+        f"{province} {postal_prefix} {rng.randint(1, 9)}A{rng.randint(1, 9)}"
+    )
+
+
+def write_yellow_pages_export(rows: list[dict], path: Path):
+    """
+    Writes rows to an xlsx or csv file, by the extension of the path.
+    """
+    if path.suffix == ".xlsx":
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(services.YELLOW_PAGES_CA_COLUMNS)
+        for row in rows:
+            sheet.append([row[column] for column in services.YELLOW_PAGES_CA_COLUMNS])
+        workbook.save(path)
+    else:
+        with path.open("w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=services.YELLOW_PAGES_CA_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def _reset_peak_rss():
+    # resets VmHWM on linux, elsewhere the peak keeps growing across stages
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # kilobytes on linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+@contextmanager
+def measure(results: dict, name: str):
+    """
+    Records the wall time and peak RSS of the block under `results[name]`.
+    """
+    _reset_peak_rss()
+    start = time.perf_counter()
+    yield
+    results[name] = {
+        "seconds": round(time.perf_counter() - start, 4),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def benchmark_import(path: Path, industry: str = "Benchmark") -> dict:
+    """
+    Benchmarks importing the export at the path, stage by stage and end to end.
+
+    Stages run one after another on all rows: read, dedup, website URL
+    parsing, address parsing and the database write. The end to end run
+    imports the file with `services.import_prospects_from_file`, which also
+    times its own stages. Database writes are rolled back after each run.
+
+    Args:
+        path (Path): Yellow pages CA export, xlsx or csv.
+        industry (str): Industry of the imported prospects.
+
+    Returns:
+        dict: Row counts and the seconds and peak RSS of every stage.
+    """
+    stages = {}
+    read_rows = services.IMPORT_FILE_READERS[path.suffix.removeprefix(".")]
+
+    with path.open("rb") as file, transaction.atomic():
+        with measure(stages, "read"):
+            rows = list(
+                read_rows(
+                    File(file, name=path.name),
+                    required_columns=services.YELLOW_PAGES_CA_COLUMNS,
+                )
+            )
+        with measure(stages, "dedup"):
+            unique_rows, phones_e164 = services.drop_duplicate_phones(rows, set())
+        with measure(stages, "url_parse"):
+            websites = [normalize_website_url(row["Website"]) for row in unique_rows]
+        normalize_address_ca.cache_clear()
+        with measure(stages, "address_parse"):
+            addresses = [
+                normalize_address_ca(row["Address"]) if row["Address"] else None
+                for row in unique_rows
+            ]
+        with measure(stages, "db_write"):
+            prospect_list = [
+                Prospect(
+                    business_name=row["Name"],
+                    phone_number=row["Phone"],
+                    phone_e164=phone_e164,
+                    street_address=row["Address"],
+                    yellow_pages_link=row["Link"],
+                    website_url=website,
+                    city=address.city if address else None,
+                    province=address.province if address else None,
+                    industry=industry,
+                )
+                for row, phone_e164, website, address in zip(
+                    unique_rows, phones_e164, websites, addresses
+                )
+            ]
+            chunk_size = settings.PROSPECTS_IMPORT_CHUNK_SIZE
+            for start in range(0, len(prospect_list), chunk_size):
+                services.upsert_prospects(prospect_list[start : start + chunk_size])
+        transaction.set_rollback(True)
+
+    del rows, unique_rows, prospect_list
+    end_to_end = {}
+    normalize_address_ca.cache_clear()
+    with path.open("rb") as file, transaction.atomic():
+        with measure(end_to_end, "import"):
+            result = services.import_prospects_from_file(
+                File(file, name=path.name), industry=industry
+            )
+        transaction.set_rollback(True)
+
+    return {
+        "file": path.name,
+        "file_size_bytes": path.stat().st_size,
+        "rows": result.rows_read,
+        "rows_imported": result.rows_inserted,
+        "stages": stages,
+        "end_to_end": end_to_end["import"],
+        "end_to_end_stage_seconds": {
+            stage: round(seconds, 4) for stage, seconds in result.stage_seconds.items()
+        },
+    }
@@ -1,8 +1,20 @@
-from dataclasses import dataclass
+import itertools
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
+import lxml.html
 
-from home.utils import parse_website_url
+from home.normalization import normalize_website_url
+
+YELLOW_PAGES_CA_URL = "https://www.yellowpages.ca"
+
+HTML_PAGE_SUFFIXES = [".html", ".htm"]
 
 
 @dataclass
@@ -10,43 +22,165 @@ class BusinessData:
     business_name: str
     phone_number: str
     website_url: str
+    street_address: str = ""
+    yellow_pages_link: str = ""
+
+    def to_yellow_pages_row(self) -> dict:
+        """
+        Converts the business data to a row keyed like the yellow pages CA
+        excel export, so it can be imported like exported rows.
+        """
+        return {
+            "Name": self.business_name,
+            "Phone": self.phone_number or None,
+            "Address": self.street_address or None,
+            "Website": self.website_url or None,
+            "Link": self.yellow_pages_link or None,
+        }
+
+
+def _has_class(class_name: str) -> str:
+    """
+    XPath predicate matching elements with the given CSS class.
+    """
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+def _text(elements: list) -> str:
+    """
+    Text of the first element with whitespace collapsed, empty if none.
+    """
+    return " ".join(elements[0].text_content().split()) if elements else ""
+
+
+def _extract_address(listing) -> str:
+    """
+    Builds the listing address in the "Street, City, PROV POSTAL" format
+    of the yellow pages CA excel export.
+    """
+    parts = {
+        itemprop: _text(listing.xpath(f".//*[@itemprop='{itemprop}']"))
+        for itemprop in [
+            "streetAddress",
+            "addressLocality",
+            "addressRegion",
+            "postalCode",
+        ]
+    }
+    region = " ".join(
+        part for part in [parts["addressRegion"], parts["postalCode"]] if part
+    )
+    return ", ".join(
+        part
+        for part in [parts["streetAddress"], parts["addressLocality"], region]
+        if part
+    )
 
 
 def extract_data(html: str) -> list[BusinessData]:
     """
     Extract business data from the given yellow pages canada page HTML.
 
+    The page is parsed with the C-backed lxml parser.
+
     Args:
         html (str): The HTML content to extract data from.
 
     Returns:
         list[BusinessData]: A list of BusinessData objects containing the extracted data.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    document = lxml.html.fromstring(html)
 
-    listings_all = soup.select(".listing_right_section")
+    listings_all = document.xpath(f"//*[{_has_class('listing_right_section')}]")
 
     data = []
     for listing in listings_all:
-        business_name = listing.select_one("a.listing__name--link").text
-        phone_number = listing.select_one("span[appcallback_target_phone]").text
-        website_button = listing.select_one("li.mlr__item--website")
-        if website_button is not None:
-            redirect_link = website_button.select_one("a").get("href")
-            website_url = parse_website_url(redirect_link)
-        else:
-            website_url = ""
+        name_links = listing.xpath(f".//a[{_has_class('listing__name--link')}]")
+        business_name = _text(name_links)
+        phone_number = _text(listing.xpath(".//span[@appcallback_target_phone]"))
+        website_links = listing.xpath(
+            f".//li[{_has_class('mlr__item--website')}]//a/@href"
+        )
+        website_url = (
+            normalize_website_url(website_links[0]) if website_links else None
+        ) or ""
+        listing_urls = listing.xpath(".//link[@itemprop='url']/@href") or [
+            link.get("href") for link in name_links
+        ]
+        yellow_pages_link = (
+            urljoin(YELLOW_PAGES_CA_URL, listing_urls[0]) if listing_urls else ""
+        )
 
         data.append(
             BusinessData(
                 business_name=business_name,
                 phone_number=phone_number,
                 website_url=website_url,
+                street_address=_extract_address(listing),
+                yellow_pages_link=yellow_pages_link,
             )
         )
     return data
 
 
+def read_html_pages(path: Path | BinaryIO) -> Iterator[str]:
+    """
+    Reads saved yellow pages CA pages from a directory or a zip archive.
+
+    Args:
+        path (Path | BinaryIO): Directory searched recursively, or zip
+            archive path or file, of .html and .htm files.
+
+    Yields:
+        str: The HTML of each page, one page in memory at a time.
+    """
+    if isinstance(path, Path) and path.is_dir():
+        for page_path in sorted(path.rglob("*")):
+            if page_path.suffix.lower() in HTML_PAGE_SUFFIXES:
+                yield page_path.read_text(errors="replace")
+        return
+
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            if Path(name).suffix.lower() in HTML_PAGE_SUFFIXES:
+                yield archive.read(name).decode(errors="replace")
+
+
+def extract_data_batch(
+    html_pages: Iterable[str], workers: int = 1, executor: Executor | None = None
+) -> Iterator[BusinessData]:
+    """
+    Extracts business data from many pages, in parallel across worker
+    processes when more than one worker is given.
+
+    Pages are handed to the workers a few at a time, so only a bounded
+    number of pages is held in memory however many pages there are.
+
+    Args:
+        html_pages (Iterable[str]): HTML of the yellow pages CA pages.
+        workers (int): Processes parsing pages.
+        executor (Executor | None): Pool of `workers` processes parsing the
+            pages instead of one started for them, e.g. shared with the
+            import normalizing the listings.
+
+    Yields:
+        BusinessData: Listings of every page, in page order.
+    """
+    if executor is None and workers <= 1:
+        for html in html_pages:
+            yield from extract_data(html)
+        return
+
+    with ExitStack() as stack:
+        if executor is None:
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+        for pages in itertools.batched(html_pages, workers * 4):
+            for data in executor.map(extract_data, pages):
+                yield from data
+
+
 if __name__ == "__main__":
-    d = extract_data()
-    print(d)
+    import sys
+
+    for business_data in extract_data_batch(read_html_pages(Path(sys.argv[1]))):
+        print(asdict(business_data))
@@ -0,0 +1,212 @@
+import csv
+import datetime as dt
+import itertools
+from collections.abc import AsyncIterator, Iterator
+from typing import BinaryIO
+
+import openpyxl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+
+from . import services
+
+PROSPECT_EXPORT_FIELDS = {
+    "id": "id",
+    "business_name": "business_name",
+    "industry": "industry",
+    "phone_number": "phone_number",
+    "phone_e164": "phone_e164",
+    "city": "city",
+    "province": "province",
+    "street_address": "street_address",
+    "website_url": "website_url",
+    "yellow_pages_link": "yellow_pages_link",
+    "existence_status": "existence_status",
+    "calls_count": "calls_count",
+    "last_called_at": "last_called_at",
+    "last_call_outcome": "last_call_outcome",
+    "called": "called",
+    "conversation": "conversation",
+}
+"""Columns of the prospects export and the fields or annotations they are read from"""
+
+PROSPECT_EXPORT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("business_name", pa.string()),
+        ("industry", pa.string()),
+        ("phone_number", pa.string()),
+        ("phone_e164", pa.string()),
+        ("city", pa.string()),
+        ("province", pa.string()),
+        ("street_address", pa.string()),
+        ("website_url", pa.string()),
+        ("yellow_pages_link", pa.string()),
+        ("existence_status", pa.string()),
+        ("calls_count", pa.int64()),
+        ("last_called_at", pa.timestamp("us", tz="UTC")),
+        ("last_call_outcome", pa.string()),
+        ("called", pa.bool_()),
+        ("conversation", pa.bool_()),
+    ]
+)
+"""Parquet types of the prospects export columns"""
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def prospects_export_queryset(prospects: QuerySet) -> QuerySet:
+    """
+    Returns the prospects annotated with the called and conversation
+    columns, not queried per prospect, in export order.
+    """
+    return services.prospects_with_call_status(prospects).order_by("pk")
+
+
+def iter_prospect_export_rows(prospects: QuerySet) -> Iterator[tuple]:
+    """
+    Streams the prospects as tuples of `PROSPECT_EXPORT_FIELDS` values.
+
+    Rows are read through a server-side cursor on databases supporting it,
+    `settings.PROSPECTS_EXPORT_CHUNK_SIZE` at a time.
+
+    Args:
+        prospects (QuerySet): Prospects to export.
+
+    Returns:
+        Iterator[tuple]: Row values in the order of the columns.
+    """
+    return (
+        prospects_export_queryset(prospects)
+        .values_list(*PROSPECT_EXPORT_FIELDS.values())
+        .iterator(chunk_size=settings.PROSPECTS_EXPORT_CHUNK_SIZE)
+    )
+
+
+def iter_prospects_csv(prospects: QuerySet) -> Iterator[str]:
+    """
+    Streams the prospects as CSV lines, header first.
+    """
+    writer = csv.writer(services.Echo())
+    yield writer.writerow(PROSPECT_EXPORT_FIELDS.keys())
+    for row in iter_prospect_export_rows(prospects):
+        yield writer.writerow(row)
+
+
+async def aiter_prospects_csv(prospects: QuerySet) -> AsyncIterator[str]:
+    """
+    Async version of `iter_prospects_csv`, for streaming responses.
+
+    Under ASGI a response iterating a sync generator is read into a list
+    before the first byte is sent, an async iterator is sent chunk by chunk.
+    """
+    writer = csv.writer(services.Echo())
+    yield writer.writerow(PROSPECT_EXPORT_FIELDS.keys())
+    fields = list(PROSPECT_EXPORT_FIELDS.values())
+    # values(), the aiterator() of values_list() runs its query in the event loop
+    rows = (
+        prospects_export_queryset(prospects)
+        .values(*fields)
+        .aiterator(chunk_size=settings.PROSPECTS_EXPORT_CHUNK_SIZE)
+    )
+    async for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+async def aiter_file(file: BinaryIO, block_size: int) -> AsyncIterator[bytes]:
+    """
+    Streams a file in blocks and closes it, for streaming responses of
+    files written to disk first.
+
+    Args:
+        file (BinaryIO): File positioned at the start of the content.
+        block_size (int): Bytes read per block.
+    """
+    try:
+        while block := await sync_to_async(file.read)(block_size):
+            yield block
+    finally:
+        await sync_to_async(file.close)()
+
+
+def write_prospects_xlsx(prospects: QuerySet, file: BinaryIO):
+    """
+    Writes the prospects to an xlsx file.
+
+    The workbook is in write-only mode, rows are flushed to disk as they
+    are appended instead of being kept in memory.
+
+    Args:
+        prospects (QuerySet): Prospects to export.
+        file (BinaryIO): File to write to.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("prospects")
+    sheet.append(list(PROSPECT_EXPORT_FIELDS))
+    for row in iter_prospect_export_rows(prospects):
+        # excel has no time zones, times are written in UTC
+        sheet.append(
+            [
+                (
+                    value.astimezone(dt.UTC).replace(tzinfo=None)
+                    if isinstance(value, dt.datetime)
+                    else value
+                )
+                for value in row
+            ]
+        )
+    workbook.save(file)
+
+
+def write_prospects_parquet(prospects: QuerySet, file: BinaryIO):
+    """
+    Writes the prospects to a parquet file, one row group per
+    `settings.PROSPECTS_EXPORT_CHUNK_SIZE` rows.
+
+    Args:
+        prospects (QuerySet): Prospects to export.
+        file (BinaryIO): File to write to.
+    """
+    rows = iter_prospect_export_rows(prospects)
+    with pq.ParquetWriter(file, PROSPECT_EXPORT_SCHEMA) as writer:
+        while chunk := list(
+            itertools.islice(rows, settings.PROSPECTS_EXPORT_CHUNK_SIZE)
+        ):
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*chunk), PROSPECT_EXPORT_SCHEMA)
+            ]
+            writer.write_table(
+                pa.Table.from_arrays(arrays, schema=PROSPECT_EXPORT_SCHEMA)
+            )
+
+
+def write_prospects(prospects: QuerySet, file_type: str, file: BinaryIO):
+    """
+    Writes the prospects to a csv, xlsx or parquet file.
+
+    Args:
+        prospects (QuerySet): Prospects to export.
+        file_type (str): "csv", "xlsx" or "parquet".
+        file (BinaryIO): File to write to.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    match file_type:
+        case "csv":
+            for line in iter_prospects_csv(prospects):
+                file.write(line.encode())
+        case "xlsx":
+            write_prospects_xlsx(prospects, file)
+        case "parquet":
+            write_prospects_parquet(prospects, file)
+        case _:
+            raise ValueError(f"Not a csv, xlsx or parquet export: {file_type}")
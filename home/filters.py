@@ -4,11 +4,33 @@ from . import models
 
 
 class ProspectsFilter(django_filters.FilterSet):
-    called = django_filters.BooleanFilter(field_name="called", label="Called")
+    called = django_filters.BooleanFilter(method="filter_called", label="Called")
     conversation = django_filters.BooleanFilter(
-        field_name="conversation", label="Conversation"
+        field_name="had_conversation", label="Conversation"
     )
 
     class Meta:
         model = models.Prospect
         fields = ["province"]
+
+    def filter_called(self, queryset, name, value):
+        if value:
+            return queryset.filter(calls_count__gt=0)
+        return queryset.filter(calls_count=0)
+
+
+class CallRecordsFilter(django_filters.FilterSet):
+    date = django_filters.DateFromToRangeFilter(label="Date")
+    my_area_code_city = django_filters.CharFilter(label="Area code city")
+
+    class Meta:
+        model = models.ColdCallRecord
+        fields = ["date", "outcome", "pick_up_status", "my_area_code_city"]
+
+
+class CallRollupsFilter(django_filters.FilterSet):
+    day = django_filters.DateFromToRangeFilter(label="Date")
+
+    class Meta:
+        model = models.CallDailyRollup
+        fields = ["day"]
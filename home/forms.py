@@ -5,29 +5,30 @@ from . import services
 from .models import ColdCallRecord, Prospect
 
 
-class ImportXlsxForm(forms.ModelForm):
+class ImportProspectsForm(forms.ModelForm):
     """
-    Form for uploading a excel file.
+    Form for uploading a yellow pages CA export as xlsx, csv or parquet file.
     """
 
-    excel_file = forms.FileField()
+    file = forms.FileField(
+        widget=forms.ClearableFileInput(attrs={"accept": ".xlsx,.csv,.parquet"})
+    )
 
     class Meta:
         model = Prospect
-        fields = ["excel_file", "industry"]
+        fields = ["file", "industry"]
 
-    def clean_excel_file(self):
-        excel_file = self.cleaned_data.get("excel_file")
-        if not services.is_xlsx(excel_file):
-            raise ValidationError("Must be an excel file")
+    def clean_file(self):
+        # columns are validated by the import worker, reading the file
+        # here would make the upload as slow as the file is big
+        file = self.cleaned_data.get("file")
+        if services.get_import_file_type(file) is None:
+            raise ValidationError("Must be an xlsx, csv or parquet file")
 
-        if not services.validate_yellow_pages_ca_excel_columns(excel_file=excel_file):
-            raise ValidationError("Columns are not correct")
+        return file
 
-        return excel_file
 
-
-class YellowPagesCaHtmlForm(forms.Form):
+class YellowPagesCaHtmlForm(forms.ModelForm):
     """
     For for pasting yellow pages canada page to import
     prospects data
@@ -35,6 +36,10 @@ class YellowPagesCaHtmlForm(forms.Form):
 
     html = forms.CharField(widget=forms.Textarea)
 
+    class Meta:
+        model = Prospect
+        fields = ["html", "industry"]
+
 
 class CallRecordForm(forms.ModelForm):
     """
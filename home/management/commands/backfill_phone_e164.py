@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from home import services
+
+
+class Command(BaseCommand):
+    help = "Fills the E.164 phone number of prospects saved before it existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        filled_count, duplicate_count = services.backfill_phone_e164(
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            f"{filled_count} prospects filled, "
+            f"{duplicate_count} duplicate phone numbers left empty"
+        )
@@ -0,0 +1,72 @@
+import datetime as dt
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from home import benchmark
+
+
+class Command(BaseCommand):
+    help = "Benchmarks prospects imports of synthetic yellow pages CA exports"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1_000, 10_000, 100_000, 500_000],
+            help="Rows of the generated exports",
+        )
+        parser.add_argument(
+            "--file-types", nargs="+", choices=["xlsx", "csv"], default=["xlsx", "csv"]
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", type=Path, default=Path("import_benchmark.json")
+        )
+
+    def handle(self, *args, **options):
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            for size in options["sizes"]:
+                rows = benchmark.generate_yellow_pages_rows(size, seed=options["seed"])
+                for file_type in options["file_types"]:
+                    path = Path(directory) / f"yellow_pages_{size}.{file_type}"
+                    benchmark.write_yellow_pages_export(rows, path)
+                    result = benchmark.benchmark_import(path)
+                    results.append(result)
+                    self.stdout.write(self.format_result(result))
+
+        report = {
+            "commit": self.get_commit(),
+            "created_at": dt.datetime.now(dt.UTC).isoformat(),
+            "database": connection.vendor,
+            "results": results,
+        }
+        options["output"].write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"Results written to {options['output']}")
+
+    @staticmethod
+    def format_result(result: dict) -> str:
+        stages = ", ".join(
+            f"{stage} {timing['seconds']}s/{timing['peak_rss_mb']}MB"
+            for stage, timing in result["stages"].items()
+        )
+        end_to_end = result["end_to_end"]
+        return (
+            f"{result['file']}: {stages} | end to end "
+            f"{end_to_end['seconds']}s/{end_to_end['peak_rss_mb']}MB"
+        )
+
+    @staticmethod
+    def get_commit() -> str | None:
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
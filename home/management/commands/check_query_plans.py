@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from home import query_plans
+
+
+class Command(BaseCommand):
+    help = (
+        "Explains the hot query shapes of the views and fails if any of them "
+        "reads a table with a sequential scan"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Prospects to create before explaining, rolled back afterwards",
+        )
+        parser.add_argument("--verbose-plans", action="store_true")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options["seed"]:
+                query_plans.seed_query_plan_data(options["seed"])
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "ANALYZE home_prospect, home_coldcallrecord, home_calldailyrollup"
+                    )
+                    # a seq scan is then only planned when no index can be used,
+                    # not because the seeded tables are small
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            failures = []
+            for name, queryset in query_plans.hot_query_shapes().items():
+                plan = queryset.explain()
+                tables = query_plans.find_sequential_scans(plan)
+                if tables:
+                    failures.append(name)
+                    self.stdout.write(
+                        self.style.ERROR(f"{name}: sequential scan of {tables}")
+                    )
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"{name}: index"))
+                if tables or options["verbose_plans"]:
+                    self.stdout.write(plan)
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Sequential scans in: {', '.join(failures)}")
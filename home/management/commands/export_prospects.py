@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from home import exports, filters
+from home.models import Prospect
+
+
+class Command(BaseCommand):
+    help = (
+        "Exports prospects to a csv, xlsx or parquet file, by the extension "
+        "of the output path, streaming them so memory use stays flat"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", type=Path)
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="NAME=VALUE",
+            help="Filter of the prospects list, e.g. province=ON or called=false",
+        )
+
+    def handle(self, *args, **options):
+        output = options["output"]
+        file_type = output.suffix.removeprefix(".")
+        if file_type not in exports.EXPORT_CONTENT_TYPES:
+            raise CommandError("Output must be a .csv, .xlsx or .parquet file")
+
+        data = QueryDict(mutable=True)
+        for filter_option in options["filter"]:
+            name, _, value = filter_option.partition("=")
+            data.appendlist(name, value)
+        prospects_filter = filters.ProspectsFilter(
+            data, queryset=Prospect.objects.all()
+        )
+        if not prospects_filter.is_valid():
+            raise CommandError(prospects_filter.errors.as_text())
+
+        with output.open("wb") as file:
+            exports.write_prospects(prospects_filter.qs, file_type, file)
+        self.stdout.write(f"Prospects exported to {output}")
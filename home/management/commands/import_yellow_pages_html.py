@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from home import services
+from home.business_data_extractor.extractor import read_html_pages
+
+
+class Command(BaseCommand):
+    help = "Imports prospects from a directory or zip archive of saved yellow pages CA pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path)
+        parser.add_argument("--industry", required=True)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Processes parsing pages, defaults to PROSPECTS_IMPORT_WORKERS",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not path.exists():
+            raise CommandError(f"{path} doesn't exist")
+
+        result = services.import_prospects_from_html(
+            read_html_pages(path),
+            industry=options["industry"],
+            workers=options["workers"],
+        )
+        self.stdout.write(
+            f"{result.rows_read} listings read, {result.rows_inserted} inserted, "
+            f"{result.rows_updated} updated, {result.rows_unchanged} unchanged, "
+            f"{result.rows_skipped} skipped"
+        )
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from home import services
+
+
+class Command(BaseCommand):
+    help = "Imports uploaded prospect files queued as import jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit when no job is pending instead of polling for new ones",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2,
+            help="Seconds to wait before polling again when no job is pending",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            job = services.claim_next_import_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            self.stdout.write(f"Importing {job.file.name}")
+            services.run_import_job(job)
+            job.refresh_from_db()
+            self.stdout.write(
+                f"{job.status}: {job.rows_read} read, {job.rows_inserted} inserted, "
+                f"{job.rows_updated} updated, {job.rows_unchanged} unchanged, "
+                f"{job.rows_skipped} skipped"
+            )
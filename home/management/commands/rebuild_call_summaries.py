@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from home import services
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the call summary columns of prospects from their call records"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated_count = services.rebuild_call_summaries(
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(f"{updated_count} prospects rebuilt")
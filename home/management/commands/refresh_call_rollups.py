@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from home import services
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the daily call rollups of the analytics page for the calls "
+        "written since the last refresh"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true", help="Rebuild the rollups of every day"
+        )
+
+    def handle(self, *args, **options):
+        days_count = services.refresh_call_rollups(full=options["full"])
+        self.stdout.write(f"{days_count} days refreshed")
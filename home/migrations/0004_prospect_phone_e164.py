@@ -0,0 +1,56 @@
+# Generated by Django 5.1.15 on 2026-10-17 03:20
+
+from django.db import migrations, models
+
+from home.normalization import normalize_phone_ca
+
+BATCH_SIZE = 1000
+
+
+def fill_phones_e164(apps, schema_editor):
+    """
+    Fills the E.164 phone number of existing prospects, one `bulk_update`
+    per batch, like `services.backfill_phone_e164`. A prospect whose E.164
+    phone number is taken by an earlier prospect is left without one.
+    """
+    Prospect = apps.get_model("home", "Prospect")
+
+    taken_phones = set()
+    last_pk = 0
+    while True:
+        prospects = list(
+            Prospect.objects.filter(pk__gt=last_pk, phone_number__isnull=False)
+            .order_by("pk")
+            .only("pk", "phone_number")[:BATCH_SIZE]
+        )
+        if not prospects:
+            return
+        last_pk = prospects[-1].pk
+
+        filled = []
+        for prospect in prospects:
+            phone_e164 = normalize_phone_ca(prospect.phone_number)
+            if phone_e164 is None or phone_e164 in taken_phones:
+                continue
+            taken_phones.add(phone_e164)
+            prospect.phone_e164 = phone_e164
+            filled.append(prospect)
+        Prospect.objects.bulk_update(filled, fields=["phone_e164"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0003_importjob_rows_unchanged_prospect_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="prospect",
+            name="phone_e164",
+            field=models.CharField(
+                blank=True, editable=False, max_length=16, null=True, unique=True
+            ),
+        ),
+        migrations.RunPython(fill_phones_e164, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-17 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0004_prospect_phone_e164"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=20)),
+                ("file_name", models.CharField(blank=True, max_length=255)),
+                ("file_size", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("industry", models.CharField(max_length=100)),
+                ("rows_read", models.PositiveIntegerField(default=0)),
+                ("rows_inserted", models.PositiveIntegerField(default=0)),
+                ("rows_updated", models.PositiveIntegerField(default=0)),
+                ("rows_unchanged", models.PositiveIntegerField(default=0)),
+                ("rows_skipped", models.PositiveIntegerField(default=0)),
+                ("validation_seconds", models.FloatField(default=0)),
+                ("read_seconds", models.FloatField(default=0)),
+                ("dedup_seconds", models.FloatField(default=0)),
+                ("normalization_seconds", models.FloatField(default=0)),
+                ("write_seconds", models.FloatField(default=0)),
+                ("total_seconds", models.FloatField(default=0)),
+                ("error", models.TextField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.15 on 2026-10-17 03:27
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, F, Max, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def fill_call_summaries(apps, schema_editor):
+    """
+    Fills the call summary of existing prospects from their call records,
+    one UPDATE per primary key range, like `services.rebuild_call_summaries`.
+    """
+    Prospect = apps.get_model("home", "Prospect")
+    ColdCallRecord = apps.get_model("home", "ColdCallRecord")
+
+    records = ColdCallRecord.objects.filter(prospect_id=OuterRef("pk"))
+    latest = records.order_by(F("date").desc(nulls_last=True), "-pk")
+    pk_range = Prospect.objects.aggregate(min_pk=Min("pk"), max_pk=Max("pk"))
+    if pk_range["min_pk"] is None:
+        return
+    for start in range(pk_range["min_pk"], pk_range["max_pk"] + 1, BATCH_SIZE):
+        Prospect.objects.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(
+            calls_count=Coalesce(
+                Subquery(
+                    records.order_by()
+                    .values("prospect_id")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            ),
+            last_called_at=Subquery(latest.values("date")[:1]),
+            last_call_outcome=Subquery(latest.values("outcome")[:1]),
+            had_conversation=Exists(records.filter(had_owner_conversation=True)),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0005_importrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="prospect",
+            name="calls_count",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="prospect",
+            name="had_conversation",
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="prospect",
+            name="last_call_outcome",
+            field=models.CharField(
+                blank=True, editable=False, max_length=255, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="prospect",
+            name="last_called_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(fill_call_summaries, migrations.RunPython.noop),
+    ]
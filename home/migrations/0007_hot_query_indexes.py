@@ -0,0 +1,84 @@
+# Generated by Django 5.1.15 on 2026-10-17 03:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0006_prospect_call_summary"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="prospect",
+            name="calls_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="prospect",
+            name="had_conversation",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="coldcallrecord",
+            index=models.Index(
+                fields=["prospect", "had_owner_conversation"],
+                name="home_coldca_prospec_2a88bf_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="coldcallrecord",
+            index=models.Index(
+                fields=["prospect", "date"], name="home_coldca_prospec_a8c44b_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="coldcallrecord",
+            index=models.Index(fields=["date"], name="home_coldca_date_e6c063_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="coldcallrecord",
+            index=models.Index(
+                fields=["outcome"], name="home_coldca_outcome_82bdf1_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="prospect",
+            index=models.Index(
+                fields=["province", "id"], name="home_prospe_provinc_f54fb8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="prospect",
+            index=models.Index(
+                fields=["industry", "id"], name="home_prospe_industr_d23241_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="prospect",
+            index=models.Index(
+                fields=["city", "id"], name="home_prospe_city_9c8a21_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="prospect",
+            index=models.Index(
+                fields=["existence_status", "id"], name="home_prospe_existen_c88630_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="prospect",
+            index=models.Index(
+                fields=["calls_count", "id"], name="home_prospe_calls_c_875dd8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="prospect",
+            index=models.Index(
+                condition=models.Q(("had_conversation", True)),
+                fields=["id"],
+                name="home_prospect_conversation_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# `icontains` compiles to UPPER("column"::text) LIKE UPPER(...) on PostgreSQL,
+# so trigram indexes on the same expression serve prospect search
+SEARCH_COLUMNS = ["business_name", "city", "industry", "street_address"]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS home_prospect_{column}_trgm_idx "
+            f'ON home_prospect USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS home_prospect_phone_e164_trgm_idx "
+        'ON home_prospect USING gin ("phone_e164" gin_trgm_ops)'
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in [*SEARCH_COLUMNS, "phone_e164"]:
+        schema_editor.execute(f"DROP INDEX IF EXISTS home_prospect_{column}_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0007_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
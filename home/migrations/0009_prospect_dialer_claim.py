@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-17 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0008_prospect_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="prospect",
+            name="claim_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="prospect",
+            name="claimed_by",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.1.15 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("home", "0010_purgejob"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CallDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("opening", models.CharField(blank=True, max_length=255)),
+                ("objection", models.CharField(blank=True, max_length=255)),
+                ("product_selling", models.CharField(blank=True, max_length=255)),
+                ("pick_up_status", models.CharField(blank=True, max_length=255)),
+                ("outcome", models.CharField(blank=True, max_length=255)),
+                ("my_area_code_city", models.CharField(blank=True, max_length=100)),
+                ("calls", models.PositiveIntegerField(default=0)),
+                ("picked_up", models.PositiveIntegerField(default=0)),
+                ("conversations", models.PositiveIntegerField(default=0)),
+                ("yes_outcomes", models.PositiveIntegerField(default=0)),
+                ("meetings", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CallRollupStaleDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="CallRollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("watermark", models.DateTimeField(blank=True, null=True)),
+                ("refreshed_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="coldcallrecord",
+            index=models.Index(
+                fields=["updated_at"], name="home_coldca_updated_c465be_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="calldailyrollup",
+            index=models.Index(fields=["day"], name="home_callda_day_5beaa8_idx"),
+        ),
+    ]
@@ -1,4 +1,114 @@
-from django.db import models
+import datetime as dt
+import hashlib
+
+from django.core.cache import BaseCache, caches
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Now, TruncDate
+from django.utils import timezone
+
+from .normalization import normalize_phone_ca
+
+DASHBOARD_STATS_CACHE_KEY = "dashboard_stats"
+"""Cache key of `services.get_dashboard_stats`"""
+
+
+def shared_cache() -> BaseCache:
+    """
+    Cache of the entries writes clear, shared by the web and worker processes.
+    """
+    return caches["shared"]
+
+
+def invalidate_dashboard_stats():
+    """
+    Clears the cached dashboard stats now and again when the current
+    transaction commits, so no request caches counts from before the write.
+    """
+    shared_cache().delete(DASHBOARD_STATS_CACHE_KEY)
+    transaction.on_commit(lambda: shared_cache().delete(DASHBOARD_STATS_CACHE_KEY))
+
+
+def invalidate_phone_lookups(phones_e164: list):
+    """
+    Clears the cached prospects found by the phone numbers, now and when
+    the current transaction commits, e.g. after the prospects were deleted.
+    """
+    cache_keys = [Prospect.phone_lookup_cache_key(phone) for phone in phones_e164]
+    if cache_keys:
+        shared_cache().delete_many(cache_keys)
+        transaction.on_commit(lambda: shared_cache().delete_many(cache_keys))
+
+
+def call_records_changed(prospect_ids: set):
+    """
+    Refreshes the call summary of the prospects whose call records were
+    written and clears the dashboard stats.
+    """
+    Prospect.objects.filter(pk__in=prospect_ids - {None}).refresh_call_summary()
+    invalidate_dashboard_stats()
+
+
+def mark_call_rollup_days_stale(days: set):
+    """
+    Queues local days for `services.refresh_call_rollups` to recompute,
+    for call record writes the `updated_at` watermark can't see: deletions
+    and records moved to another day.
+    """
+    CallRollupStaleDay.objects.bulk_create(
+        [CallRollupStaleDay(day=day) for day in days - {None}],
+        ignore_conflicts=True,
+    )
+
+
+def local_day(date: dt.datetime | None) -> dt.date | None:
+    return timezone.localdate(date) if date is not None else None
+
+
+class ProspectQuerySet(models.QuerySet):
+    def refresh_call_summary(self) -> int:
+        """
+        Recomputes the call summary columns of the prospects from their
+        call records, in a single UPDATE.
+
+        Returns:
+            int: Number of updated prospects.
+        """
+        records = ColdCallRecord.objects.filter(prospect_id=OuterRef("pk"))
+        latest = records.order_by(F("date").desc(nulls_last=True), "-pk")
+        return self.update(
+            calls_count=Coalesce(
+                Subquery(
+                    records.order_by()
+                    .values("prospect_id")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            ),
+            last_called_at=Subquery(latest.values("date")[:1]),
+            last_call_outcome=Subquery(latest.values("outcome")[:1]),
+            had_conversation=Exists(records.filter(had_owner_conversation=True)),
+            updated_at=Now(),
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        invalidate_dashboard_stats()
+        return objs
+
+    def delete(self):
+        phones_e164 = list(
+            self.exclude(phone_e164=None).values_list("phone_e164", flat=True)
+        )
+        deleted = super().delete()
+        invalidate_dashboard_stats()
+        invalidate_phone_lookups(phones_e164)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Prospect(models.Model):
@@ -27,9 +137,33 @@ class Prospect(models.Model):
         DOES_NOT_EXIST = "does_not_exist"
         UNKNOWN = "unknown"
 
+    IMPORTED_FIELDS = [
+        "business_name",
+        "industry",
+        "city",
+        "province",
+        "street_address",
+        "website_url",
+        "yellow_pages_link",
+    ]
+    """Fields written by prospects imports, covered by the content hash"""
+
+    CALL_SUMMARY_FIELDS = [
+        "calls_count",
+        "last_called_at",
+        "last_call_outcome",
+        "had_conversation",
+    ]
+    """Fields kept in sync with the call records, not written by `save`"""
+
     business_name = models.CharField(max_length=255, null=True, blank=True)
     industry = models.CharField(max_length=100)
     phone_number = models.CharField(max_length=20, unique=True, null=True, blank=True)
+    phone_e164 = models.CharField(
+        max_length=16, unique=True, null=True, blank=True, editable=False
+    )
+    """Phone number normalized to E.164, used to match caller IDs and duplicates"""
+
     city = models.CharField(max_length=100, null=True, blank=True)
     province = models.CharField(
         choices=PROVINCE_CHOICES, max_length=2, null=True, blank=True
@@ -43,9 +177,131 @@ class Prospect(models.Model):
     )
     """Does business still exist?"""
 
+    content_hash = models.CharField(
+        max_length=32, null=True, blank=True, editable=False
+    )
+    """Fingerprint of the imported fields, set by imports to skip unchanged rows"""
+
+    # call summary, kept in sync with the prospect's call records
+    calls_count = models.PositiveIntegerField(default=0, editable=False)
+    last_called_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_call_outcome = models.CharField(
+        max_length=255, null=True, blank=True, editable=False
+    )
+    had_conversation = models.BooleanField(default=False, editable=False)
+    """Did any call to the prospect have an owner conversation?"""
+
+    claimed_by = models.CharField(max_length=100, null=True, blank=True)
+    """Caller the dialer handed the prospect to"""
+
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+    """When the dialer may hand the prospect to another caller"""
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProspectQuerySet.as_manager()
+
+    class Meta:
+        # filters of the prospects list, paged by id, see `check_query_plans`
+        indexes = [
+            models.Index(fields=["province", "id"]),
+            models.Index(fields=["industry", "id"]),
+            models.Index(fields=["city", "id"]),
+            models.Index(fields=["existence_status", "id"]),
+            models.Index(fields=["calls_count", "id"]),
+            # few prospects had a conversation, so only they are indexed
+            models.Index(
+                fields=["id"],
+                condition=Q(had_conversation=True),
+                name="home_prospect_conversation_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # phone number as loaded, its E.164 is only recomputed when it changes
+        instance._loaded_phone_number = instance.__dict__.get("phone_number")
+        return instance
+
+    def clean(self):
+        phone_e164 = normalize_phone_ca(self.phone_number)
+        if phone_e164 and self.phone_e164_taken(phone_e164):
+            raise ValidationError(
+                {"phone_number": "Another prospect has the same phone number."}
+            )
+
+    def phone_e164_taken(self, phone_e164: str) -> bool:
+        return (
+            Prospect.objects.filter(phone_e164=phone_e164).exclude(pk=self.pk).exists()
+        )
+
+    def phone_number_changed(self) -> bool:
+        if self._state.adding:
+            return True
+        # deferred, not saved either
+        if "phone_number" not in self.__dict__:
+            return False
+        return self.phone_number != getattr(self, "_loaded_phone_number", None)
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get("update_fields") is None
+            and not kwargs.get("force_insert")
+        ):
+            # the call summary is written by its call records, the values
+            # loaded with the prospect may be stale by now
+            deferred_fields = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.CALL_SUMMARY_FIELDS
+                and field.attname not in deferred_fields
+            ]
+        if self.phone_number_changed():
+            phone_e164 = normalize_phone_ca(self.phone_number)
+            # a duplicate is left without one, like `services.backfill_phone_e164`
+            if phone_e164 and self.phone_e164_taken(phone_e164):
+                phone_e164 = None
+            self.phone_e164 = phone_e164
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "phone_number" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "phone_e164"}
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        self._loaded_phone_number = self.phone_number
+        if self.phone_e164:
+            shared_cache().delete(self.phone_lookup_cache_key(self.phone_e164))
+        if adding:
+            invalidate_dashboard_stats()
+
+    def delete(self, *args, **kwargs):
+        deleted = super().delete(*args, **kwargs)
+        invalidate_dashboard_stats()
+        invalidate_phone_lookups([self.phone_e164] if self.phone_e164 else [])
+        return deleted
+
+    @staticmethod
+    def phone_lookup_cache_key(phone_e164: str) -> str:
+        """
+        Cache key of the prospect found by `services.find_prospect_by_phone`.
+        """
+        return f"prospect_phone_lookup:{phone_e164}"
+
+    def compute_content_hash(self) -> str:
+        """
+        Computes the fingerprint of the prospect's imported fields.
+
+        Returns:
+            str: Hex digest that changes whenever any imported field changes.
+        """
+        values = [getattr(self, field) for field in self.IMPORTED_FIELDS]
+        content = "\x1f".join("" if value is None else str(value) for value in values)
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
     @property
     def has_been_called(self) -> bool:
         """
@@ -54,9 +310,17 @@ class Prospect(models.Model):
         This property returns True if there is at least one ColdCallRecord
         associated with the Prospect, and False otherwise.
 
+        Uses the `called` annotation of `services.prospects_with_call_status`
+        or the prefetched call records when available, querying otherwise.
+
         Returns:
             bool: True if the prospect has been called, False otherwise.
         """
+        if "called" in self.__dict__:
+            return self.called
+        prefetched_records = self._prefetched_call_records()
+        if prefetched_records is not None:
+            return bool(prefetched_records)
         return self.coldcallrecord_set.exists()
 
     @property
@@ -67,15 +331,88 @@ class Prospect(models.Model):
         This property returns True if there is at least one ColdCallRecord
         associated with the Prospect where had_conversation is True, and False otherwise.
 
+        Uses the `conversation` annotation of `services.prospects_with_call_status`
+        or the prefetched call records when available, querying otherwise.
+
         Returns:
             bool: True if any of the call records for the prospect had a conversation, False otherwise.
         """
+        if "conversation" in self.__dict__:
+            return self.conversation
+        prefetched_records = self._prefetched_call_records()
+        if prefetched_records is not None:
+            return any(record.had_owner_conversation for record in prefetched_records)
         return self.coldcallrecord_set.filter(had_owner_conversation=True).exists()
 
+    def _prefetched_call_records(self) -> list | None:
+        """
+        Call records loaded by `prefetch_related("coldcallrecord_set")`,
+        None when they were not prefetched.
+        """
+        prefetched_objects = getattr(self, "_prefetched_objects_cache", {})
+        return prefetched_objects.get("coldcallrecord_set")
+
     def __str__(self) -> str:
         return str(self.business_name)
 
 
+class ColdCallRecordQuerySet(models.QuerySet):
+    """
+    Bulk writes also refresh the call summary of the affected prospects
+    and clear the dashboard stats. Deletions and date changes mark the
+    days of the call rollups to recompute.
+    """
+
+    def _local_days(self) -> set:
+        return set(
+            self.exclude(date=None)
+            .order_by()
+            .values_list(TruncDate("date"), flat=True)
+            .distinct()
+        )
+
+    def _prospect_ids(self) -> set:
+        return set(
+            self.exclude(prospect_id=None)
+            .order_by()
+            .values_list("prospect_id", flat=True)
+            .distinct()
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic():
+            objs = super().bulk_create(objs, *args, **kwargs)
+            call_records_changed({obj.prospect_id for obj in objs})
+        return objs
+
+    def update(self, **kwargs):
+        with transaction.atomic():
+            prospect_ids = self._prospect_ids()
+            if "date" in kwargs:
+                mark_call_rollup_days_stale(self._local_days())
+            # auto_now isn't applied to bulk updates, the rollups' watermark
+            # reads updated_at
+            kwargs.setdefault("updated_at", Now())
+            count = super().update(**kwargs)
+            if "prospect" in kwargs or "prospect_id" in kwargs:
+                prospect_ids |= self._prospect_ids()
+            call_records_changed(prospect_ids)
+        return count
+
+    update.alters_data = True
+
+    def delete(self):
+        with transaction.atomic():
+            prospect_ids = self._prospect_ids()
+            mark_call_rollup_days_stale(self._local_days())
+            deleted = super().delete()
+            call_records_changed(prospect_ids)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class ColdCallRecord(models.Model):
     """
     record track of a cold call
@@ -121,5 +458,276 @@ class ColdCallRecord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ColdCallRecordQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # call summary refresh: conversations and latest call per prospect
+            models.Index(fields=["prospect", "had_owner_conversation"]),
+            models.Index(fields=["prospect", "date"]),
+            # dashboard stats
+            models.Index(fields=["date"]),
+            models.Index(fields=["outcome"]),
+            # call rollups, records written since the watermark
+            models.Index(fields=["updated_at"]),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # prospect and date as loaded, to refresh the prospect's summary and
+        # the day's rollups when the record moves
+        instance._loaded_prospect_id = instance.__dict__.get("prospect_id")
+        instance._loaded_date = instance.__dict__.get("date")
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            prospect_ids = {
+                self.prospect_id,
+                getattr(self, "_loaded_prospect_id", None),
+            }
+            call_records_changed(prospect_ids)
+            loaded_day = local_day(getattr(self, "_loaded_date", None))
+            if loaded_day != local_day(self.date):
+                mark_call_rollup_days_stale({loaded_day})
+        self._loaded_prospect_id = self.prospect_id
+        self._loaded_date = self.date
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            mark_call_rollup_days_stale(
+                {local_day(getattr(self, "_loaded_date", self.date))}
+            )
+            deleted = super().delete(*args, **kwargs)
+            prospect_ids = {
+                self.prospect_id,
+                getattr(self, "_loaded_prospect_id", None),
+            }
+            call_records_changed(prospect_ids)
+        return deleted
+
+    def __str__(self) -> str:
+        return f"{self.prospect} - {self.date}"
+
+
+class ImportJob(models.Model):
+    """
+    uploaded prospects file waiting to be imported by the import worker
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    file = models.FileField(upload_to="imports/")
+    industry = models.CharField(max_length=100)
+    status = models.CharField(
+        choices=StatusChoices, default=StatusChoices.PENDING, max_length=20
+    )
+    rows_read = models.PositiveIntegerField(default=0)
+    rows_inserted = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_unchanged = models.PositiveIntegerField(default=0)
+    rows_skipped = models.PositiveIntegerField(default=0)
+    """Rows dropped as duplicates of a phone number already in the file"""
+
+    error = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def is_finished(self) -> bool:
+        """
+        Check if the worker is done with the job, successfully or not.
+        """
+        return self.status in [self.StatusChoices.DONE, self.StatusChoices.FAILED]
+
+    def __str__(self) -> str:
+        return f"{self.file.name} - {self.status}"
+
+
+class ImportRun(models.Model):
+    """
+    timings and row counts of one prospects import, to see where the time goes
+    """
+
+    STAGES = ["validation", "read", "dedup", "normalization", "write"]
+
+    source = models.CharField(max_length=20)
+    """File type of the import: xlsx, csv, parquet or html"""
+
+    file_name = models.CharField(max_length=255, blank=True)
+    file_size = models.PositiveBigIntegerField(null=True, blank=True)
+    """Size of the imported file in bytes"""
+
+    industry = models.CharField(max_length=100)
+    rows_read = models.PositiveIntegerField(default=0)
+    rows_inserted = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    rows_unchanged = models.PositiveIntegerField(default=0)
+    rows_skipped = models.PositiveIntegerField(default=0)
+    validation_seconds = models.FloatField(default=0)
+    read_seconds = models.FloatField(default=0)
+    dedup_seconds = models.FloatField(default=0)
+    normalization_seconds = models.FloatField(default=0)
+    write_seconds = models.FloatField(default=0)
+    total_seconds = models.FloatField(default=0)
+    error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def rows_per_second(self) -> float | None:
+        """
+        Import throughput in rows read per second.
+        """
+        if not self.total_seconds:
+            return None
+        return self.rows_read / self.total_seconds
+
+    def __str__(self) -> str:
+        return f"{self.source} {self.file_name} - {self.rows_read} rows"
+
+
+class PurgeJob(models.Model):
+    """
+    deletion of all prospects or all call records, run by the purge worker
+    in batches of primary keys so it can resume where it stopped
+    """
+
+    class StatusChoices(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    class TargetChoices(models.TextChoices):
+        CALL_RECORDS = "call_records"
+        PROSPECTS = "prospects"
+        """Prospects and their call records, which protect them from deletion"""
+
+    target = models.CharField(choices=TargetChoices, max_length=20)
+    archive = models.BooleanField(default=False)
+    """Save every batch to a JSON Lines file before deleting it"""
+
+    batch_size = models.PositiveIntegerField(default=1000)
+    status = models.CharField(
+        choices=StatusChoices, default=StatusChoices.PENDING, max_length=20
+    )
+    stage = models.CharField(max_length=20, blank=True)
+    """Table being purged: call_records, then prospects for a prospects purge"""
+
+    last_pk = models.BigIntegerField(default=0)
+    """Primary key of the stage's last deleted row, the next batch starts after it"""
+
+    rows_total = models.PositiveIntegerField(default=0)
+    """Rows to delete, counted when the job is claimed"""
+
+    rows_deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def stages(self) -> list[str]:
+        """
+        Tables purged by the job, in order.
+        """
+        if self.target == self.TargetChoices.PROSPECTS:
+            return [self.TargetChoices.CALL_RECORDS, self.TargetChoices.PROSPECTS]
+        return [self.TargetChoices.CALL_RECORDS]
+
+    @property
+    def archive_directory(self) -> str:
+        return f"purges/{self.pk}"
+
+    @property
+    def is_finished(self) -> bool:
+        """
+        Check if the worker is done with the job, successfully or not.
+        """
+        return self.status in [self.StatusChoices.DONE, self.StatusChoices.FAILED]
+
+    @property
+    def progress_percent(self) -> int:
+        if not self.rows_total:
+            return 100 if self.is_finished else 0
+        return min(100, round(100 * self.rows_deleted / self.rows_total))
+
+    def __str__(self) -> str:
+        return f"purge {self.target} - {self.status}"
+
+
+class CallDailyRollup(models.Model):
+    """
+    calls of one local day with the same call dimensions, and how far
+    they got in the funnel, kept up to date by `refresh_call_rollups`
+    """
+
+    DIMENSIONS = [
+        "opening",
+        "objection",
+        "product_selling",
+        "pick_up_status",
+        "outcome",
+        "my_area_code_city",
+    ]
+    """Call record fields the calls are grouped by, empty for no value"""
+
+    day = models.DateField()
+    opening = models.CharField(max_length=255, blank=True)
+    objection = models.CharField(max_length=255, blank=True)
+    product_selling = models.CharField(max_length=255, blank=True)
+    pick_up_status = models.CharField(max_length=255, blank=True)
+    outcome = models.CharField(max_length=255, blank=True)
+    my_area_code_city = models.CharField(max_length=100, blank=True)
+
+    calls = models.PositiveIntegerField(default=0)
+    picked_up = models.PositiveIntegerField(default=0)
+    """Calls picked up by a person"""
+
+    conversations = models.PositiveIntegerField(default=0)
+    """Calls with an owner conversation"""
+
+    yes_outcomes = models.PositiveIntegerField(default=0)
+    meetings = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # a refresh replaces whole days, one row per day and dimensions
+        indexes = [models.Index(fields=["day"])]
+
+    def __str__(self) -> str:
+        return f"{self.day} - {self.calls} calls"
+
+
+class CallRollupWatermark(models.Model):
+    """
+    `updated_at` of the call records already counted in the rollups
+    """
+
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+    """Call records updated after it are counted again on the next refresh"""
+
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.name} - {self.watermark}"
+
+
+class CallRollupStaleDay(models.Model):
+    """
+    local day whose rollups changed in a way the watermark can't see
+    """
+
+    day = models.DateField(unique=True)
+
     def __str__(self) -> str:
-        return f"{self.prospect} - {self.call_time}"
+        return str(self.day)
@@ -0,0 +1,192 @@
+"""
+Normalization of yellow pages CA rows into prospect fields.
+
+This module doesn't import models, so process pool workers can import it
+without loading the Django app registry.
+"""
+
+import functools
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import pandas as pd
+from django.conf import settings
+from ez_address_parser import AddressParser
+
+from .utils import parse_website_url
+
+
+def parse_yellow_pages_ca_address(address: str) -> dict:
+    """
+    Parses an address from Yellow Pages Canada and returns a dictionary with city and province.
+
+    Args:
+        address (str): The address string to parse, expected to be in the format "Street, City, Province PostalCode".
+
+    Returns:
+        dict: A dictionary with keys "city" and "province", containing the parsed city and province from the address.
+
+    Raises:
+        ValueError: If the address does not contain at least three parts separated by commas, a ValueError will be raised.
+    """
+    parts = address.split(",")
+    if len(parts) < 3:
+        raise ValueError("Address doesn't seem to be yellow pages CA")
+    city = parts[1].strip()
+    province = parts[2].split()[0]
+    return {"city": city, "province": province}
+
+
+PROVINCE_CODES = frozenset(
+    ["AB", "BC", "MB", "NB", "NL", "NT", "NS", "NU", "ON", "PE", "QC", "SK", "YT"]
+)
+
+
+@dataclass(frozen=True)
+class NormalizedAddress:
+    city: str
+    province: str
+
+
+@functools.cache
+def get_address_parser() -> AddressParser:
+    """
+    Returns the address parser of the current process, constructed once.
+    """
+    return AddressParser()
+
+
+@functools.lru_cache(maxsize=settings.ADDRESS_NORMALIZATION_CACHE_SIZE)
+def normalize_address_ca(address: str) -> NormalizedAddress:
+    """
+    Extracts the city and province from a given Canadian address.
+
+    The cheap "Street, City, PROV POSTAL" split of yellow pages CA addresses
+    is tried first and the ML address parser is used only when the split
+    doesn't yield a known province. Results are kept in a bounded LRU cache,
+    so an address repeated across rows and imports is parsed only once.
+
+    Args:
+        address (str): The address string to be parsed.
+
+    Returns:
+        NormalizedAddress: The city and province code, empty strings when not found.
+
+    Example:
+    >>> normalize_address_ca("296 Brock St E, Thunder Bay, ON P7E 4H4")
+    NormalizedAddress(city='Thunder Bay', province='ON')
+    """
+    try:
+        parsed = parse_yellow_pages_ca_address(address)
+    except (ValueError, IndexError):
+        parsed = None
+    if parsed and parsed["city"] and parsed["province"] in PROVINCE_CODES:
+        return NormalizedAddress(city=parsed["city"], province=parsed["province"])
+
+    result = get_address_parser().parse(address)
+
+    # parser returns structure like:
+    # [('296', 'StreetNumber'),
+    #  ('Brock', 'StreetName'),
+    #  ('St', 'StreetType'),
+    #  ('E', 'StreetDirection'),
+    #  ('Thunder', 'Municipality'),
+    #  ('Bay', 'Municipality'),
+    #  ('ON', 'Province'),
+    #  ('P7E', 'PostalCode'),
+    #  ('4H4', 'PostalCode')]
+
+    city = " ".join(token for token, label in result if label == "Municipality")
+
+    # library thinks city is province if province is missing
+    province = ""
+    for token, label in result:
+        if label == "Province" and token.upper() in PROVINCE_CODES:
+            province = token.upper()
+    return NormalizedAddress(city=city, province=province)
+
+
+def normalize_phone_ca(phone: str | None) -> str | None:
+    """
+    Converts a Canadian phone number, as printed by yellow pages, to E.164.
+
+    Example:
+    >>> normalize_phone_ca("(416) 555-1234")
+    '+14165551234'
+    """
+    if phone is None:
+        return None
+    digits = re.sub(r"\D", "", str(phone))
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return f"+1{digits}" if len(digits) == 10 else None
+
+
+def normalize_phones_ca(phones: Iterable[str | None]) -> list[str | None]:
+    """
+    Vectorized `normalize_phone_ca` for a batch of phone numbers.
+
+    Args:
+        phones (Iterable[str | None]): Phone numbers in any format.
+
+    Returns:
+        list[str | None]: E.164 phone numbers, None where the phone number
+        is missing or isn't a 10 digit north american number.
+    """
+    digits = (
+        pd.Series(list(phones), dtype="string")
+        .str.replace(r"\D", "", regex=True)
+        .str.replace(r"^1(\d{10})$", r"\1", regex=True)
+    )
+    e164 = ("+1" + digits).where(digits.str.len() == 10)
+    return [None if pd.isna(phone) else phone for phone in e164]
+
+
+def normalize_website_url(website: str | None) -> str | None:
+    """
+    Returns the website URL of a yellow pages redirect link, other links
+    are already the website URL and are returned as they are.
+    """
+    if not website:
+        return None
+    if "redirect=" in website:
+        return parse_website_url(website)
+    return website
+
+
+def normalize_prospect_row(row: dict) -> dict:
+    """
+    Normalizes a yellow pages CA export row into prospect fields.
+
+    Args:
+        row (dict): Row keyed by yellow pages CA column names.
+
+    Returns:
+        dict: Prospect field values, without the industry.
+    """
+    street_address = row["Address"]
+    address = normalize_address_ca(street_address) if street_address else None
+    return {
+        "business_name": row["Name"],
+        "phone_number": row["Phone"],
+        "street_address": street_address,
+        "yellow_pages_link": row["Link"],
+        "website_url": normalize_website_url(row["Website"]),
+        "city": address.city if address else None,
+        "province": address.province if address else None,
+    }
+
+
+def normalize_prospect_rows(rows: list[dict]) -> list[dict]:
+    """
+    Normalizes a partition of yellow pages CA export rows, keeping their order.
+    """
+    return [normalize_prospect_row(row) for row in rows]
+
+
+def init_worker():
+    """
+    Process pool initializer, loads the address parser once per worker.
+    """
+    get_address_parser()
@@ -0,0 +1,182 @@
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db.models import QuerySet
+from django.http import QueryDict
+
+
+@dataclass
+class KeysetPage:
+    """
+    Page of a `KeysetPaginator`, with cursors of its neighbour pages.
+    """
+
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def __iter__(self) -> Iterator:
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by seeking past the last row of the previous page
+    instead of counting and skipping rows with OFFSET.
+
+    Every page is an indexed range scan on the ordering field, so a deep
+    page costs as much as the first one. Pages are addressed by opaque
+    cursors instead of page numbers, and the total count is never queried.
+    """
+
+    def __init__(self, queryset: QuerySet, per_page: int, ordering: str = "-pk"):
+        """
+        Args:
+            queryset (QuerySet): Rows to paginate.
+            per_page (int): Maximum number of rows per page.
+            ordering (str): Field with unique values the pages are ordered
+                by, prefixed with "-" for descending order.
+        """
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.field = ordering.removeprefix("-")
+        self.descending = ordering.startswith("-")
+
+    @staticmethod
+    def encode_cursor(value, direction: str) -> str:
+        data = json.dumps([value, direction]).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple | None:
+        """
+        Decodes a cursor into the ordering value and direction to seek in,
+        None when the cursor is not valid.
+        """
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            value, direction = json.loads(data)
+        except (binascii.Error, ValueError, TypeError):
+            return None
+        if direction not in ["next", "previous"]:
+            return None
+        return value, direction
+
+    def get_page(self, cursor: str | None) -> KeysetPage:
+        """
+        Returns the page the cursor points to, the first page when the
+        cursor is missing or not valid.
+
+        Args:
+            cursor (str | None): `next_cursor` or `previous_cursor` of a page.
+
+        Returns:
+            KeysetPage: Rows of the page and the cursors of its neighbours.
+        """
+        rows_queryset, direction = self._rows_queryset(cursor)
+        return self._rows_page(list(rows_queryset), direction)
+
+    async def aget_page(self, cursor: str | None) -> KeysetPage:
+        """
+        Async version of `get_page`.
+        """
+        rows_queryset, direction = self._rows_queryset(cursor)
+        return self._rows_page([row async for row in rows_queryset], direction)
+
+    def clean_cursor_value(self, value):
+        """
+        Converts a decoded cursor value to a value of the ordering field,
+        None when it is not one, e.g. a string or a list for a primary key.
+        """
+        meta = self.queryset.model._meta
+        field = meta.pk if self.field == "pk" else meta.get_field(self.field)
+        try:
+            value = field.to_python(value)
+            # range of the column, e.g. an integer too big for the database
+            field.run_validators(value)
+        except (ValidationError, OverflowError):
+            return None
+        return value
+
+    def _rows_queryset(self, cursor: str | None) -> tuple[QuerySet, str | None]:
+        """
+        Returns the rows of the page, one more to know if there is a next
+        one, and the direction of the cursor, None for the first page.
+        """
+        decoded_cursor = self.decode_cursor(cursor) if cursor else None
+        if decoded_cursor is not None:
+            value, direction = decoded_cursor
+            value = self.clean_cursor_value(value)
+        if decoded_cursor is None or value is None:
+            return self.queryset.order_by(self.ordering)[: self.per_page + 1], None
+
+        forward = direction == "next"
+        # seeking backwards walks the ordering reversed, then flips the rows
+        lookup = "lt" if forward == self.descending else "gt"
+        ordering = self.ordering if forward else self._reversed_ordering()
+        rows_queryset = self.queryset.filter(
+            **{f"{self.field}__{lookup}": value}
+        ).order_by(ordering)[: self.per_page + 1]
+        return rows_queryset, direction
+
+    def _rows_page(self, rows: list, direction: str | None) -> KeysetPage:
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if direction is None:
+            return self._page(rows, more, False)
+        if direction == "next":
+            return self._page(rows, more, True)
+        return self._page(rows[::-1], True, more)
+
+    def _reversed_ordering(self) -> str:
+        return self.field if self.descending else f"-{self.field}"
+
+    def _page(self, rows: list, has_next: bool, has_previous: bool) -> KeysetPage:
+        page = KeysetPage(rows)
+        if rows and has_next:
+            page.next_cursor = self.encode_cursor(getattr(rows[-1], self.field), "next")
+        if rows and has_previous:
+            page.previous_cursor = self.encode_cursor(
+                getattr(rows[0], self.field), "previous"
+            )
+        return page
+
+
+def cursor_query(
+    query: QueryDict, cursor: str | None, param: str = "cursor"
+) -> str | None:
+    """
+    Returns the query string with the cursor param replaced, so the
+    active filters are kept when moving between pages. None without a cursor.
+    """
+    if cursor is None:
+        return None
+    query = query.copy()
+    query[param] = cursor
+    return query.urlencode()
+
+
+def filters_query(query: QueryDict, param: str = "cursor") -> str:
+    """
+    Returns the query string without the cursor param, the active filters
+    of any page.
+    """
+    query = query.copy()
+    query.pop(param, None)
+    return query.urlencode()
@@ -0,0 +1,102 @@
+import datetime as dt
+import re
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from . import services
+from .models import CallDailyRollup, ColdCallRecord, Prospect
+
+SEQUENTIAL_SCAN_PATTERNS = {
+    # "Seq Scan on home_prospect"
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    # "SCAN home_prospect", but not "SCAN home_prospect USING INDEX ..."
+    "sqlite": re.compile(r"\bSCAN (\w+)(?!\w| USING)"),
+}
+
+
+def hot_query_shapes() -> dict[str, QuerySet]:
+    """
+    Returns the query shapes the views and filters run on every request,
+    with placeholder values.
+
+    Returns:
+        dict[str, QuerySet]: Querysets keyed by a short description.
+    """
+    today_start, today_end = services.local_day_range()
+    prospects = services.prospects_with_call_status()
+    return {
+        "prospects by province": prospects.filter(province="ON"),
+        "prospects by industry": prospects.filter(industry="Cafe"),
+        "prospects by city": prospects.filter(city="Toronto"),
+        "prospects by existence status": prospects.filter(
+            existence_status=Prospect.ExistenceChoices.EXISTS
+        ),
+        "prospects not yet called": prospects.filter(calls_count=0),
+        "prospects with conversation": prospects.filter(had_conversation=True),
+        "prospect by caller ID": Prospect.objects.filter(phone_e164="+14165550000"),
+        "prospect conversations": ColdCallRecord.objects.filter(
+            prospect_id=1, had_owner_conversation=True
+        ),
+        "prospect latest call": ColdCallRecord.objects.filter(prospect_id=1).order_by(
+            "-date"
+        )[:1],
+        "calls today": ColdCallRecord.objects.filter(
+            date__gte=today_start, date__lt=today_end
+        ),
+        "calls by outcome": ColdCallRecord.objects.filter(outcome="meeting"),
+        "calls written since the rollups' watermark": ColdCallRecord.objects.filter(
+            updated_at__gt=today_start
+        ),
+        "call rollups by day": CallDailyRollup.objects.filter(
+            day__gte=today_start.date()
+        ),
+    }
+
+
+def find_sequential_scans(plan: str) -> list[str]:
+    """
+    Finds the tables a query plan reads with a sequential scan.
+
+    Args:
+        plan (str): Output of `QuerySet.explain()`.
+
+    Returns:
+        list[str]: Names of the sequentially scanned tables.
+    """
+    pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        raise NotImplementedError(f"Query plans of {connection.vendor} not supported")
+    return pattern.findall(plan)
+
+
+def seed_query_plan_data(prospects_count: int):
+    """
+    Creates prospects with a call each, so the planner has rows to plan for.
+
+    Args:
+        prospects_count (int): Number of prospects.
+    """
+    provinces = [code for code, _ in Prospect.PROVINCE_CHOICES]
+    prospects = Prospect.objects.bulk_create(
+        Prospect(
+            business_name=f"Business {index}",
+            industry=f"Industry {index % 50}",
+            phone_number=f"+1555{index:07}",
+            phone_e164=f"+1555{index:07}",
+            city=f"City {index % 200}",
+            province=provinces[index % len(provinces)],
+        )
+        for index in range(prospects_count)
+    )
+    now = timezone.now()
+    ColdCallRecord.objects.bulk_create(
+        ColdCallRecord(
+            prospect=prospect,
+            date=now - dt.timedelta(hours=index),
+            had_owner_conversation=index % 7 == 0,
+            outcome=["no", "yes", "meeting"][index % 3],
+        )
+        for index, prospect in enumerate(prospects[::2])
+    )
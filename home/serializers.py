@@ -3,9 +3,33 @@ from rest_framework import serializers
 from .models import ColdCallRecord, Prospect
 
 
-class ProspectSerializer(serializers.ModelSerializer):
+def requested_fields(request) -> set[str] | None:
+    """
+    Returns the field names listed in the `fields` query param of the
+    request, comma separated, None when all fields are requested.
+    """
+    if request is None or not request.query_params.get("fields"):
+        return None
+    return set(request.query_params["fields"].split(","))
+
+
+class SparseFieldsMixin:
+    """
+    Keeps only the fields listed in the `fields` query param of the
+    request, comma separated, all fields without it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get("request"))
+        if requested is None:
+            return
+        for field_name in set(self.fields) - requested:
+            self.fields.pop(field_name)
+
+
+class ProspectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     has_been_called = serializers.SerializerMethodField()
-    had_conversation = serializers.SerializerMethodField()
 
     class Meta:
         model = Prospect
@@ -16,6 +40,10 @@ class ProspectSerializer(serializers.ModelSerializer):
         """
         Returns whether the prospect has been called.
 
+        Read from the `called` annotation of
+        `services.prospects_with_call_status` when present, so no query is
+        run per prospect.
+
         Args:
             obj (Prospect): The Prospect instance.
 
@@ -24,19 +52,6 @@ class ProspectSerializer(serializers.ModelSerializer):
         """
         return obj.has_been_called
 
-    @staticmethod
-    def get_had_conversation(obj: Prospect) -> bool:
-        """
-        Returns whether any call record for the prospect had a conversation.
-
-        Args:
-            obj (Prospect): The Prospect instance.
-
-        Returns:
-            bool: True if any call record for the prospect had a conversation, False otherwise.
-        """
-        return obj.had_owner_conversation
-
 
 class ProspectsImportCsvSerializer(serializers.ModelSerializer):
     csv_file = serializers.FileField()
@@ -46,7 +61,7 @@ class ProspectsImportCsvSerializer(serializers.ModelSerializer):
         fields = ["csv_file", "city", "industry"]
 
 
-class ColdCallRecordSerializer(serializers.ModelSerializer):
+class ColdCallRecordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
 
     class Meta:
         model = ColdCallRecord
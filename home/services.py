@@ -1,13 +1,65 @@
+import csv
 import datetime as dt
-from dataclasses import dataclass
+import hashlib
+import itertools
+import math
+import time
+import urllib.parse
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import openpyxl
 import pandas as pd
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.core import serializers as django_serializers
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import UploadedFile
-from ez_address_parser import AddressParser
+from django.db import transaction
+from django.db.models import (
+    BooleanField,
+    Count,
+    ExpressionWrapper,
+    F,
+    Func,
+    Max,
+    Min,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import Now, TruncDate
+from django.utils import timezone
 
-from .models import ColdCallRecord, Prospect
-from .utils import parse_website_url
+from . import normalization
+from .business_data_extractor.extractor import extract_data_batch
+from .models import (
+    DASHBOARD_STATS_CACHE_KEY,
+    CallDailyRollup,
+    CallRollupStaleDay,
+    CallRollupWatermark,
+    ColdCallRecord,
+    ImportJob,
+    ImportRun,
+    Prospect,
+    PurgeJob,
+    shared_cache,
+)
+from .normalization import (
+    normalize_address_ca,
+    normalize_phone_ca,
+    normalize_phones_ca,
+    normalize_prospect_rows,
+    parse_yellow_pages_ca_address,
+)
 
 
 def is_xlsx(uploaded_file: UploadedFile) -> bool:
@@ -23,10 +75,173 @@ def is_xlsx(uploaded_file: UploadedFile) -> bool:
     return uploaded_file.name.lower().endswith(".xlsx")
 
 
+YELLOW_PAGES_CA_COLUMNS = ["Name", "Website", "Phone", "Address", "Link"]
+
+
+def get_import_file_type(uploaded_file: UploadedFile) -> str | None:
+    """
+    Returns the type of a prospects import file from its extension.
+
+    Args:
+        uploaded_file (UploadedFile): The file uploaded by the user.
+
+    Returns:
+        str | None: "xlsx", "csv" or "parquet", None for other files.
+    """
+    extension = Path(uploaded_file.name).suffix.lower().removeprefix(".")
+    return extension if extension in IMPORT_FILE_READERS else None
+
+
+def read_excel_header(excel_file: UploadedFile) -> list:
+    """
+    Reads only the header row of the first sheet of the uploaded Excel file.
+
+    Args:
+        excel_file (UploadedFile): The file uploaded by the user.
+
+    Returns:
+        list: The header cell values, in column order.
+    """
+    excel_file.seek(0)
+    workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+    finally:
+        workbook.close()
+    return list(header)
+
+
+def iter_excel_rows(
+    excel_file: UploadedFile, required_columns: list | None = None
+) -> Iterator[dict]:
+    """
+    Streams the rows of the first sheet of the uploaded Excel file.
+
+    The workbook is opened in read-only mode, so rows are parsed lazily
+    and never held in memory all at once. Completely empty rows are skipped.
+    The header is validated right away, before any row is read.
+
+    Args:
+        excel_file (UploadedFile): The file uploaded by the user.
+        required_columns (list | None): Column names the header must contain.
+
+    Returns:
+        Iterator[dict]: Row values keyed by header column name, empty cells are None.
+
+    Raises:
+        ValueError: If the header is missing any of the required columns.
+    """
+    excel_file.seek(0)
+    workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    rows = workbook.worksheets[0].iter_rows(values_only=True)
+    header = next(rows, ())
+    if required_columns and not all(column in header for column in required_columns):
+        workbook.close()
+        raise ValueError("Excel columns are not correct")
+
+    def iter_rows() -> Iterator[dict]:
+        try:
+            for values in rows:
+                if all(value is None for value in values):
+                    continue
+                yield dict(zip(header, values))
+        finally:
+            workbook.close()
+
+    return iter_rows()
+
+
+def iter_csv_rows(
+    csv_file: UploadedFile, required_columns: list | None = None
+) -> Iterator[dict]:
+    """
+    Streams the rows of the uploaded CSV file.
+
+    The file is parsed in chunks of `settings.PROSPECTS_IMPORT_CHUNK_SIZE`
+    rows and, when required columns are given, only those columns are kept.
+    The header is validated right away, before any row is read.
+
+    Args:
+        csv_file (UploadedFile): The file uploaded by the user.
+        required_columns (list | None): Column names the header must contain.
+
+    Returns:
+        Iterator[dict]: Row values keyed by column name, empty cells are None.
+
+    Raises:
+        ValueError: If the header is missing any of the required columns.
+    """
+    csv_file.seek(0)
+    header = pd.read_csv(csv_file, nrows=0).columns
+    if required_columns and not all(column in header for column in required_columns):
+        raise ValueError("CSV columns are not correct")
+
+    def iter_rows() -> Iterator[dict]:
+        csv_file.seek(0)
+        with pd.read_csv(
+            csv_file,
+            usecols=required_columns,
+            dtype=str,
+            chunksize=settings.PROSPECTS_IMPORT_CHUNK_SIZE,
+        ) as reader:
+            for df in reader:
+                df = df.astype(object).where(df.notna(), None)
+                yield from df.to_dict("records")
+
+    return iter_rows()
+
+
+def iter_parquet_rows(
+    parquet_file: UploadedFile, required_columns: list | None = None
+) -> Iterator[dict]:
+    """
+    Streams the rows of the uploaded Parquet file.
+
+    Row batches of `settings.PROSPECTS_IMPORT_CHUNK_SIZE` rows are read and,
+    when required columns are given, only those columns are read at all.
+    The schema is validated right away, before any row is read.
+
+    Args:
+        parquet_file (UploadedFile): The file uploaded by the user.
+        required_columns (list | None): Column names the schema must contain.
+
+    Returns:
+        Iterator[dict]: Row values keyed by column name, nulls are None.
+
+    Raises:
+        ValueError: If the schema is missing any of the required columns.
+    """
+    parquet_file.seek(0)
+    parquet = pq.ParquetFile(parquet_file)
+    if required_columns and not all(
+        column in parquet.schema_arrow.names for column in required_columns
+    ):
+        raise ValueError("Parquet columns are not correct")
+
+    def iter_rows() -> Iterator[dict]:
+        for batch in parquet.iter_batches(
+            batch_size=settings.PROSPECTS_IMPORT_CHUNK_SIZE, columns=required_columns
+        ):
+            yield from batch.to_pylist()
+
+    return iter_rows()
+
+
+IMPORT_FILE_READERS = {
+    "xlsx": iter_excel_rows,
+    "csv": iter_csv_rows,
+    "parquet": iter_parquet_rows,
+}
+"""Row readers of the supported prospects import file types"""
+
+
 def validate_excel_columns(excel_file: UploadedFile, required_columns: list) -> bool:
     """
     Validates if the uploaded Excel file has the required columns.
 
+    Only the header row is read, the rest of the workbook is not parsed.
+
     Args:
         excel_file (UploadedFile): The file uploaded by the user.
         required_columns (list): The list of required column names.
@@ -34,82 +249,659 @@ def validate_excel_columns(excel_file: UploadedFile, required_columns: list) ->
     Returns:
         bool: True if all required columns are present, False otherwise.
     """
-    df = pd.read_excel(excel_file)
-    return all(column in df.columns for column in required_columns)
+    header = read_excel_header(excel_file)
+    return all(column in header for column in required_columns)
 
 
 def validate_yellow_pages_ca_excel_columns(excel_file: UploadedFile):
     """
     Validates columns for exported yellow pages CA excel
     """
-    required_columns = ["Name", "Website", "Phone", "Address", "Link"]
     return validate_excel_columns(
-        excel_file=excel_file, required_columns=required_columns
+        excel_file=excel_file, required_columns=YELLOW_PAGES_CA_COLUMNS
     )
 
 
-def import_prospects_from_excel(excel_file: UploadedFile, industry: str):
-    if not is_xlsx(excel_file):
-        raise ValueError("Not an excel file")
+@dataclass
+class ImportResult:
+    rows_read: int = 0
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_unchanged: int = 0
+    rows_skipped: int = 0
+    stage_seconds: dict[str, float] = field(
+        default_factory=lambda: dict.fromkeys(ImportRun.STAGES, 0.0)
+    )
+    """Seconds spent in each import stage, see `ImportRun.STAGES`"""
 
-    if not validate_yellow_pages_ca_excel_columns(excel_file=excel_file):
-        raise ValueError(f"Excel columns are not correct")
+    @contextmanager
+    def time_stage(self, stage: str):
+        """
+        Adds the wall time of the block to the seconds of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[stage] += time.perf_counter() - start
 
-    df1_dirty = pd.read_excel(excel_file)
-    df2_removed_duplicates = df1_dirty.drop_duplicates(subset="Phone")
-    df3_nan_to_none = df2_removed_duplicates.where(
-        pd.notna(df2_removed_duplicates), None
-    )
 
-    prospect_list = []
-    for row in df3_nan_to_none.itertuples():
-        business_name = row.Name
-        phone_number = row.Phone
-        street_address = row.Address
-        industry = industry
-        yellow_pages_link = row.Link
-        website_url = parse_website_url(row.Website) if row.Website else None
-        city = extract_city_ca(street_address) if row.Address else None
-        province = extract_province_ca(street_address) if row.Address else None
-
-        prospect = Prospect(
-            business_name=business_name,
-            phone_number=phone_number,
-            street_address=street_address,
+@contextmanager
+def record_import_run(
+    source: str, industry: str, file_name: str = "", file_size: int | None = None
+) -> Iterator[ImportResult]:
+    """
+    Saves an `ImportRun` with the timings and row counts of the import
+    done in the block, also when the import fails.
+
+    Args:
+        source (str): File type of the import, "xlsx", "csv", "parquet" or "html".
+        industry (str): Industry of the imported prospects.
+        file_name (str): Name of the imported file.
+        file_size (int | None): Size of the imported file in bytes.
+
+    Yields:
+        ImportResult: The result the import adds its totals and timings to.
+    """
+    result = ImportResult()
+    error = None
+    start = time.perf_counter()
+    try:
+        yield result
+    except Exception as exception:
+        error = str(exception)
+        raise
+    finally:
+        ImportRun.objects.create(
+            source=source,
+            file_name=file_name,
+            file_size=file_size,
             industry=industry,
-            yellow_pages_link=yellow_pages_link,
-            website_url=website_url,
-            city=city,
-            province=province,
+            rows_read=result.rows_read,
+            rows_inserted=result.rows_inserted,
+            rows_updated=result.rows_updated,
+            rows_unchanged=result.rows_unchanged,
+            rows_skipped=result.rows_skipped,
+            total_seconds=time.perf_counter() - start,
+            error=error,
+            **{
+                f"{stage}_seconds": seconds
+                for stage, seconds in result.stage_seconds.items()
+            },
+        )
+
+
+def drop_duplicate_phones(
+    rows: Iterable[dict], seen_phones: set
+) -> tuple[list[dict], list[str | None]]:
+    """
+    Keeps only the first row for each phone number, like
+    `DataFrame.drop_duplicates(subset="Phone")` but across chunks of rows.
+
+    Phone numbers are compared in E.164, so "(416) 555-1234" and
+    "416-555-1234" are duplicates. Phone numbers that can't be normalized
+    are compared as they are. Rows without a phone number are dropped too,
+    prospects are matched by phone number so re-importing them would
+    duplicate them, and they can't be called anyway.
+
+    Args:
+        rows (Iterable[dict]): Yellow pages CA export rows.
+        seen_phones (set): Phone numbers of the rows kept so far, updated in place.
+
+    Returns:
+        tuple[list[dict], list[str | None]]: The kept rows and their E.164 phone numbers.
+    """
+    rows = list(rows)
+    unique_rows = []
+    unique_phones = []
+    for row, phone_e164 in zip(rows, normalize_phones_ca(r["Phone"] for r in rows)):
+        phone = phone_e164 or row["Phone"]
+        if not phone or phone in seen_phones:
+            continue
+        seen_phones.add(phone)
+        unique_rows.append(row)
+        unique_phones.append(phone_e164)
+    return unique_rows, unique_phones
+
+
+def normalize_prospect_rows_in_parallel(
+    rows: list[dict], executor: Executor, partitions: int
+) -> list[dict]:
+    """
+    Normalizes rows split into partitions across the executor's workers.
+
+    Args:
+        rows (list[dict]): Yellow pages CA export rows.
+        executor (Executor): Pool whose workers normalize the partitions.
+        partitions (int): Number of partitions to split the rows into.
+
+    Returns:
+        list[dict]: Normalized prospect fields, in the same order as the rows.
+    """
+    partition_size = math.ceil(len(rows) / partitions) or 1
+    results = executor.map(
+        normalize_prospect_rows, itertools.batched(rows, partition_size)
+    )
+    return list(itertools.chain.from_iterable(results))
+
+
+def upsert_prospects(prospect_list: list[Prospect]) -> tuple[int, int, int]:
+    """
+    Inserts new prospects and updates only the changed columns of existing
+    ones, matching them by E.164 phone number, or by phone number as printed
+    for prospects without one.
+
+    Existing prospects are diffed in bulk by content hash, so prospects whose
+    imported fields didn't change are not written at all. Changed prospects
+    are grouped by the set of changed columns and written with one
+    `bulk_update` per group.
+
+    Args:
+        prospect_list (list[Prospect]): Unsaved prospects with unique phone
+            numbers and their `phone_e164` set.
+
+    Returns:
+        tuple[int, int, int]: Number of inserted, updated and unchanged prospects.
+    """
+    for prospect in prospect_list:
+        prospect.content_hash = prospect.compute_content_hash()
+
+    existing_rows = Prospect.objects.filter(
+        Q(phone_e164__in=[prospect.phone_e164 for prospect in prospect_list])
+        | Q(phone_number__in=[prospect.phone_number for prospect in prospect_list])
+    ).values_list("phone_e164", "phone_number", "pk", "content_hash")
+    existing_by_e164 = {}
+    existing_by_phone = {}
+    for phone_e164, phone_number, pk, content_hash in existing_rows:
+        if phone_e164:
+            existing_by_e164[phone_e164] = (pk, content_hash)
+        existing_by_phone[phone_number] = (pk, content_hash)
+
+    new_prospects = []
+    hash_changed = {}
+    for prospect in prospect_list:
+        match = existing_by_e164.get(prospect.phone_e164) or existing_by_phone.get(
+            prospect.phone_number
         )
-        prospect_list.append(prospect)
-    Prospect.objects.bulk_create(
-        prospect_list,
-        update_conflicts=True,
-        update_fields=["industry"],
-        unique_fields=["phone_number"],
+        if match is None:
+            new_prospects.append(prospect)
+            continue
+        pk, content_hash = match
+        if prospect.content_hash != content_hash:
+            prospect.pk = pk
+            hash_changed[pk] = prospect
+
+    # hash also differs when the stored hash is stale or missing,
+    # so changed columns are found by comparing the stored values
+    changes = defaultdict(list)
+    stored_rows = Prospect.objects.filter(pk__in=hash_changed).values(
+        "pk", *Prospect.IMPORTED_FIELDS
     )
+    now = timezone.now()
+    for stored in stored_rows:
+        prospect = hash_changed[stored["pk"]]
+        changed_fields = tuple(
+            field
+            for field in Prospect.IMPORTED_FIELDS
+            if getattr(prospect, field) != stored[field]
+        )
+        if changed_fields:
+            prospect.updated_at = now
+        changes[changed_fields].append(prospect)
+
+    updated_count = 0
+    for changed_fields, prospects in changes.items():
+        update_fields = [*changed_fields, "content_hash"]
+        if changed_fields:
+            update_fields.append("updated_at")
+            updated_count += len(prospects)
+        Prospect.objects.bulk_update(prospects, fields=update_fields)
+
+    Prospect.objects.bulk_create(new_prospects)
+    unchanged_count = len(prospect_list) - len(new_prospects) - updated_count
+    return len(new_prospects), updated_count, unchanged_count
+
+
+def import_prospects_from_rows(
+    rows: Iterable[dict],
+    industry: str,
+    chunk_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[ImportResult], None] | None = None,
+    result: ImportResult | None = None,
+    executor: Executor | None = None,
+) -> ImportResult:
+    """
+    Upserts prospects from yellow pages CA export rows in fixed-size chunks.
+
+    Rows are consumed lazily, so memory use is bounded by the chunk size
+    and not by the number of rows. Prospects already imported are updated
+    only when their imported fields changed, see `upsert_prospects`.
+
+    Args:
+        rows (Iterable[dict]): Rows keyed by yellow pages CA column names.
+        industry (str): Industry assigned to every imported prospect.
+        chunk_size (int | None): Prospects upserted together,
+            defaults to `settings.PROSPECTS_IMPORT_CHUNK_SIZE`.
+        workers (int | None): Processes normalizing the rows of each chunk,
+            defaults to `settings.PROSPECTS_IMPORT_WORKERS`. With one worker
+            rows are normalized in the current process.
+        progress (Callable | None): Called with the running totals after
+            each chunk is written.
+        result (ImportResult | None): Result to add the totals and stage
+            timings to, a new one by default.
+        executor (Executor | None): Pool of `workers` processes normalizing
+            the rows instead of one started for the import, started with
+            `normalization.init_worker`.
+
+    Returns:
+        ImportResult: Rows read, inserted, updated, unchanged and skipped
+        as duplicates, and the seconds spent in each stage.
+    """
+    chunk_size = chunk_size or settings.PROSPECTS_IMPORT_CHUNK_SIZE
+    workers = workers or settings.PROSPECTS_IMPORT_WORKERS
+
+    if result is None:
+        result = ImportResult()
+
+    def count_read(rows: Iterable[dict]) -> Iterator[dict]:
+        for row in rows:
+            result.rows_read += 1
+            yield row
+
+    seen_phones = set()
+    with ExitStack() as stack:
+        if executor is None and workers > 1:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=workers, initializer=normalization.init_worker
+                )
+            )
+
+        chunks = itertools.batched(count_read(rows), chunk_size)
+        while True:
+            # rows are read lazily, so reading is timed chunk by chunk
+            with result.time_stage("read"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+
+            with result.time_stage("dedup"):
+                chunk, phones_e164 = drop_duplicate_phones(chunk, seen_phones)
+            with result.time_stage("normalization"):
+                if executor:
+                    normalized_rows = normalize_prospect_rows_in_parallel(
+                        chunk, executor=executor, partitions=workers
+                    )
+                else:
+                    normalized_rows = normalize_prospect_rows(chunk)
+
+            with result.time_stage("write"):
+                prospect_list = [
+                    Prospect(**fields, phone_e164=phone_e164, industry=industry)
+                    for fields, phone_e164 in zip(normalized_rows, phones_e164)
+                ]
+                inserted, updated, unchanged = upsert_prospects(prospect_list)
 
+            result.rows_inserted += inserted
+            result.rows_updated += updated
+            result.rows_unchanged += unchanged
+            result.rows_skipped = result.rows_read - (
+                result.rows_inserted + result.rows_updated + result.rows_unchanged
+            )
+            if progress:
+                progress(result)
+    return result
 
-def parse_yellow_pages_ca_address(address: str) -> dict:
+
+def import_prospects_from_file(
+    uploaded_file: UploadedFile,
+    industry: str,
+    chunk_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
     """
-    Parses an address from Yellow Pages Canada and returns a dictionary with city and province.
+    Imports prospects from a yellow pages CA export in any supported format.
+
+    The reader is chosen by the file type, every format then goes through
+    the same column validation, normalization and upsert. The timings and
+    row counts of the import are saved as an `ImportRun`.
 
     Args:
-        address (str): The address string to parse, expected to be in the format "Street, City, Province PostalCode".
+        uploaded_file (UploadedFile): The exported xlsx, csv or parquet file.
+        industry (str): Industry assigned to every imported prospect.
+        chunk_size (int | None): Prospects upserted together.
+        workers (int | None): Processes normalizing rows.
+        progress (Callable | None): Called with the running totals after each chunk.
 
     Returns:
-        dict: A dictionary with keys "city" and "province", containing the parsed city and province from the address.
+        ImportResult: Rows read, inserted, updated, unchanged and skipped
+        as duplicates.
 
     Raises:
-        ValueError: If the address does not contain at least three parts separated by commas, a ValueError will be raised.
+        ValueError: If the file type is not supported or the columns are not correct.
     """
-    parts = address.split(",")
-    if len(parts) < 3:
-        raise ValueError("Address doesn't seem to be yellow pages CA")
-    city = parts[1].strip()
-    province = parts[2].split()[0]
-    return {"city": city, "province": province}
+    file_type = get_import_file_type(uploaded_file)
+    if file_type is None:
+        raise ValueError("Not an xlsx, csv or parquet file")
+
+    read_rows = IMPORT_FILE_READERS[file_type]
+    with record_import_run(
+        source=file_type,
+        industry=industry,
+        file_name=Path(uploaded_file.name).name,
+        file_size=uploaded_file.size,
+    ) as result:
+        with result.time_stage("validation"):
+            rows = read_rows(uploaded_file, required_columns=YELLOW_PAGES_CA_COLUMNS)
+        return import_prospects_from_rows(
+            rows,
+            industry=industry,
+            chunk_size=chunk_size,
+            workers=workers,
+            progress=progress,
+            result=result,
+        )
+
+
+def import_prospects_from_excel(
+    excel_file: UploadedFile,
+    industry: str,
+    chunk_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """
+    Imports prospects from an exported yellow pages CA excel file,
+    see `import_prospects_from_file`.
+
+    Raises:
+        ValueError: If the file is not an excel file or the columns are not correct.
+    """
+    if not is_xlsx(excel_file):
+        raise ValueError("Not an excel file")
+
+    return import_prospects_from_file(
+        excel_file,
+        industry=industry,
+        chunk_size=chunk_size,
+        workers=workers,
+        progress=progress,
+    )
+
+
+def import_prospects_from_html(
+    html_pages: Iterable[str],
+    industry: str,
+    chunk_size: int | None = None,
+    workers: int | None = None,
+    progress: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """
+    Imports prospects from saved or pasted yellow pages CA listing pages.
+
+    Pages are parsed across `workers` processes and the extracted listings
+    stream into the same chunked upsert as exported files, parsing is timed
+    as the read stage of the saved `ImportRun`. Parsing and normalization
+    share one pool, so the import runs `workers` processes and not twice as many.
+
+    Args:
+        html_pages (Iterable[str]): HTML of the yellow pages CA pages.
+        industry (str): Industry assigned to every imported prospect.
+        chunk_size (int | None): Prospects upserted together.
+        workers (int | None): Processes parsing pages and normalizing rows,
+            defaults to `settings.PROSPECTS_IMPORT_WORKERS`.
+        progress (Callable | None): Called with the running totals after each chunk.
+
+    Returns:
+        ImportResult: Rows read, inserted, updated, unchanged and skipped
+        as duplicates.
+    """
+    workers = workers or settings.PROSPECTS_IMPORT_WORKERS
+    with ExitStack() as stack:
+        executor = None
+        if workers > 1:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=workers, initializer=normalization.init_worker
+                )
+            )
+        result = stack.enter_context(
+            record_import_run(source="html", industry=industry)
+        )
+        rows = (
+            business_data.to_yellow_pages_row()
+            for business_data in extract_data_batch(
+                html_pages, workers=workers, executor=executor
+            )
+        )
+        return import_prospects_from_rows(
+            rows,
+            industry=industry,
+            chunk_size=chunk_size,
+            workers=workers,
+            progress=progress,
+            result=result,
+            executor=executor,
+        )
+
+
+def claimable_jobs(stale_minutes: int) -> Q:
+    """
+    Filters the jobs a worker may claim: pending jobs, and running jobs
+    whose worker died, seen by no progress written for `stale_minutes`.
+
+    Workers write progress with `updated_at`, so a running job that
+    wasn't updated for longer than any chunk takes was abandoned, e.g. by
+    a worker killed on deploy.
+    """
+    stale_before = timezone.now() - dt.timedelta(minutes=stale_minutes)
+    return Q(status="pending") | Q(status="running", updated_at__lt=stale_before)
+
+
+def claim_next_import_job() -> ImportJob | None:
+    """
+    Marks the oldest pending import job as running and returns it.
+
+    Pending jobs locked by another worker are skipped, so several workers
+    can poll the same table without picking up the same job. A job left
+    running by a dead worker is claimed again after
+    `settings.IMPORT_JOB_STALE_MINUTES` and imported from the start, its
+    row counts are reset and rows already imported are then unchanged.
+
+    Returns:
+        ImportJob | None: The claimed job, None if no job is pending.
+    """
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.select_for_update(skip_locked=True)
+            .filter(claimable_jobs(settings.IMPORT_JOB_STALE_MINUTES))
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = ImportJob.StatusChoices.RUNNING
+        job.started_at = timezone.now()
+        job.rows_read = 0
+        job.rows_inserted = 0
+        job.rows_updated = 0
+        job.rows_unchanged = 0
+        job.rows_skipped = 0
+        job.save(
+            update_fields=[
+                "status",
+                "started_at",
+                "rows_read",
+                "rows_inserted",
+                "rows_updated",
+                "rows_unchanged",
+                "rows_skipped",
+                "updated_at",
+            ]
+        )
+    return job
+
+
+def run_import_job(job: ImportJob):
+    """
+    Imports the uploaded file of a claimed job, recording progress after
+    every written chunk and the final status when done.
+
+    Args:
+        job (ImportJob): The job returned by `claim_next_import_job`.
+    """
+
+    def record_progress(result: ImportResult):
+        ImportJob.objects.filter(pk=job.pk).update(
+            rows_read=result.rows_read,
+            rows_inserted=result.rows_inserted,
+            rows_updated=result.rows_updated,
+            rows_unchanged=result.rows_unchanged,
+            rows_skipped=result.rows_skipped,
+            updated_at=timezone.now(),
+        )
+
+    try:
+        with job.file.open("rb"):
+            import_prospects_from_file(
+                job.file, industry=job.industry, progress=record_progress
+            )
+    except Exception as error:
+        job.status = ImportJob.StatusChoices.FAILED
+        job.error = str(error)
+    else:
+        job.status = ImportJob.StatusChoices.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+
+
+PURGE_MODELS = {
+    PurgeJob.TargetChoices.CALL_RECORDS: ColdCallRecord,
+    PurgeJob.TargetChoices.PROSPECTS: Prospect,
+}
+"""Model of each purge job stage"""
+
+
+def claim_next_purge_job() -> PurgeJob | None:
+    """
+    Marks the oldest pending purge job as running and returns it.
+
+    A new job counts the rows it is going to delete, a resumed job keeps
+    its stage, position and counts. Pending jobs locked by another worker
+    are skipped. A job left running by a dead worker is resumed after
+    `settings.PURGE_JOB_STALE_MINUTES`.
+
+    Returns:
+        PurgeJob | None: The claimed job, None if no job is pending.
+    """
+    with transaction.atomic():
+        job = (
+            PurgeJob.objects.select_for_update(skip_locked=True)
+            .filter(claimable_jobs(settings.PURGE_JOB_STALE_MINUTES))
+            .order_by("created_at")
+            .first()
+        )
+        if job is None:
+            return None
+
+        if not job.stage:
+            job.stage = job.stages[0]
+            job.rows_total = sum(
+                PURGE_MODELS[stage].objects.count() for stage in job.stages
+            )
+        job.status = PurgeJob.StatusChoices.RUNNING
+        job.error = None
+        job.started_at = job.started_at or timezone.now()
+        job.save(
+            update_fields=[
+                "stage",
+                "rows_total",
+                "status",
+                "error",
+                "started_at",
+                "updated_at",
+            ]
+        )
+    return job
+
+
+def purge_batch(job: PurgeJob) -> bool:
+    """
+    Deletes the next `job.batch_size` rows of the job's stage, by primary
+    key range, and records the new position in the same transaction.
+
+    When the job archives, the rows are first saved to a JSON Lines file
+    in the default storage, loadable with `manage.py loaddata`.
+
+    Args:
+        job (PurgeJob): A running job.
+
+    Returns:
+        bool: False when no row was left to delete.
+    """
+    model = PURGE_MODELS[job.stage]
+    with transaction.atomic():
+        pks = list(
+            model.objects.filter(pk__gt=job.last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[: job.batch_size]
+        )
+        if not pks:
+            return False
+
+        batch = model.objects.filter(pk__gt=job.last_pk, pk__lte=pks[-1])
+        if job.archive:
+            archive_purge_batch(job, batch, pks[0], pks[-1])
+        _, deleted = batch.delete()
+
+        job.last_pk = pks[-1]
+        job.rows_deleted += deleted.get(model._meta.label, 0)
+        PurgeJob.objects.filter(pk=job.pk).update(
+            last_pk=job.last_pk, rows_deleted=job.rows_deleted, updated_at=Now()
+        )
+    return True
+
+
+def archive_purge_batch(job: PurgeJob, batch: QuerySet, first_pk: int, last_pk: int):
+    """
+    Saves the rows of a purge batch to `<job.archive_directory>/<stage>_<first
+    pk>-<last pk>.jsonl`. A batch retried after a failure overwrites its file.
+    """
+    name = f"{job.archive_directory}/{job.stage}_{first_pk}-{last_pk}.jsonl"
+    content = django_serializers.serialize("jsonl", batch.order_by("pk"))
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    default_storage.save(name, ContentFile(content.encode()))
+
+
+def run_purge_job(job: PurgeJob):
+    """
+    Purges the stages of a claimed job batch by batch, from where it
+    stopped, and records the final status when done.
+
+    A failed job keeps its position, queued again it resumes from there.
+
+    Args:
+        job (PurgeJob): The job returned by `claim_next_purge_job`.
+    """
+    try:
+        for stage in job.stages[job.stages.index(job.stage) :]:
+            if stage != job.stage:
+                job.stage = stage
+                job.last_pk = 0
+                job.save(update_fields=["stage", "last_pk", "updated_at"])
+            while purge_batch(job):
+                pass
+    except Exception as error:
+        job.status = PurgeJob.StatusChoices.FAILED
+        job.error = str(error)
+    else:
+        job.status = PurgeJob.StatusChoices.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
 
 
 def extract_city_ca(address: str) -> str:
@@ -120,98 +912,602 @@ def extract_city_ca(address: str) -> str:
     - address (str): The address string to be parsed.
 
     Returns:
-    - str: The concatenated city name extracted from the address.
-
-    Raises:
-    - ValueError: If the city component is missing from the address or cannot be determined.
+    - str: The city name extracted from the address, empty string if not found.
 
     Example:
     >>> extract_city_ca("296 Brock St E, Thunder Bay, ON P7E 4H4")
     'Thunder Bay'
     """
-    parser = AddressParser()
-    result = parser.parse(address)
-
-    # parser returns structure like:
-    # [('296', 'StreetNumber'),
-    #  ('Brock', 'StreetName'),
-    #  ('St', 'StreetType'),
-    #  ('E', 'StreetDirection'),
-    #  ('Thunder', 'Municipality'),
-    #  ('Bay', 'Municipality'),
-    #  ('ON', 'Province'),
-    #  ('P7E', 'PostalCode'),
-    #  ('4H4', 'PostalCode')]
-
-    city = ""
-    for item in result:
-        if item[1] == "Municipality":
-            city += (
-                " " + item[0] if city else item[0]
-            )  # to add space if more than one word
-    return city
+    return normalize_address_ca(address).city
 
 
 def extract_province_ca(address: str) -> str:
-    parser = AddressParser()
-    result = parser.parse(address)
-
-    # parser returns structure like:
-    # [('296', 'StreetNumber'),
-    #  ('Brock', 'StreetName'),
-    #  ('St', 'StreetType'),
-    #  ('E', 'StreetDirection'),
-    #  ('Thunder', 'Municipality'),
-    #  ('Bay', 'Municipality'),
-    #  ('ON', 'Province'),
-    #  ('P7E', 'PostalCode'),
-    #  ('4H4', 'PostalCode')]
-
-    # library thinks city is province if province is missing
-    province_codes = [
-        "AB",
-        "BC",
-        "MB",
-        "NB",
-        "NL",
-        "NT",
-        "NS",
-        "NU",
-        "ON",
-        "PE",
-        "QC",
-        "SK",
-        "YT",
-    ]
-
-    province = ""
-    for item in result:
-        if item[1] == "Province":
-            province = item[0]
-    return province
-
-
-def calls_outcome_no_count():
-    outcome_no_count = ColdCallRecord.objects.filter(outcome="no").count()
-    return outcome_no_count
-
-
-def calls_total_count():
-    calls_count = ColdCallRecord.objects.all().count()
-    return calls_count
-
-
-def prospects_total_count():
-    count = Prospect.objects.all().count()
-    return count
+    """
+    Extracts the province code from a given Canadian address.
+
+    Example:
+    >>> extract_province_ca("296 Brock St E, Thunder Bay, ON P7E 4H4")
+    'ON'
+    """
+    return normalize_address_ca(address).province
+
+
+def prospects_with_call_status(prospects: QuerySet | None = None) -> QuerySet:
+    """
+    Returns prospects annotated with `called` and `conversation` flags,
+    read from the call summary columns instead of the call records.
+
+    Args:
+        prospects (QuerySet | None): Prospects to annotate, all by default.
+    """
+    if prospects is None:
+        prospects = Prospect.objects.all()
+    return prospects.annotate(
+        called=ExpressionWrapper(Q(calls_count__gt=0), output_field=BooleanField()),
+        conversation=F("had_conversation"),
+    )
+
+
+PROSPECT_SEARCH_FIELDS = ["business_name", "city", "industry", "street_address"]
+
 
+def search_prospects(query: str, limit: int = 10) -> list[dict]:
+    """
+    Searches prospects by business name, city, industry, street address
+    and phone number, for search-as-you-type.
+
+    Every word of the query must match one of the fields, words of digits
+    also match the E.164 phone number. On PostgreSQL the lookups are served
+    by trigram indexes, see migration 0008. Results are cached per query for
+    `settings.PROSPECT_SEARCH_CACHE_TIMEOUT` seconds, so repeated prefixes
+    while typing don't hit the database.
+
+    Args:
+        query (str): The text typed by the user.
+        limit (int): Maximum number of prospects returned.
+
+    Returns:
+        list[dict]: Id, business name, city, industry and phone number
+        of the matching prospects, by business name.
+    """
+    words = query.lower().split()
+    if not words:
+        return []
+
+    cache_key = search_prospects_cache_key(words, limit)
+    results = cache.get(cache_key)
+    if results is not None:
+        return results
+
+    results = list(search_prospects_queryset(words, limit))
+    cache.set(cache_key, results, timeout=settings.PROSPECT_SEARCH_CACHE_TIMEOUT)
+    return results
+
+
+async def asearch_prospects(query: str, limit: int = 10) -> list[dict]:
+    """
+    Async version of `search_prospects`.
+    """
+    words = query.lower().split()
+    if not words:
+        return []
+
+    cache_key = search_prospects_cache_key(words, limit)
+    results = await cache.aget(cache_key)
+    if results is not None:
+        return results
+
+    results = [row async for row in search_prospects_queryset(words, limit)]
+    await cache.aset(cache_key, results, timeout=settings.PROSPECT_SEARCH_CACHE_TIMEOUT)
+    return results
 
-def calls_today_count():
-    today = dt.date.today()
-    count = ColdCallRecord.objects.filter(date__date=today).count()
+
+def search_prospects_cache_key(words: list[str], limit: int) -> str:
+    return (
+        f"prospect_search:{limit}:{hashlib.md5(' '.join(words).encode()).hexdigest()}"
+    )
+
+
+def search_prospects_queryset(words: list[str], limit: int) -> QuerySet:
+    """
+    Returns the values of the prospects matching every word, see
+    `search_prospects`.
+    """
+    prospects = Prospect.objects.all()
+    for word in words:
+        prospects = prospects.filter(prospect_search_condition(word))
+
+    return prospects.order_by("business_name", "pk").values(
+        "id", "business_name", "city", "industry", "phone_number"
+    )[:limit]
+
+
+def prospect_search_condition(word: str) -> Q:
+    """
+    Matches the prospects with a search word in one of the trigram indexed
+    fields, phone numbers by their digits in `phone_e164`.
+    """
+    condition = Q()
+    for field in PROSPECT_SEARCH_FIELDS:
+        condition |= Q(**{f"{field}__icontains": word})
+    digits = "".join(character for character in word if character.isdigit())
+    if len(digits) >= 3:
+        condition |= Q(phone_e164__contains=digits)
+    return condition
+
+
+def find_prospect_by_phone(phone: str) -> Prospect | None:
+    """
+    Finds the prospect with the given phone number, e.g. an inbound caller ID.
+
+    The phone number is normalized to E.164 and looked up through the unique
+    index on `Prospect.phone_e164`. Found prospects are cached in the
+    shared cache for `settings.PHONE_LOOKUP_CACHE_TIMEOUT` seconds, saving
+    or deleting the prospect drops its cache entry.
+
+    Args:
+        phone (str): Phone number in any format.
+
+    Returns:
+        Prospect | None: The prospect annotated like `prospects_with_call_status`,
+        None if no prospect has the phone number.
+    """
+    phone_e164 = normalize_phone_ca(phone)
+    if phone_e164 is None:
+        return None
+
+    cache_key = Prospect.phone_lookup_cache_key(phone_e164)
+    prospect = shared_cache().get(cache_key)
+    if prospect is None:
+        prospect = prospects_with_call_status().filter(phone_e164=phone_e164).first()
+        if prospect is not None:
+            shared_cache().set(
+                cache_key, prospect, timeout=settings.PHONE_LOOKUP_CACHE_TIMEOUT
+            )
+    return prospect
+
+
+async def afind_prospect_by_phone(phone: str) -> Prospect | None:
+    """
+    Async version of `find_prospect_by_phone`.
+    """
+    phone_e164 = normalize_phone_ca(phone)
+    if phone_e164 is None:
+        return None
+
+    cache_key = Prospect.phone_lookup_cache_key(phone_e164)
+    prospect = await shared_cache().aget(cache_key)
+    if prospect is None:
+        prospect = (
+            await prospects_with_call_status().filter(phone_e164=phone_e164).afirst()
+        )
+        if prospect is not None:
+            await shared_cache().aset(
+                cache_key, prospect, timeout=settings.PHONE_LOOKUP_CACHE_TIMEOUT
+            )
+    return prospect
+
+
+def backfill_phone_e164(batch_size: int = 1000) -> tuple[int, int]:
+    """
+    Fills `Prospect.phone_e164` of prospects saved before it existed.
+
+    Prospects are processed in primary key order, one `bulk_update` per
+    batch. A prospect whose E.164 phone number is already taken by another
+    prospect is a duplicate and is left without one.
+
+    Args:
+        batch_size (int): Prospects normalized and updated together.
+
+    Returns:
+        tuple[int, int]: Number of prospects filled and duplicates left empty.
+    """
+    filled_count = 0
+    duplicate_count = 0
+    last_pk = 0
+    while True:
+        prospects = list(
+            Prospect.objects.filter(
+                pk__gt=last_pk, phone_e164__isnull=True, phone_number__isnull=False
+            )
+            .order_by("pk")
+            .only("pk", "phone_number")[:batch_size]
+        )
+        if not prospects:
+            return filled_count, duplicate_count
+        last_pk = prospects[-1].pk
+
+        phones_e164 = normalize_phones_ca(p.phone_number for p in prospects)
+        taken_phones = set(
+            Prospect.objects.filter(phone_e164__in=phones_e164).values_list(
+                "phone_e164", flat=True
+            )
+        )
+        filled = []
+        for prospect, phone_e164 in zip(prospects, phones_e164):
+            if phone_e164 is None:
+                continue
+            if phone_e164 in taken_phones:
+                duplicate_count += 1
+                continue
+            taken_phones.add(phone_e164)
+            prospect.phone_e164 = phone_e164
+            filled.append(prospect)
+        Prospect.objects.bulk_update(filled, fields=["phone_e164"])
+        filled_count += len(filled)
+
+
+def rebuild_call_summaries(batch_size: int = 1000) -> int:
+    """
+    Recomputes the call summary columns of all prospects from their call
+    records, e.g. after call records were written with raw SQL.
+
+    Prospects are updated in primary key ranges of `batch_size`, one
+    UPDATE per range, so no long-running transaction locks the table.
+
+    Args:
+        batch_size (int): Width of the primary key ranges.
+
+    Returns:
+        int: Number of updated prospects.
+    """
+    pk_range = Prospect.objects.aggregate(min_pk=Min("pk"), max_pk=Max("pk"))
+    if pk_range["min_pk"] is None:
+        return 0
+
+    updated_count = 0
+    for start in range(pk_range["min_pk"], pk_range["max_pk"] + 1, batch_size):
+        updated_count += Prospect.objects.filter(
+            pk__gte=start, pk__lt=start + batch_size
+        ).refresh_call_summary()
+    return updated_count
+
+
+@dataclass(frozen=True)
+class DashboardStats:
+    outcome_no_count: int
+    calls_total_count: int
+    calls_today_count: int
+    prospects_total_count: int
+
+
+def local_day_range(day: dt.date | None = None) -> tuple[dt.datetime, dt.datetime]:
+    """
+    Returns the start and end of a day in the current time zone, to filter
+    a datetime column with a range instead of casting it to a date.
+
+    Args:
+        day (dt.date | None): The day, today in the current time zone by default.
+
+    Returns:
+        tuple[dt.datetime, dt.datetime]: Aware start of the day and start
+        of the next day.
+    """
+    day = day or timezone.localdate()
+    start = timezone.make_aware(dt.datetime.combine(day, dt.time.min))
+    end = timezone.make_aware(
+        dt.datetime.combine(day + dt.timedelta(days=1), dt.time.min)
+    )
+    return start, end
+
+
+def get_dashboard_stats() -> DashboardStats:
+    """
+    Returns the counters of the prospects page header.
+
+    All counters come from a single conditional aggregate query, the
+    prospects count rides along as a scalar subquery. The result is cached
+    until a call record or prospect is written, see
+    `models.invalidate_dashboard_stats`, or for
+    `settings.DASHBOARD_STATS_CACHE_TIMEOUT` seconds at most.
+
+    Returns:
+        DashboardStats: Calls with outcome "no", all calls, today's calls
+        and all prospects.
+    """
+    today = timezone.localdate()
+    cached = shared_cache().get(DASHBOARD_STATS_CACHE_KEY)
+    if cached is not None and cached["day"] == today:
+        return cached["stats"]
+
+    counts = ColdCallRecord.objects.aggregate(**dashboard_stats_aggregates(today))
+    if counts["prospects_total_count"] is None:
+        # no call records to aggregate, or no prospects
+        counts["prospects_total_count"] = (
+            Prospect.objects.count() if not counts["calls_total_count"] else 0
+        )
+
+    stats = DashboardStats(**counts)
+    shared_cache().set(
+        DASHBOARD_STATS_CACHE_KEY,
+        {"day": today, "stats": stats},
+        timeout=settings.DASHBOARD_STATS_CACHE_TIMEOUT,
+    )
+    return stats
+
+
+async def aget_dashboard_stats() -> DashboardStats:
+    """
+    Async version of `get_dashboard_stats`.
+    """
+    today = timezone.localdate()
+    cached = await shared_cache().aget(DASHBOARD_STATS_CACHE_KEY)
+    if cached is not None and cached["day"] == today:
+        return cached["stats"]
+
+    counts = await ColdCallRecord.objects.aaggregate(
+        **dashboard_stats_aggregates(today)
+    )
+    if counts["prospects_total_count"] is None:
+        counts["prospects_total_count"] = (
+            await Prospect.objects.acount() if not counts["calls_total_count"] else 0
+        )
+
+    stats = DashboardStats(**counts)
+    await shared_cache().aset(
+        DASHBOARD_STATS_CACHE_KEY,
+        {"day": today, "stats": stats},
+        timeout=settings.DASHBOARD_STATS_CACHE_TIMEOUT,
+    )
+    return stats
+
+
+def dashboard_stats_aggregates(today: dt.date) -> dict:
+    """
+    Returns the aggregates of call records computing `DashboardStats`.
+    """
+    today_start, today_end = local_day_range(today)
+    prospects_count = Prospect.objects.order_by().values(
+        count=Func("pk", function="COUNT")
+    )
+    return {
+        "outcome_no_count": Count("pk", filter=Q(outcome="no")),
+        "calls_total_count": Count("pk"),
+        "calls_today_count": Count(
+            "pk", filter=Q(date__gte=today_start, date__lt=today_end)
+        ),
+        # aggregated so it's a column of the same single row
+        "prospects_total_count": Max(Subquery(prospects_count)),
+    }
+
+
+def cached_prospects_count(prospects: QuerySet, filters: dict) -> int:
+    """
+    Counts the filtered prospects, cached for
+    `settings.PROSPECTS_COUNT_CACHE_TIMEOUT` seconds per set of filters.
+
+    Args:
+        prospects (QuerySet): The filtered prospects.
+        filters (dict): The filter values, the cache key is built from them.
+
+    Returns:
+        int: Number of prospects.
+    """
+    return cache.get_or_set(
+        prospects_count_cache_key(filters),
+        prospects.count,
+        timeout=settings.PROSPECTS_COUNT_CACHE_TIMEOUT,
+    )
+
+
+async def acached_prospects_count(prospects: QuerySet, filters: dict) -> int:
+    """
+    Async version of `cached_prospects_count`.
+    """
+    cache_key = prospects_count_cache_key(filters)
+    count = await cache.aget(cache_key)
+    if count is None:
+        count = await prospects.acount()
+        await cache.aset(
+            cache_key, count, timeout=settings.PROSPECTS_COUNT_CACHE_TIMEOUT
+        )
     return count
 
 
+def prospects_count_cache_key(filters: dict) -> str:
+    filters_key = urllib.parse.urlencode(sorted(filters.items()), doseq=True)
+    return f"prospects_count:{hashlib.md5(filters_key.encode()).hexdigest()}"
+
+
+PROVINCE_TIME_ZONES = {
+    "NL": ZoneInfo("America/St_Johns"),
+    "NS": ZoneInfo("America/Halifax"),
+    "NB": ZoneInfo("America/Halifax"),
+    "PE": ZoneInfo("America/Halifax"),
+    "QC": ZoneInfo("America/Toronto"),
+    "ON": ZoneInfo("America/Toronto"),
+    "NU": ZoneInfo("America/Toronto"),
+    "MB": ZoneInfo("America/Winnipeg"),
+    "SK": ZoneInfo("America/Regina"),
+    "AB": ZoneInfo("America/Edmonton"),
+    "NT": ZoneInfo("America/Edmonton"),
+    "BC": ZoneInfo("America/Vancouver"),
+    "YT": ZoneInfo("America/Whitehorse"),
+}
+"""Time zone of each province, of its most populated part"""
+
+
+def provinces_in_calling_hours(now: dt.datetime | None = None) -> list[str]:
+    """
+    Returns the provinces where it's currently a weekday within
+    `settings.DIALER_CALLING_HOURS`.
+
+    Args:
+        now (dt.datetime | None): Aware current time, now by default.
+
+    Returns:
+        list[str]: Province codes.
+    """
+    now = now or timezone.now()
+    start_hour, end_hour = settings.DIALER_CALLING_HOURS
+    provinces = []
+    for province, time_zone in PROVINCE_TIME_ZONES.items():
+        local_now = now.astimezone(time_zone)
+        if local_now.weekday() < 5 and start_hour <= local_now.hour < end_hour:
+            provinces.append(province)
+    return provinces
+
+
+def claim_next_prospect(
+    caller: str, prospects: QuerySet | None = None, now: dt.datetime | None = None
+) -> Prospect | None:
+    """
+    Hands the next uncalled prospect to the caller, leased for
+    `settings.DIALER_CLAIM_MINUTES` minutes.
+
+    Only prospects in provinces within calling hours and without a
+    current claim are handed out. The candidate row is locked with
+    SELECT ... FOR UPDATE SKIP LOCKED, so concurrent callers skip each
+    other's candidates instead of waiting or getting the same prospect.
+    The caller's previous claim is released.
+
+    Args:
+        caller (str): Name of the caller.
+        prospects (QuerySet | None): Prospects matching the caller's filters,
+            all by default.
+        now (dt.datetime | None): Aware current time, now by default.
+
+    Returns:
+        Prospect | None: The claimed prospect, None if no prospect is available.
+    """
+    if prospects is None:
+        prospects = Prospect.objects.all()
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        prospect = (
+            prospects.filter(
+                Q(claim_expires_at__isnull=True) | Q(claim_expires_at__lte=now),
+                calls_count=0,
+                province__in=provinces_in_calling_hours(now),
+            )
+            .order_by("pk")
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        if prospect is None:
+            return None
+
+        Prospect.objects.filter(claimed_by=caller, claim_expires_at__gt=now).update(
+            claimed_by=None, claim_expires_at=None, updated_at=Now()
+        )
+        prospect.claimed_by = caller
+        prospect.claim_expires_at = now + dt.timedelta(
+            minutes=settings.DIALER_CLAIM_MINUTES
+        )
+        Prospect.objects.filter(pk=prospect.pk).update(
+            claimed_by=prospect.claimed_by,
+            claim_expires_at=prospect.claim_expires_at,
+            updated_at=Now(),
+        )
+    return prospect
+
+
+def validate_existence_status(existence_status: str):
+    """
+    Raises ValueError when the status is not one of
+    `Prospect.ExistenceChoices`, without querying the database.
+    """
+    if existence_status not in Prospect.ExistenceChoices.values:
+        raise ValueError(f"Invalid existence status: {existence_status}")
+
+
+def set_existence_status(prospects: QuerySet, existence_status: str) -> int:
+    """
+    Sets the existence status of the prospects in one UPDATE that writes
+    only `existence_status` and `updated_at`.
+
+    Args:
+        prospects (QuerySet): Prospects to update.
+        existence_status (str): Value of `Prospect.ExistenceChoices`.
+
+    Returns:
+        int: Number of updated prospects.
+    """
+    validate_existence_status(existence_status)
+    return prospects.update(existence_status=existence_status, updated_at=Now())
+
+
+def update_existence_statuses(statuses: dict[int, str]) -> int:
+    """
+    Sets the existence status of many prospects, with one UPDATE
+    per status value. Nothing is updated when any status is not valid.
+
+    Args:
+        statuses (dict[int, str]): Existence status by prospect ID.
+
+    Returns:
+        int: Number of updated prospects.
+    """
+    ids_by_status = defaultdict(list)
+    for prospect_id, existence_status in statuses.items():
+        validate_existence_status(existence_status)
+        ids_by_status[existence_status].append(prospect_id)
+
+    updated = 0
+    with transaction.atomic():
+        for existence_status, prospect_ids in ids_by_status.items():
+            updated += set_existence_status(
+                Prospect.objects.filter(pk__in=prospect_ids), existence_status
+            )
+    return updated
+
+
+CALL_RECORDS_EXPORT_FIELDS = {
+    "date": "date",
+    "business_name": "prospect__business_name",
+    "phone_number": "prospect__phone_number",
+    "city": "prospect__city",
+    "pick_up_status": "pick_up_status",
+    "had_owner_conversation": "had_owner_conversation",
+    "outcome": "outcome",
+    "my_area_code_city": "my_area_code_city",
+    "product_selling": "product_selling",
+    "opening": "opening",
+    "objection": "objection",
+    "note": "note",
+}
+"""Columns of the call records export and the fields they are read from"""
+
+
+class Echo:
+    """
+    File-like object returning what is written to it, so `csv.writer`
+    formats rows without buffering them.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+async def aiter_call_records_csv(call_records: QuerySet) -> AsyncIterator[str]:
+    """
+    Streams the call records as CSV lines, header first.
+
+    Rows are read through a server-side cursor on databases supporting it,
+    `settings.CALL_RECORDS_EXPORT_CHUNK_SIZE` at a time, so memory use
+    doesn't grow with the number of records. The iterator is async, under
+    ASGI a sync one is read into a list before the response is sent.
+
+    Args:
+        call_records (QuerySet): Call records to export.
+
+    Returns:
+        AsyncIterator[str]: CSV lines.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(CALL_RECORDS_EXPORT_FIELDS.keys())
+    fields = list(CALL_RECORDS_EXPORT_FIELDS.values())
+    # values(), the aiterator() of values_list() runs its query in the event loop
+    rows = (
+        call_records.order_by("-pk")
+        .values(*fields)
+        .aiterator(chunk_size=settings.CALL_RECORDS_EXPORT_CHUNK_SIZE)
+    )
+    async for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
 def get_city_local_times():
     """
     This function returns the current local times for five
@@ -254,3 +1550,153 @@ def get_city_local_times():
     )
 
     return city_times
+
+
+CALL_ROLLUP_WATERMARK = "call_daily_rollup"
+"""Name of the `CallRollupWatermark` of `refresh_call_rollups`"""
+
+
+def refresh_call_rollups(full: bool = False) -> int:
+    """
+    Recomputes the daily call rollups of the days with call records
+    updated since the watermark, and of the days marked stale by
+    deletions or records moved to another day.
+
+    Each day is replaced as a whole, from a range scan of its call records,
+    `settings.CALL_ROLLUP_DAYS_PER_BATCH` days per transaction. The new
+    watermark lags the start of the refresh by
+    `settings.CALL_ROLLUP_WATERMARK_OVERLAP_SECONDS`, so records committed
+    while refreshing are counted on the next refresh.
+
+    Args:
+        full (bool): Rebuild the rollups of every day.
+
+    Returns:
+        int: Number of days recomputed.
+    """
+    watermark, _ = CallRollupWatermark.objects.get_or_create(name=CALL_ROLLUP_WATERMARK)
+    refresh_started_at = timezone.now()
+    call_records = ColdCallRecord.objects.exclude(date=None)
+
+    stale_days = dict(CallRollupStaleDay.objects.values_list("day", "pk"))
+    if full or watermark.watermark is None:
+        CallDailyRollup.objects.all().delete()
+        days = call_records._local_days()
+    else:
+        days = call_records.filter(updated_at__gt=watermark.watermark)._local_days()
+        days |= set(stale_days)
+
+    days = sorted(days)
+    for start in range(0, len(days), settings.CALL_ROLLUP_DAYS_PER_BATCH):
+        with transaction.atomic():
+            replace_call_rollups(
+                days[start : start + settings.CALL_ROLLUP_DAYS_PER_BATCH]
+            )
+
+    # days marked stale meanwhile stay for the next refresh
+    CallRollupStaleDay.objects.filter(pk__in=stale_days.values()).delete()
+    watermark.watermark = refresh_started_at - dt.timedelta(
+        seconds=settings.CALL_ROLLUP_WATERMARK_OVERLAP_SECONDS
+    )
+    watermark.refreshed_at = timezone.now()
+    watermark.save()
+    return len(days)
+
+
+def replace_call_rollups(days: list[dt.date]):
+    """
+    Replaces the rollups of the days with the counts of their call records.
+    """
+    day_ranges = Q()
+    for day in days:
+        start, end = local_day_range(day)
+        day_ranges |= Q(date__gte=start, date__lt=end)
+
+    rows = (
+        ColdCallRecord.objects.filter(day_ranges)
+        .annotate(day=TruncDate("date"))
+        .values("day", *CallDailyRollup.DIMENSIONS)
+        .annotate(
+            calls=Count("pk"),
+            picked_up=Count("pk", filter=Q(pick_up_status="yes")),
+            conversations=Count("pk", filter=Q(had_owner_conversation=True)),
+            yes_outcomes=Count("pk", filter=Q(outcome="yes")),
+            meetings=Count("pk", filter=Q(outcome="meeting")),
+        )
+        .order_by()
+    )
+    # missing values are stored empty, merging them with empty values
+    rollups = {}
+    for row in rows:
+        key = (row["day"], *(row[field] or "" for field in CallDailyRollup.DIMENSIONS))
+        rollup = rollups.setdefault(
+            key,
+            CallDailyRollup(
+                **dict(zip(["day", *CallDailyRollup.DIMENSIONS], key)),
+            ),
+        )
+        for count in CallFunnel.COUNTS:
+            setattr(rollup, count, getattr(rollup, count) + row[count])
+
+    CallDailyRollup.objects.filter(day__in=days).delete()
+    CallDailyRollup.objects.bulk_create(rollups.values())
+
+
+@dataclass(frozen=True)
+class CallFunnel:
+    """
+    Calls of a dimension value and how many got through each funnel stage.
+    """
+
+    COUNTS = ["calls", "picked_up", "conversations", "yes_outcomes", "meetings"]
+
+    value: str
+    calls: int
+    picked_up: int
+    conversations: int
+    yes_outcomes: int
+    meetings: int
+
+    def percent_of_calls(self, count: int) -> float:
+        return 100 * count / self.calls if self.calls else 0
+
+    @property
+    def picked_up_percent(self) -> float:
+        return self.percent_of_calls(self.picked_up)
+
+    @property
+    def conversations_percent(self) -> float:
+        return self.percent_of_calls(self.conversations)
+
+    @property
+    def yes_outcomes_percent(self) -> float:
+        return self.percent_of_calls(self.yes_outcomes)
+
+    @property
+    def meetings_percent(self) -> float:
+        return self.percent_of_calls(self.meetings)
+
+
+def call_funnel_sums() -> dict:
+    return {count: Sum(count, default=0) for count in CallFunnel.COUNTS}
+
+
+def call_funnels_queryset(rollups: QuerySet, dimension: str) -> QuerySet:
+    """
+    Returns the funnel counts of the rollups grouped by a dimension, the
+    most called values first, as dicts of `CallFunnel` fields.
+
+    Args:
+        rollups (QuerySet): Daily rollups, e.g. of a date range.
+        dimension (str): One of `CallDailyRollup.DIMENSIONS`.
+
+    Raises:
+        ValueError: If the dimension is not a rollup dimension.
+    """
+    if dimension not in CallDailyRollup.DIMENSIONS:
+        raise ValueError(f"Not a call dimension: {dimension}")
+    return (
+        rollups.values(value=F(dimension))
+        .annotate(**call_funnel_sums())
+        .order_by("-calls", "value")
+    )
@@ -0,0 +1,357 @@
+import datetime as dt
+import re
+from collections import Counter
+from collections.abc import Callable
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from home import services
+from home.models import ColdCallRecord, ImportJob, ImportRun, Prospect, PurgeJob
+
+SIZES = [1, 5, 20]
+"""Rows seeded per model, the query count must not grow with them"""
+
+
+def seed(size: int):
+    """
+    Creates `size` prospects with two calls each, import jobs and import runs.
+    """
+    prospects = Prospect.objects.bulk_create(
+        Prospect(
+            business_name=f"Cafe {index}",
+            industry="Cafe",
+            phone_number=f"416-555-{index:04}",
+            phone_e164=f"+1416555{index:04}",
+            city="Toronto",
+            province="ON",
+        )
+        for index in range(size)
+    )
+    ColdCallRecord.objects.bulk_create(
+        ColdCallRecord(
+            prospect=prospect,
+            date=dt.datetime(2024, 5, 1, tzinfo=dt.UTC),
+            had_owner_conversation=call == 0,
+            outcome="no",
+        )
+        for prospect in prospects
+        for call in range(2)
+    )
+    ImportJob.objects.bulk_create(
+        ImportJob(file=f"imports/export_{index}.xlsx", industry="Cafe")
+        for index in range(size)
+    )
+    ImportRun.objects.bulk_create(
+        ImportRun(source="xlsx", industry="Cafe", rows_read=index)
+        for index in range(size)
+    )
+
+
+def read_streaming_content(response) -> bytes:
+    """
+    Reads a streaming response as the server does, the rows it streams
+    are queried while it is read.
+    """
+    if not response.is_async:
+        return b"".join(response.streaming_content)
+
+    async def read():
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    return async_to_sync(read)()
+
+
+SAVEPOINT_SQL = re.compile(r"(RELEASE |ROLLBACK TO )?SAVEPOINT ")
+"""Transaction bookkeeping of atomic blocks, not counted as queries"""
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Replaces literals in the SQL, so the same query with other
+    parameters is counted as the same query.
+    """
+    sql = re.sub(r"'[^']*'", "?", sql)
+    sql = re.sub(r"\b\d+\b", "?", sql)
+    return re.sub(r"IN \([?, ]+\)", "IN (...)", sql)
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+)
+@modify_settings(MIDDLEWARE={"remove": ["silk.middleware.SilkyMiddleware"]})
+class QueryBudgetTestCase(TestCase):
+    """
+    Asserts that requests stay within a query budget whatever the number
+    of rows, see `assert_query_budget`.
+
+    The silk profiler is removed, its own queries are not the views' queries.
+    """
+
+    def capture_queries(
+        self, size: int, url: Callable[[], str], method: str, data: dict
+    ) -> tuple[str, list]:
+        with transaction.atomic():
+            seed(size)
+            cache.clear()
+            url = url()
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(self.client, method)(url, data)
+                if response.streaming:
+                    read_streaming_content(response)
+            transaction.set_rollback(True)
+
+        self.assertLess(response.status_code, 400, url)
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if not SAVEPOINT_SQL.match(query["sql"])
+        ]
+        return url, queries
+
+    def assert_query_budget(
+        self, url, budget: int, method: str = "get", data: dict | None = None
+    ):
+        """
+        Requests the url after seeding each of `SIZES` rows and fails when a
+        request runs more than `budget` queries, or more queries for more rows.
+
+        Args:
+            url (Callable[[], str]): Returns the url, called after seeding,
+                so it can point to seeded rows.
+            budget (int): Maximum number of queries.
+            method (str): Test client method.
+            data (dict | None): Query params or form data.
+        """
+        queries_by_size = {}
+        for size in SIZES:
+            path, queries_by_size[size] = self.capture_queries(
+                size, url, method, data or {}
+            )
+        smallest, largest = queries_by_size[SIZES[0]], queries_by_size[SIZES[-1]]
+        grown = Counter(map(normalize_sql, largest)) - Counter(
+            map(normalize_sql, smallest)
+        )
+        counts = {size: len(queries) for size, queries in queries_by_size.items()}
+
+        message = f"{path} queries by seeded rows: {counts}\n" + "\n".join(
+            f"+{count} {sql}" for sql, count in grown.items()
+        )
+        self.assertFalse(grown, message)
+        self.assertLessEqual(max(counts.values()), budget, message)
+
+
+class ViewsQueryBudgetTest(QueryBudgetTestCase):
+    def first_prospect_id(self) -> int:
+        return Prospect.objects.order_by("pk").values_list("pk", flat=True).first()
+
+    def first_import_job_id(self) -> int:
+        return ImportJob.objects.order_by("pk").values_list("pk", flat=True).first()
+
+    def test_home(self):
+        self.assert_query_budget(lambda: reverse("home:home"), 0)
+
+    # reading and writing the shared cache's entry of the dashboard stats
+    # or a phone lookup on a miss: read, cull count, key check and insert
+    SHARED_CACHE_MISS = 4
+
+    def test_prospects_list(self):
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-list"), 2 + self.SHARED_CACHE_MISS
+        )
+
+    def test_prospects_list_filtered(self):
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-list"),
+            2 + self.SHARED_CACHE_MISS,
+            data={"called": "true", "conversation": "true", "province": "ON"},
+        )
+
+    def test_prospects_fragments(self):
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-cards"), 1, data={"province": "ON"}
+        )
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-stats"),
+            1 + self.SHARED_CACHE_MISS,
+            data={"province": "ON"},
+        )
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-count"), 1, data={"province": "ON"}
+        )
+        self.assert_query_budget(
+            lambda: reverse("home:prospect-card", args=[self.first_prospect_id()]), 1
+        )
+
+    def test_prospects_export(self):
+        # the rows are read while the file is written, before the response
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-export", args=["parquet"]), 1
+        )
+
+    def test_prospects_export_csv(self):
+        # the rows are read while the response is streamed
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-export", args=["csv"]), 1
+        )
+
+    def test_call_records_export(self):
+        self.assert_query_budget(lambda: reverse("home:call-records-export"), 1)
+
+    def test_prospects_lookup(self):
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-lookup"),
+            1 + self.SHARED_CACHE_MISS,
+            data={"phone": "4165550000"},
+        )
+
+    def test_prospects_search(self):
+        self.assert_query_budget(
+            lambda: reverse("home:prospects-search"), 1, data={"q": "cafe"}
+        )
+
+    def test_dialer(self):
+        # the caller's name is kept in the session from the first request on
+        self.client.post(reverse("home:dialer-next"), {"caller": "Ann"})
+
+        self.assert_query_budget(lambda: reverse("home:dialer"), 1)
+        self.assert_query_budget(
+            lambda: reverse("home:dialer-next"),
+            6,
+            method="post",
+            data={"caller": "Ann", "province": "ON"},
+        )
+
+    def test_api(self):
+        # the page, its ETag is built from the page's rows
+        self.assert_query_budget(lambda: reverse("home:api-prospect-list"), 1)
+        self.assert_query_budget(
+            lambda: reverse("home:api-prospect-list"),
+            1,
+            data={"called": "true", "fields": "id,has_been_called"},
+        )
+        self.assert_query_budget(lambda: reverse("home:api-call-record-list"), 1)
+        self.assert_query_budget(
+            lambda: reverse(
+                "home:api-prospect-detail", args=[self.first_prospect_id()]
+            ),
+            1,
+        )
+
+    def test_prospects_import_forms(self):
+        self.assert_query_budget(lambda: reverse("home:prospects-import-excel"), 0)
+        self.assert_query_budget(lambda: reverse("home:prospects-import-html"), 0)
+
+    def test_import_job(self):
+        self.assert_query_budget(
+            lambda: reverse(
+                "home:import-job-detail", args=[self.first_import_job_id()]
+            ),
+            1,
+        )
+        self.assert_query_budget(
+            lambda: reverse(
+                "home:import-job-progress", args=[self.first_import_job_id()]
+            ),
+            1,
+        )
+
+    def test_prospect_call_record_create(self):
+        self.assert_query_budget(
+            lambda: reverse(
+                "home:prospects--call-record-create", args=[self.first_prospect_id()]
+            ),
+            2,
+        )
+
+    def test_call_records(self):
+        self.assert_query_budget(lambda: reverse("home:call-records"), 1)
+        self.assert_query_budget(
+            lambda: reverse("home:call-records"),
+            1,
+            data={"outcome": "no", "date_after": "2024-05-01"},
+        )
+
+    def test_analytics(self):
+        def url():
+            services.refresh_call_rollups()
+            return reverse("home:analytics")
+
+        # funnels, totals and the watermark
+        self.assert_query_budget(url, 3)
+        self.assert_query_budget(
+            url, 3, data={"dimension": "outcome", "day_after": "2024-05-01"}
+        )
+
+    def test_call_record_create(self):
+        self.assert_query_budget(lambda: reverse("home:call-records-create"), 1)
+
+    def test_call_records_delete_all(self):
+        # the rows are deleted by the purge worker
+        self.assert_query_budget(lambda: reverse("home:call-records-delete-all"), 1)
+
+    def test_prospects_delete_all(self):
+        self.assert_query_budget(lambda: reverse("home:prospects-delete-all"), 1)
+
+    def test_purge_job(self):
+        def url(view):
+            purge_job = PurgeJob.objects.create(target=PurgeJob.TargetChoices.PROSPECTS)
+            return reverse(view, args=[purge_job.id])
+
+        self.assert_query_budget(lambda: url("home:purge-job-detail"), 1)
+        self.assert_query_budget(lambda: url("home:purge-job-progress"), 1)
+
+    def test_update_existence_status(self):
+        self.assert_query_budget(
+            lambda: reverse("home:htmx", args=["update_existence_status"])
+            + f"?existence_status=exists&prospect_id={self.first_prospect_id()}",
+            1,
+        )
+
+    def test_prospects_existence_status_update(self):
+        prospect_ids = []
+
+        def url():
+            # every seeded prospect, the form data is read after seeding
+            prospect_ids[:] = Prospect.objects.values_list("pk", flat=True)
+            return reverse("home:prospects-existence-status-update")
+
+        self.assert_query_budget(
+            url,
+            1,
+            method="post",
+            data={"prospect_id": prospect_ids, "existence_status": "exists"},
+        )
+
+
+class AdminQueryBudgetTest(QueryBudgetTestCase):
+    def setUp(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(user)
+
+    def test_changelists(self):
+        # session, user, count, filtered count and the page, plus one
+        # query per list_filter field without choices
+        budgets = {
+            Prospect: 5,
+            ColdCallRecord: 5,
+            ImportJob: 5,
+            ImportRun: 7,
+            PurgeJob: 5,
+        }
+        for model, budget in budgets.items():
+            with self.subTest(model=model.__name__):
+                self.assert_query_budget(
+                    lambda: reverse(f"admin:home_{model._meta.model_name}_changelist"),
+                    budget,
+                )
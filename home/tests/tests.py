@@ -1,13 +1,51 @@
-from io import BytesIO
+import asyncio
+import datetime as dt
+import importlib
+import json
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO, StringIO
+from pathlib import Path
 from unittest import TestCase as UnittestTestCase
+from unittest import mock
 
+import openpyxl
 import pandas as pd
+import pyarrow.parquet as pq
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase as DjangoTestCase
+from django.test import modify_settings, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
 
-from home import services
-from home.business_data_extractor.extractor import extract_data
-from home.models import ColdCallRecord, Prospect
+from home import benchmark, query_plans, services, views
+from home.business_data_extractor.extractor import (
+    extract_data,
+    extract_data_batch,
+    read_html_pages,
+)
+from home.models import (
+    DASHBOARD_STATS_CACHE_KEY,
+    CallDailyRollup,
+    CallRollupStaleDay,
+    ColdCallRecord,
+    ImportJob,
+    ImportRun,
+    Prospect,
+    PurgeJob,
+)
+from home.pagination import KeysetPaginator
 from home.services import (
     import_prospects_from_excel,
     parse_yellow_pages_ca_address,
@@ -15,6 +53,18 @@ from home.services import (
 from home.utils import parse_website_url
 
 
+def read_async_stream(response) -> bytes:
+    """
+    Reads a streaming response served from an async iterator, as ASGI
+    servers do, its queries run in the calling thread.
+    """
+
+    async def read():
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    return async_to_sync(read)()
+
+
 class ExtractDataTest(UnittestTestCase):
     def test_extract_data(self):
         with open("home/business_data_extractor/yellow_pages_ca.html") as file:
@@ -37,6 +87,40 @@ class ExtractDataTest(UnittestTestCase):
         self.assertEqual(data[4].business_name, expected_name_4)
         self.assertEqual(data[4].phone_number, expected_phone_4)
         self.assertEqual(data[4].website_url, expected_website_4)
+        self.assertEqual(
+            data[4].street_address, "604-428 Portage Avenue, Winnipeg, MB R3C 0E2"
+        )
+        self.assertEqual(
+            data[4].yellow_pages_link,
+            "https://www.yellowpages.ca/bus/Manitoba/Winnipeg/YMCA/100415513.html",
+        )
+
+    def test_extract_plain_website_link(self):
+        html = """
+            <div class="listing_right_section">
+                <a class="listing__name--link" href="/bus/Cafe/1.html">Cafe</a>
+                <span appcallback_target_phone>416-555-0000</span>
+                <ul><li class="mlr__item--website"><a href="https://cafe.ca/">Website</a></li></ul>
+            </div>
+        """
+
+        data = extract_data(html)
+
+        self.assertEqual(data[0].website_url, "https://cafe.ca/")
+
+    def test_extract_data_batch_from_archive(self):
+        with open("home/business_data_extractor/yellow_pages_ca.html") as file:
+            html = file.read()
+        archive_io = BytesIO()
+        with zipfile.ZipFile(archive_io, "w") as archive:
+            archive.writestr("page_1.html", html)
+            archive.writestr("page_2.html", html)
+            archive.writestr("notes.txt", "not a page")
+
+        data = list(extract_data_batch(read_html_pages(archive_io), workers=2))
+
+        self.assertEqual(len(data), 2 * len(extract_data(html)))
+        self.assertEqual(data[0].business_name, "Elmwood Day Nursery Inc")
 
 
 class ProspectModelTest(DjangoTestCase):
@@ -92,6 +176,934 @@ class ProspectModelTest(DjangoTestCase):
         # Assert that had_conversation is now True
         self.assertTrue(prospect.had_owner_conversation)
 
+    def test_call_status_reuses_loaded_data(self):
+        prospect = Prospect.objects.create(industry="Retail", phone_number="1234567890")
+        ColdCallRecord.objects.create(prospect=prospect, had_owner_conversation=True)
+
+        annotated = services.prospects_with_call_status().get()
+        prefetched = Prospect.objects.prefetch_related("coldcallrecord_set").get()
+        with self.assertNumQueries(0):
+            self.assertTrue(annotated.has_been_called)
+            self.assertTrue(annotated.had_owner_conversation)
+            self.assertTrue(prefetched.has_been_called)
+            self.assertTrue(prefetched.had_owner_conversation)
+
+
+class CallSummaryTest(DjangoTestCase):
+    def setUp(self):
+        self.prospect = Prospect.objects.create(
+            business_name="Cafe One", industry="Cafe", phone_number="416-555-0001"
+        )
+        self.other_prospect = Prospect.objects.create(
+            business_name="Cafe Two", industry="Cafe", phone_number="416-555-0002"
+        )
+
+    def create_call(self, prospect, day, **kwargs):
+        return ColdCallRecord.objects.create(
+            prospect=prospect,
+            date=dt.datetime(2024, 5, day, tzinfo=dt.UTC),
+            had_owner_conversation=kwargs.pop("had_owner_conversation", False),
+            **kwargs,
+        )
+
+    def test_summary_follows_call_writes(self):
+        self.create_call(
+            self.prospect, 2, outcome="meeting", had_owner_conversation=True
+        )
+        call = self.create_call(self.prospect, 1, outcome="no")
+
+        self.prospect.refresh_from_db()
+        self.assertEqual(self.prospect.calls_count, 2)
+        self.assertEqual(self.prospect.last_call_outcome, "meeting")
+        self.assertEqual(self.prospect.last_called_at.day, 2)
+        self.assertTrue(self.prospect.had_conversation)
+
+        call = ColdCallRecord.objects.get(pk=call.pk)
+        call.prospect = self.other_prospect
+        call.save()
+
+        self.prospect.refresh_from_db()
+        self.other_prospect.refresh_from_db()
+        self.assertEqual(self.prospect.calls_count, 1)
+        self.assertEqual(self.other_prospect.calls_count, 1)
+        self.assertEqual(self.other_prospect.last_call_outcome, "no")
+
+        call.delete()
+        ColdCallRecord.objects.filter(prospect=self.prospect).delete()
+
+        self.prospect.refresh_from_db()
+        self.other_prospect.refresh_from_db()
+        self.assertEqual(self.prospect.calls_count, 0)
+        self.assertIsNone(self.prospect.last_called_at)
+        self.assertFalse(self.prospect.had_conversation)
+        self.assertEqual(self.other_prospect.calls_count, 0)
+
+    def test_filter_not_yet_called(self):
+        self.create_call(self.prospect, 1)
+
+        response = self.client.get(reverse("home:prospects-list"), {"called": "false"})
+
+        self.assertEqual(
+            [p.pk for p in response.context["prospects_paginated"]],
+            [self.other_prospect.pk],
+        )
+
+    def test_prospect_save_keeps_call_summary(self):
+        prospect = Prospect.objects.get(pk=self.prospect.pk)
+        self.create_call(self.prospect, 1, had_owner_conversation=True)
+
+        # e.g. the admin change form, with the call summary loaded before the call
+        prospect.business_name = "Cafe Uno"
+        prospect.save()
+
+        prospect.refresh_from_db()
+        self.assertEqual(prospect.business_name, "Cafe Uno")
+        self.assertEqual(prospect.calls_count, 1)
+        self.assertTrue(prospect.had_conversation)
+
+    def test_rebuild_call_summaries(self):
+        self.create_call(self.prospect, 1, had_owner_conversation=True)
+        Prospect.objects.update(calls_count=0, had_conversation=False)
+
+        call_command("rebuild_call_summaries", batch_size=1, stdout=StringIO())
+
+        self.prospect.refresh_from_db()
+        self.assertEqual(self.prospect.calls_count, 1)
+        self.assertTrue(self.prospect.had_conversation)
+
+
+class ProspectsListPaginationTest(DjangoTestCase):
+    def setUp(self):
+        Prospect.objects.bulk_create(
+            Prospect(
+                business_name=f"Cafe {index}",
+                industry="Cafe",
+                phone_number=f"416-555-{index:04}",
+                province="ON" if index % 2 else "BC",
+            )
+            for index in range(25)
+        )
+
+    def get_page(self, query=""):
+        response = self.client.get(reverse("home:prospects-list") + "?" + query)
+        names = [p.business_name for p in response.context["prospects_paginated"]]
+        return response, names
+
+    def test_pages_keep_filters(self):
+        response, names = self.get_page("province=ON")
+        self.assertEqual(names[0], "Cafe 1")
+        self.assertIsNone(response.context["previous_page_query"])
+
+        response, names = self.get_page(response.context["next_page_query"])
+        self.assertEqual(names, [f"Cafe {index}" for index in range(21, 25, 2)])
+        self.assertIsNone(response.context["next_page_query"])
+
+        response, names = self.get_page(response.context["previous_page_query"])
+        self.assertEqual(names, [f"Cafe {index}" for index in range(1, 21, 2)])
+        self.assertIsNone(response.context["previous_page_query"])
+
+    def test_invalid_cursor_returns_first_page(self):
+        _, names = self.get_page("cursor=not-a-cursor")
+
+        self.assertEqual(names[0], "Cafe 0")
+
+    def test_cursor_with_invalid_value_returns_first_page(self):
+        paginator = KeysetPaginator(Prospect.objects.all(), 2, ordering="pk")
+        values = ["abc", {"a": 1}, [1, 2], None, float("inf"), 10**30]
+        urls = [
+            reverse("home:prospects-list"),
+            reverse("home:prospects-cards"),
+            reverse("home:call-records"),
+        ]
+        for value in values:
+            cursor = paginator.encode_cursor(value, "next")
+            self.assertEqual(
+                [p.business_name for p in paginator.get_page(cursor)],
+                ["Cafe 0", "Cafe 1"],
+            )
+            for url in urls:
+                with self.subTest(value=value, url=url):
+                    response = self.client.get(url, {"cursor": cursor})
+                    self.assertEqual(response.status_code, 200)
+
+    def test_deep_page_seeks_without_offset(self):
+        paginator = KeysetPaginator(Prospect.objects.all(), 2, ordering="pk")
+        cursor = paginator.encode_cursor(Prospect.objects.order_by("pk")[20].pk, "next")
+
+        with CaptureQueriesContext(connection) as context:
+            page = paginator.get_page(cursor)
+
+        self.assertEqual([p.business_name for p in page], ["Cafe 21", "Cafe 22"])
+        self.assertNotIn("OFFSET", context.captured_queries[0]["sql"])
+
+
+@override_settings(TIME_ZONE="America/Vancouver")
+class ProspectFragmentsTest(DjangoTestCase):
+    def setUp(self):
+        cache.clear()
+        Prospect.objects.bulk_create(
+            Prospect(
+                business_name=f"Cafe {index}",
+                industry="Cafe",
+                phone_number=f"416-555-{index:04}",
+                province="ON",
+            )
+            for index in range(15)
+        )
+        self.prospect = Prospect.objects.order_by("pk").first()
+
+    def test_cards_fragment_scrolls_to_next_page(self):
+        response = self.client.get(reverse("home:prospects-cards"), {"province": "ON"})
+
+        self.assertNotContains(response, "<html")
+        self.assertContains(response, 'class="card"', count=10)
+        self.assertContains(response, 'hx-trigger="revealed"')
+        # a call returns to the filtered list, not to the fragment
+        self.assertContains(response, "?next=%2Fprospects%2F%3Fprovince%3DON")
+
+        response = self.client.get(
+            reverse("home:prospects-cards") + "?" + response.context["next_page_query"]
+        )
+
+        self.assertContains(response, 'class="card"', count=5)
+        self.assertNotContains(response, 'hx-trigger="revealed"')
+
+    def test_stats_fragment(self):
+        response = self.client.get(reverse("home:prospects-stats"), {"province": "BC"})
+
+        self.assertNotContains(response, "<html")
+        self.assertContains(response, "Prospects total: 15")
+        self.assertContains(response, reverse("home:prospects-count"))
+
+    def test_count_fragment(self):
+        response = self.client.get(reverse("home:prospects-count"), {"province": "BC"})
+
+        self.assertContains(response, "Prospects filtered: 0")
+
+    def test_card_is_cached_until_prospect_changes(self):
+        url = reverse("home:prospect-card", args=[self.prospect.pk])
+        self.client.get(url)
+
+        # a bulk update does not touch updated_at, the cached card is kept
+        Prospect.objects.filter(pk=self.prospect.pk).update(business_name="Renamed")
+        self.assertContains(self.client.get(url), "Cafe 0")
+
+        self.prospect.refresh_from_db()
+        self.prospect.save()
+        self.assertContains(self.client.get(url), "Renamed")
+
+    def test_card_is_rendered_again_after_a_call(self):
+        url = reverse("home:prospect-card", args=[self.prospect.pk])
+        self.assertNotContains(self.client.get(url), "Had conversation")
+
+        ColdCallRecord.objects.create(
+            prospect=self.prospect,
+            date=timezone.now(),
+            had_owner_conversation=True,
+            outcome="no",
+        )
+
+        self.assertContains(self.client.get(url), "Had conversation")
+
+
+class DashboardStatsTest(DjangoTestCase):
+    def setUp(self):
+        cache.clear()
+        self.prospect = Prospect.objects.create(
+            industry="Cafe", phone_number="416-555-0001"
+        )
+        Prospect.objects.create(industry="Cafe", phone_number="416-555-0002")
+
+    def test_stats_without_calls(self):
+        stats = services.get_dashboard_stats()
+
+        self.assertEqual(stats.calls_total_count, 0)
+        self.assertEqual(stats.prospects_total_count, 2)
+
+    def test_stats_count_today_in_local_time(self):
+        start, end = services.local_day_range()
+        for date, outcome in [
+            (start, "no"),
+            (end - dt.timedelta(seconds=1), "yes"),
+            (end, "no"),
+            (start - dt.timedelta(seconds=1), "no"),
+        ]:
+            ColdCallRecord.objects.create(
+                prospect=self.prospect,
+                date=date,
+                outcome=outcome,
+                had_owner_conversation=False,
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            stats = services.get_dashboard_stats()
+
+        # silk explains the queries of the thread after an earlier test request,
+        # the shared cache is a table written in a savepoint
+        queries = [
+            query
+            for query in context.captured_queries
+            if not query["sql"].startswith(("EXPLAIN", "SAVEPOINT", "RELEASE"))
+            and "django_cache" not in query["sql"]
+        ]
+        self.assertEqual(len(queries), 1)
+
+        self.assertEqual(
+            stats,
+            services.DashboardStats(
+                outcome_no_count=3,
+                calls_total_count=4,
+                calls_today_count=2,
+                prospects_total_count=2,
+            ),
+        )
+        self.assertEqual(start.utcoffset(), end.utcoffset())
+
+    def test_writes_clear_cached_stats(self):
+        services.get_dashboard_stats()
+        # the shared cache's read, no aggregate
+        with self.assertNumQueries(1):
+            services.get_dashboard_stats()
+
+        ColdCallRecord.objects.create(
+            prospect=self.prospect, date=timezone.now(), had_owner_conversation=False
+        )
+        self.assertEqual(services.get_dashboard_stats().calls_today_count, 1)
+
+        Prospect.objects.create(industry="Cafe", phone_number="416-555-0003")
+        self.assertEqual(services.get_dashboard_stats().prospects_total_count, 3)
+
+    def test_other_process_writes_clear_cached_stats(self):
+        # another process, e.g. the web process while a worker imports, has
+        # its own cache connection
+        web_cache = caches.create_connection("shared")
+        self.assertNotIsInstance(web_cache, LocMemCache)
+        services.get_dashboard_stats()
+        self.assertIsNotNone(web_cache.get(DASHBOARD_STATS_CACHE_KEY))
+
+        Prospect.objects.filter(pk=self.prospect.pk).delete()
+
+        self.assertIsNone(web_cache.get(DASHBOARD_STATS_CACHE_KEY))
+
+    def test_other_process_deletes_clear_cached_phone_lookups(self):
+        web_cache = caches.create_connection("shared")
+        services.find_prospect_by_phone("416-555-0001")
+        cache_key = Prospect.phone_lookup_cache_key("+14165550001")
+        self.assertIsNotNone(web_cache.get(cache_key))
+
+        # e.g. the purge worker
+        Prospect.objects.filter(pk=self.prospect.pk).delete()
+
+        self.assertIsNone(web_cache.get(cache_key))
+        self.assertIsNone(services.find_prospect_by_phone("416-555-0001"))
+
+
+class QueryPlansTest(DjangoTestCase):
+    def test_hot_queries_use_indexes(self):
+        stdout = StringIO()
+
+        call_command("check_query_plans", seed=200, stdout=stdout)
+
+        self.assertNotIn("sequential scan", stdout.getvalue())
+        self.assertFalse(Prospect.objects.exists())
+
+    def test_find_sequential_scans(self):
+        plan = (
+            "3 0 0 SEARCH home_prospect USING INDEX home_prospect_city_idx (city=?)\n"
+            "2 0 0 SCAN home_coldcallrecord"
+        )
+
+        self.assertEqual(
+            query_plans.find_sequential_scans(plan), ["home_coldcallrecord"]
+        )
+
+
+class ProspectSearchTest(DjangoTestCase):
+    def setUp(self):
+        cache.clear()
+        Prospect.objects.create(
+            business_name="Maple Bakery",
+            industry="Bakery",
+            city="Toronto",
+            street_address="1 King St W, Toronto, ON",
+            phone_number="416-555-0001",
+        )
+        Prospect.objects.create(
+            business_name="Maple Dental",
+            industry="Dentist",
+            city="Winnipeg",
+            phone_number="(204) 555-0002",
+        )
+
+    def search(self, query):
+        return [p["business_name"] for p in services.search_prospects(query)]
+
+    def test_every_word_matches_a_field(self):
+        self.assertEqual(self.search("maple"), ["Maple Bakery", "Maple Dental"])
+        self.assertEqual(self.search("maple winn"), ["Maple Dental"])
+        self.assertEqual(self.search("king st"), ["Maple Bakery"])
+        self.assertEqual(self.search("204 555"), ["Maple Dental"])
+        self.assertEqual(self.search("maple vancouver"), [])
+
+    def test_results_are_cached_per_query(self):
+        self.search("Maple ")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search("maple"), ["Maple Bakery", "Maple Dental"])
+
+    def test_search_fragment(self):
+        response = self.client.get(reverse("home:prospects-search"), {"q": "bak"})
+
+        self.assertContains(response, "Maple Bakery")
+        self.assertNotContains(response, "Maple Dental")
+
+    def test_admin_search_uses_indexed_fields(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(user)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("admin:home_prospect_changelist"), {"q": "maple 204-555"}
+            )
+
+        self.assertEqual(
+            [p.business_name for p in response.context["cl"].result_list],
+            ["Maple Dental"],
+        )
+        search_queries = [
+            query["sql"] for query in context.captured_queries if "LIKE" in query["sql"]
+        ]
+        self.assertTrue(search_queries)
+        for sql in search_queries:
+            self.assertNotIn('"phone_number" LIKE', sql)
+
+
+class DialerTest(DjangoTestCase):
+    # Monday 16:00 in Toronto, 13:00 in Vancouver, 17:30 in St. John's
+    now = dt.datetime(2024, 5, 6, 20, 0, tzinfo=dt.UTC)
+
+    def setUp(self):
+        self.toronto = Prospect.objects.create(
+            industry="Cafe", phone_number="416-555-0001", province="ON"
+        )
+        self.vancouver = Prospect.objects.create(
+            industry="Cafe", phone_number="604-555-0002", province="BC"
+        )
+        self.st_johns = Prospect.objects.create(
+            industry="Cafe", phone_number="709-555-0003", province="NL"
+        )
+
+    def test_provinces_in_calling_hours(self):
+        provinces = services.provinces_in_calling_hours(self.now)
+
+        self.assertIn("ON", provinces)
+        self.assertIn("BC", provinces)
+        self.assertNotIn("NL", provinces)
+        saturday = self.now + dt.timedelta(days=5)
+        self.assertEqual(services.provinces_in_calling_hours(saturday), [])
+
+    def test_callers_get_different_prospects(self):
+        first = services.claim_next_prospect("Ann", now=self.now)
+        second = services.claim_next_prospect("Bob", now=self.now)
+
+        self.assertEqual([first, second], [self.toronto, self.vancouver])
+        self.assertIsNone(services.claim_next_prospect("Cy", now=self.now))
+
+    def test_next_releases_previous_claim(self):
+        services.claim_next_prospect("Ann", now=self.now)
+        services.claim_next_prospect("Ann", now=self.now)
+
+        self.toronto.refresh_from_db()
+        self.assertIsNone(self.toronto.claimed_by)
+        self.assertEqual(
+            services.claim_next_prospect("Bob", now=self.now), self.toronto
+        )
+
+    def test_expired_and_called_prospects(self):
+        services.claim_next_prospect("Ann", now=self.now)
+        ColdCallRecord.objects.create(
+            prospect=self.vancouver, had_owner_conversation=False
+        )
+
+        later = self.now + dt.timedelta(minutes=settings.DIALER_CLAIM_MINUTES)
+        self.assertEqual(services.claim_next_prospect("Bob", now=later), self.toronto)
+
+    def test_dialer_next_with_filters(self):
+        response = self.client.post(
+            reverse("home:dialer-next"), {"caller": "Ann", "province": "NL"}
+        )
+
+        self.assertContains(response, "No uncalled prospect")
+        self.assertEqual(self.client.session["dialer_caller"], "Ann")
+
+
+class ExistenceStatusUpdateTest(DjangoTestCase):
+    def setUp(self):
+        self.prospects = Prospect.objects.bulk_create(
+            Prospect(
+                business_name=f"Cafe {index}",
+                industry="Cafe",
+                phone_number=f"416-555-{index:04}",
+            )
+            for index in range(3)
+        )
+        self.ids = [prospect.pk for prospect in self.prospects]
+
+    def statuses(self) -> list[str]:
+        return list(
+            Prospect.objects.order_by("pk").values_list("existence_status", flat=True)
+        )
+
+    def test_one_update_per_status(self):
+        with CaptureQueriesContext(connection) as context:
+            updated = services.update_existence_statuses(
+                {
+                    self.ids[0]: "exists",
+                    self.ids[1]: "does_not_exist",
+                    self.ids[2]: "exists",
+                }
+            )
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(self.statuses(), ["exists", "does_not_exist", "exists"])
+        updates = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("UPDATE")
+        ]
+        self.assertEqual(len(updates), 2)
+        self.assertNotIn("business_name", updates[0])
+
+    def test_invalid_status_updates_nothing(self):
+        with self.assertRaises(ValueError):
+            services.update_existence_statuses(
+                {self.ids[0]: "exists", self.ids[1]: "closed"}
+            )
+
+        self.assertEqual(self.statuses(), ["unknown"] * 3)
+
+    def test_bulk_endpoint(self):
+        response = self.client.post(
+            reverse("home:prospects-existence-status-update"),
+            {"prospect_id": self.ids[:2], "existence_status": "does_not_exist"},
+        )
+
+        self.assertContains(response, "Prospects updated: 2")
+        self.assertEqual(
+            self.statuses(), ["does_not_exist", "does_not_exist", "unknown"]
+        )
+
+    def test_bulk_endpoint_rejects_unpaired_values(self):
+        response = self.client.post(
+            reverse("home:prospects-existence-status-update"),
+            {"prospect_id": self.ids, "existence_status": ["exists", "exists"]},
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_single_update(self):
+        url = reverse("home:htmx", args=["update_existence_status"])
+
+        response = self.client.get(
+            url, {"existence_status": "exists", "prospect_id": self.ids[1]}
+        )
+
+        self.assertContains(response, "exists")
+        self.assertEqual(self.statuses(), ["unknown", "exists", "unknown"])
+        self.assertEqual(
+            self.client.get(
+                url, {"existence_status": "closed", "prospect_id": self.ids[1]}
+            ).status_code,
+            400,
+        )
+
+    def test_admin_action(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(user)
+
+        self.client.post(
+            reverse("admin:home_prospect_changelist"),
+            {"action": "mark_does_not_exist", "_selected_action": self.ids[1:]},
+        )
+
+        self.assertEqual(
+            self.statuses(), ["unknown", "does_not_exist", "does_not_exist"]
+        )
+
+
+class CallRecordsListTest(DjangoTestCase):
+    def setUp(self):
+        self.prospect = Prospect.objects.create(
+            business_name="Cafe", industry="Cafe", phone_number="416-555-0000"
+        )
+        ColdCallRecord.objects.bulk_create(
+            ColdCallRecord(
+                prospect=self.prospect,
+                date=dt.datetime(2024, 5, 1 + index % 10, 12, tzinfo=dt.UTC),
+                had_owner_conversation=False,
+                outcome="meeting" if index % 3 == 0 else "no",
+                pick_up_status="yes",
+                my_area_code_city="Toronto" if index % 2 else "Vancouver",
+            )
+            for index in range(60)
+        )
+
+    def test_pages(self):
+        response = self.client.get(reverse("home:call-records"))
+
+        self.assertEqual(len(response.context["call_records_paginated"]), 50)
+        self.assertContains(response, "Cafe", count=50)
+
+        response = self.client.get(
+            reverse("home:call-records") + "?" + response.context["next_page_query"]
+        )
+
+        self.assertEqual(len(response.context["call_records_paginated"]), 10)
+        self.assertIsNone(response.context["next_page_query"])
+
+    def test_filters(self):
+        response = self.client.get(
+            reverse("home:call-records"),
+            {
+                "date_after": "2024-05-01",
+                "date_before": "2024-05-03",
+                "outcome": "meeting",
+                "my_area_code_city": "Vancouver",
+            },
+        )
+
+        call_records = response.context["call_records_paginated"].object_list
+        self.assertEqual(len(call_records), 4)
+        for call_record in call_records:
+            self.assertEqual(call_record.outcome, "meeting")
+            self.assertEqual(call_record.my_area_code_city, "Vancouver")
+            self.assertLessEqual(call_record.date.day, 3)
+
+    def test_export_streams_filtered_records(self):
+        response = async_to_sync(self.async_client.get)(
+            reverse("home:call-records-export"), {"outcome": "meeting"}
+        )
+
+        self.assertTrue(response.is_async)
+        with CaptureQueriesContext(connection) as context:
+            content = read_async_stream(response).decode()
+
+        lines = content.splitlines()
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            lines[0].split(",")[:3], ["date", "business_name", "phone_number"]
+        )
+        self.assertEqual(len(lines), 1 + 20)
+        self.assertIn(",Cafe,416-555-0000,", lines[1])
+        # the prospect columns are joined, not queried per record
+        queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if not query["sql"].startswith("EXPLAIN")
+        ]
+        self.assertEqual(len(queries), 1)
+
+
+class ApiTest(DjangoTestCase):
+    def setUp(self):
+        self.prospects = Prospect.objects.bulk_create(
+            Prospect(
+                business_name=f"Cafe {index}",
+                industry="Cafe",
+                phone_number=f"416-555-{index:04}",
+                province="ON",
+            )
+            for index in range(3)
+        )
+        ColdCallRecord.objects.create(
+            prospect=self.prospects[0],
+            date=timezone.now(),
+            had_owner_conversation=True,
+            outcome="no",
+        )
+
+    def test_prospects_call_status(self):
+        response = self.client.get(reverse("home:api-prospect-list"))
+
+        results = response.json()["results"]
+        self.assertEqual(
+            [(p["has_been_called"], p["had_conversation"]) for p in results],
+            [(True, True), (False, False), (False, False)],
+        )
+
+    def test_cursor_pages(self):
+        url = reverse("home:api-prospect-list") + "?page_size=2&called=false"
+
+        page = self.client.get(url).json()
+
+        self.assertEqual(
+            [p["business_name"] for p in page["results"]], ["Cafe 1", "Cafe 2"]
+        )
+        self.assertIsNone(page["next"])
+        self.assertNotIn("count", page)
+
+    def test_sparse_fields(self):
+        response = self.client.get(
+            reverse("home:api-call-record-list"), {"fields": "id,outcome"}
+        )
+
+        self.assertEqual(list(response.json()["results"][0]), ["id", "outcome"])
+
+    def test_sparse_fields_load_only_their_columns(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("home:api-prospect-list"), {"fields": "id,business_name"}
+            )
+
+        self.assertEqual(list(response.json()["results"][0]), ["id", "business_name"])
+        [query] = [
+            query["sql"]
+            for query in context.captured_queries
+            if '"home_prospect"' in query["sql"]
+            and not query["sql"].startswith("EXPLAIN")
+        ]
+        self.assertNotIn("street_address", query)
+        # the call status annotations are only for has_been_called
+        self.assertNotIn("calls_count", query)
+
+        response = self.client.get(
+            reverse("home:api-prospect-list"), {"fields": "id,has_been_called"}
+        )
+        self.assertEqual(
+            [p["has_been_called"] for p in response.json()["results"]],
+            [True, False, False],
+        )
+
+    def test_conditional_get(self):
+        url = reverse("home:api-prospect-list")
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+        ColdCallRecord.objects.create(
+            prospect=self.prospects[1], had_owner_conversation=False
+        )
+        response = self.client.get(url, headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_conditional_get_versions_only_the_page(self):
+        url = reverse("home:api-prospect-list") + "?page_size=2"
+        first_page = self.client.get(url)
+        etag = first_page["ETag"]
+
+        # a change on the next page leaves the first page as it was
+        self.prospects[2].save()
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.prospects[1].save()
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+        next_page = self.client.get(first_page.json()["next"])
+        self.assertNotEqual(next_page["ETag"], etag)
+
+    def test_conditional_get_detail(self):
+        url = reverse("home:api-prospect-detail", args=[self.prospects[2].pk])
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(
+            self.client.get(url, headers={"If-None-Match": etag}).status_code, 304
+        )
+
+        self.prospects[2].save()
+
+        self.assertEqual(
+            self.client.get(url, headers={"If-None-Match": etag}).status_code, 200
+        )
+
+
+class ProspectsExportTest(DjangoTestCase):
+    def setUp(self):
+        self.prospects = Prospect.objects.bulk_create(
+            Prospect(
+                business_name=f"Cafe {index}",
+                industry="Cafe",
+                phone_number=f"416-555-{index:04}",
+                province="ON" if index < 4 else "BC",
+            )
+            for index in range(5)
+        )
+        ColdCallRecord.objects.create(
+            prospect=self.prospects[0],
+            date=dt.datetime(2024, 5, 1, 12, tzinfo=dt.UTC),
+            had_owner_conversation=True,
+            outcome="no",
+        )
+
+    def test_csv_streams_filtered_prospects(self):
+        response = async_to_sync(self.async_client.get)(
+            reverse("home:prospects-export", args=["csv"]), {"province": "ON"}
+        )
+
+        # async, ASGI servers would otherwise read it whole before sending
+        self.assertTrue(response.is_async)
+        with CaptureQueriesContext(connection) as context:
+            lines = read_async_stream(response).decode().splitlines()
+
+        self.assertEqual(lines[0].split(",")[-2:], ["called", "conversation"])
+        self.assertEqual(len(lines), 1 + 4)
+        self.assertTrue(lines[1].startswith(f"{self.prospects[0].pk},Cafe 0,"))
+        self.assertTrue(lines[1].endswith(",True,True"))
+        queries = [
+            query
+            for query in context.captured_queries
+            if not query["sql"].startswith("EXPLAIN")
+        ]
+        self.assertEqual(len(queries), 1)
+
+    @override_settings(PROSPECTS_EXPORT_FILE_BLOCK_SIZE=1024)
+    def test_xlsx_streams_file(self):
+        response = async_to_sync(self.async_client.get)(
+            reverse("home:prospects-export", args=["xlsx"]), {"called": "true"}
+        )
+
+        self.assertTrue(response.is_async)
+        content = read_async_stream(response)
+        self.assertEqual(int(response["Content-Length"]), len(content))
+        workbook = openpyxl.load_workbook(BytesIO(content))
+        rows = list(workbook.active.values)
+        self.assertEqual(len(rows), 1 + 1)
+        row = dict(zip(rows[0], rows[1]))
+        self.assertEqual(row["business_name"], "Cafe 0")
+        self.assertEqual(row["last_called_at"], dt.datetime(2024, 5, 1, 12))
+        self.assertTrue(row["conversation"])
+
+    @override_settings(PROSPECTS_EXPORT_CHUNK_SIZE=2)
+    def test_parquet_command_writes_row_groups(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "prospects.parquet"
+
+            call_command("export_prospects", path, stdout=StringIO())
+
+            parquet_file = pq.ParquetFile(path)
+            table = parquet_file.read()
+
+        self.assertEqual(parquet_file.num_row_groups, 3)
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column("called").to_pylist(), [True] + [False] * 4)
+
+    def test_command_filters(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "prospects.csv"
+
+            call_command(
+                "export_prospects", path, "--filter", "province=BC", stdout=StringIO()
+            )
+
+            lines = path.read_text().splitlines()
+
+        self.assertEqual(len(lines), 1 + 1)
+        self.assertIn("Cafe 4", lines[1])
+
+    def test_unsupported_file_type(self):
+        response = self.client.get(reverse("home:prospects-export", args=["pdf"]))
+
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncViewsTest(DjangoTestCase):
+    def setUp(self):
+        cache.clear()
+        self.prospects = Prospect.objects.bulk_create(
+            Prospect(
+                business_name=f"Cafe {index}",
+                industry="Cafe",
+                phone_number=f"416-555-{index:04}",
+                phone_e164=f"+1416555{index:04}",
+                province="ON",
+            )
+            for index in range(12)
+        )
+        ColdCallRecord.objects.create(
+            prospect=self.prospects[0],
+            date=timezone.now(),
+            had_owner_conversation=False,
+            outcome="no",
+        )
+
+    def test_read_views_are_async(self):
+        for view in [
+            views.prospects_list,
+            views.prospects_cards,
+            views.prospects_stats,
+            views.prospects_count,
+            views.prospects_lookup,
+            views.prospects_search,
+            views.call_records_list,
+        ]:
+            with self.subTest(view=view.__name__):
+                self.assertTrue(asyncio.iscoroutinefunction(view))
+
+    # silk is only in the middleware in debug, as it isn't async capable
+    @modify_settings(MIDDLEWARE={"remove": ["silk.middleware.SilkyMiddleware"]})
+    @override_settings(DEBUG=True)
+    def test_views_run_without_sync_adaptation(self):
+        # django logs each sync middleware or view it adapts to the async
+        # handler in debug, each one would run the request in a thread
+        with self.assertNoLogs("django.request", level="DEBUG"):
+            response = async_to_sync(self.async_client.get)(
+                reverse("home:prospects-lookup"), {"phone": "(416) 555-0003"}
+            )
+
+        self.assertContains(response, "Cafe 3")
+
+    async def test_prospects_list(self):
+        response = await self.async_client.get(
+            reverse("home:prospects-list"), {"province": "ON"}
+        )
+
+        self.assertContains(response, "Calls total: 1")
+        self.assertEqual(len(response.context["prospects_paginated"]), 10)
+        self.assertIsNotNone(response.context["next_page_query"])
+
+    async def test_lookup_and_search(self):
+        response = await self.async_client.get(
+            reverse("home:prospects-lookup"), {"phone": "(416) 555-0003"}
+        )
+        self.assertContains(response, "Cafe 3")
+
+        response = await self.async_client.get(
+            reverse("home:prospects-search"), {"q": "cafe 11"}
+        )
+        self.assertContains(response, "Cafe 11")
+
+    async def test_dialer_reads_caller_from_session(self):
+        session = await self.async_client.asession()
+        await session.aset("dialer_caller", "Ann")
+        await session.asave()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+        response = await self.async_client.get(reverse("home:dialer"))
+
+        self.assertEqual(response.context["caller"], "Ann")
+
+    async def test_async_services_match_sync_ones(self):
+        stats = await services.aget_dashboard_stats()
+        await cache.aclear()
+        self.assertEqual(stats, await sync_to_async(services.get_dashboard_stats)())
+
+        paginator = KeysetPaginator(Prospect.objects.all(), 5, ordering="pk")
+        page = await paginator.aget_page(None)
+        next_page = await paginator.aget_page(page.next_cursor)
+        self.assertEqual(
+            [prospect.business_name for prospect in next_page],
+            [f"Cafe {index}" for index in range(5, 10)],
+        )
+        self.assertEqual(
+            next_page.previous_cursor,
+            (await sync_to_async(paginator.get_page)(page.next_cursor)).previous_cursor,
+        )
+
 
 class TestParseYellowpagesCAAddress(UnittestTestCase):
     def test_parse_address_correctly(self):
@@ -221,3 +1233,788 @@ class TestParseWebsiteUrl(UnittestTestCase):
             expected_url,
             "The function should correctly parse even from a malformed base URL.",
         )
+
+
+class ImportProspectsFromExcelTest(DjangoTestCase):
+    def create_excel_file(self, rows):
+        """Helper function to create a yellow pages CA export Excel file."""
+        df = pd.DataFrame(rows, columns=services.YELLOW_PAGES_CA_COLUMNS)
+        excel_io = BytesIO()
+        df.to_excel(excel_io, index=False)
+        excel_io.seek(0)
+        return SimpleUploadedFile("export.xlsx", excel_io.read())
+
+    def test_import_in_chunks_drops_duplicate_phones(self):
+        rows = [
+            [
+                "Cafe One",
+                None,
+                "416-555-0001",
+                "1 King St W, Toronto, ON M5H 1A1",
+                None,
+            ],
+            ["Cafe Two", None, "416-555-0002", None, None],
+            ["Cafe One Again", None, "416-555-0001", None, None],
+            [
+                "Cafe Three",
+                None,
+                "604-555-0003",
+                "605 East Broadway, Vancouver, BC V5T 1X7",
+                None,
+            ],
+        ]
+        file = self.create_excel_file(rows)
+
+        result = import_prospects_from_excel(file, industry="Cafe", chunk_size=2)
+
+        self.assertEqual(result.rows_read, 4)
+        self.assertEqual(result.rows_inserted, 3)
+        self.assertEqual(result.rows_skipped, 1)
+        self.assertEqual(Prospect.objects.count(), 3)
+        first = Prospect.objects.get(phone_number="416-555-0001")
+        self.assertEqual(first.business_name, "Cafe One")
+        self.assertEqual(first.city, "Toronto")
+        self.assertEqual(first.province, "ON")
+        self.assertIsNone(Prospect.objects.get(phone_number="416-555-0002").city)
+
+    def test_import_with_worker_processes_keeps_row_order(self):
+        rows = [
+            [f"Cafe {i}", None, f"416-555-{i:04}", f"{i} King St W, Toronto, ON", None]
+            for i in range(10)
+        ]
+        file = self.create_excel_file(rows)
+
+        result = import_prospects_from_excel(
+            file, industry="Cafe", chunk_size=5, workers=2
+        )
+
+        self.assertEqual(result.rows_inserted, 10)
+        prospects = Prospect.objects.order_by("id")
+        self.assertEqual(
+            [prospect.business_name for prospect in prospects],
+            [f"Cafe {i}" for i in range(10)],
+        )
+        self.assertTrue(all(prospect.city == "Toronto" for prospect in prospects))
+
+    def test_reimport_updates_only_changed_prospects(self):
+        rows = [
+            ["Cafe One", None, "416-555-0001", "1 King St W, Toronto, ON", None],
+            ["Cafe Two", None, "416-555-0002", "2 King St W, Toronto, ON", None],
+        ]
+        import_prospects_from_excel(self.create_excel_file(rows), industry="Cafe")
+        unchanged_prospect = Prospect.objects.get(phone_number="416-555-0001")
+
+        rows[1][3] = "605 East Broadway, Vancouver, BC V5T 1X7"
+        rows.append(["Cafe Three", None, "416-555-0003", None, None])
+        result = import_prospects_from_excel(
+            self.create_excel_file(rows), industry="Cafe"
+        )
+
+        self.assertEqual(result.rows_inserted, 1)
+        self.assertEqual(result.rows_updated, 1)
+        self.assertEqual(result.rows_unchanged, 1)
+        moved_prospect = Prospect.objects.get(phone_number="416-555-0002")
+        self.assertEqual(moved_prospect.city, "Vancouver")
+        self.assertEqual(moved_prospect.province, "BC")
+        self.assertEqual(
+            moved_prospect.content_hash, moved_prospect.compute_content_hash()
+        )
+        self.assertEqual(
+            Prospect.objects.get(pk=unchanged_prospect.pk).updated_at,
+            unchanged_prospect.updated_at,
+        )
+
+    def test_reimport_skips_rows_without_phone(self):
+        rows = [
+            ["Cafe One", None, "416-555-0001", "1 King St W, Toronto, ON", None],
+            ["Cafe Two", None, None, "2 King St W, Toronto, ON", None],
+            ["Cafe Three", None, None, "3 King St W, Toronto, ON", None],
+        ]
+        import_prospects_from_excel(self.create_excel_file(rows), industry="Cafe")
+
+        result = import_prospects_from_excel(
+            self.create_excel_file(rows), industry="Cafe"
+        )
+
+        self.assertEqual(result.rows_read, 3)
+        self.assertEqual(result.rows_unchanged, 1)
+        self.assertEqual(result.rows_skipped, 2)
+        self.assertEqual(Prospect.objects.count(), 1)
+
+    def test_import_with_incorrect_columns(self):
+        df = pd.DataFrame([["Cafe", "416-555-0001"]], columns=["Name", "Phone"])
+        excel_io = BytesIO()
+        df.to_excel(excel_io, index=False)
+        file = SimpleUploadedFile("export.xlsx", excel_io.getvalue())
+
+        with self.assertRaises(ValueError):
+            import_prospects_from_excel(file, industry="Cafe")
+        self.assertEqual(Prospect.objects.count(), 0)
+
+
+class TestNormalizeAddressCA(UnittestTestCase):
+    def setUp(self):
+        services.normalize_address_ca.cache_clear()
+
+    def test_yellow_pages_address_uses_split(self):
+        address = services.normalize_address_ca(
+            "123 Main St, Saint-Jean-sur-Richelieu, QC J3B 1A1"
+        )
+        self.assertEqual(address.city, "Saint-Jean-sur-Richelieu")
+        self.assertEqual(address.province, "QC")
+
+    def test_other_address_falls_back_to_parser(self):
+        address = services.normalize_address_ca("296 Brock St E Thunder Bay ON P7E 4H4")
+        self.assertEqual(address.city, "Thunder Bay")
+        self.assertEqual(address.province, "ON")
+
+    def test_repeated_address_is_parsed_once(self):
+        for _ in range(3):
+            services.normalize_address_ca("605 East Broadway, Vancouver, BC V5T 1X7")
+        cache_info = services.normalize_address_ca.cache_info()
+        self.assertEqual(cache_info.misses, 1)
+        self.assertEqual(cache_info.hits, 2)
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+)
+class ImportJobTest(DjangoTestCase):
+    def create_excel_file(self, rows, columns=services.YELLOW_PAGES_CA_COLUMNS):
+        """Helper function to create a yellow pages CA export Excel file."""
+        excel_io = BytesIO()
+        pd.DataFrame(rows, columns=columns).to_excel(excel_io, index=False)
+        return SimpleUploadedFile("export.xlsx", excel_io.getvalue())
+
+    def test_upload_queues_job_without_importing(self):
+        file = self.create_excel_file([["Cafe", None, "416-555-0001", None, None]])
+
+        response = self.client.post(
+            reverse("home:prospects-import-excel"),
+            {"file": file, "industry": "Cafe"},
+        )
+
+        import_job = ImportJob.objects.get()
+        self.assertRedirects(
+            response, reverse("home:import-job-detail", args=[import_job.id])
+        )
+        self.assertEqual(import_job.status, ImportJob.StatusChoices.PENDING)
+        self.assertEqual(Prospect.objects.count(), 0)
+
+    def test_worker_imports_pending_jobs(self):
+        file = self.create_excel_file(
+            [
+                ["Cafe", None, "416-555-0001", None, None],
+                ["Cafe Again", None, "416-555-0001", None, None],
+            ]
+        )
+        import_job = ImportJob.objects.create(file=file, industry="Cafe")
+
+        call_command("process_import_jobs", once=True, stdout=StringIO())
+
+        import_job.refresh_from_db()
+        self.assertEqual(import_job.status, ImportJob.StatusChoices.DONE)
+        self.assertEqual(import_job.rows_read, 2)
+        self.assertEqual(import_job.rows_inserted, 1)
+        self.assertEqual(import_job.rows_skipped, 1)
+        self.assertEqual(Prospect.objects.count(), 1)
+
+        response = self.client.get(
+            reverse("home:import-job-progress", args=[import_job.id])
+        )
+        self.assertNotContains(response, "hx-trigger")
+
+    def test_worker_records_failed_job(self):
+        file = self.create_excel_file([["Cafe"]], columns=["Name"])
+        import_job = ImportJob.objects.create(file=file, industry="Cafe")
+
+        call_command("process_import_jobs", once=True, stdout=StringIO())
+
+        import_job.refresh_from_db()
+        self.assertEqual(import_job.status, ImportJob.StatusChoices.FAILED)
+        self.assertEqual(import_job.error, "Excel columns are not correct")
+
+    def test_worker_claims_job_abandoned_by_dead_worker(self):
+        file = self.create_excel_file([["Cafe", None, "416-555-0001", None, None]])
+        import_job = ImportJob.objects.create(file=file, industry="Cafe")
+        services.claim_next_import_job()
+        # the worker was killed, the job is still running
+        self.assertIsNone(services.claim_next_import_job())
+
+        ImportJob.objects.filter(pk=import_job.pk).update(
+            updated_at=timezone.now()
+            - dt.timedelta(minutes=settings.IMPORT_JOB_STALE_MINUTES + 1)
+        )
+        call_command("process_import_jobs", once=True, stdout=StringIO())
+
+        import_job.refresh_from_db()
+        self.assertEqual(import_job.status, ImportJob.StatusChoices.DONE)
+        self.assertEqual(Prospect.objects.count(), 1)
+
+    def test_reclaimed_job_counts_rows_once(self):
+        file = self.create_excel_file(
+            [
+                ["Cafe One", None, "416-555-0001", None, None],
+                ["Cafe Two", None, "416-555-0002", None, None],
+            ]
+        )
+        import_job = ImportJob.objects.create(file=file, industry="Cafe")
+        services.claim_next_import_job()
+        # the worker was killed after writing the first row
+        import_prospects_from_excel(
+            self.create_excel_file([["Cafe One", None, "416-555-0001", None, None]]),
+            industry="Cafe",
+        )
+        ImportJob.objects.filter(pk=import_job.pk).update(
+            rows_read=1,
+            rows_inserted=1,
+            updated_at=timezone.now()
+            - dt.timedelta(minutes=settings.IMPORT_JOB_STALE_MINUTES + 1),
+        )
+
+        reclaimed_job = services.claim_next_import_job()
+        self.assertEqual((reclaimed_job.rows_read, reclaimed_job.rows_inserted), (0, 0))
+        services.run_import_job(reclaimed_job)
+
+        import_job.refresh_from_db()
+        self.assertEqual(import_job.status, ImportJob.StatusChoices.DONE)
+        self.assertEqual(import_job.rows_read, 2)
+        self.assertEqual(import_job.rows_inserted, 1)
+        self.assertEqual(import_job.rows_unchanged, 1)
+        self.assertEqual(import_job.rows_skipped, 0)
+        self.assertEqual(Prospect.objects.count(), 2)
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+)
+class PurgeJobTest(DjangoTestCase):
+    def setUp(self):
+        prospects = Prospect.objects.bulk_create(
+            Prospect(
+                business_name=f"Cafe {index}",
+                industry="Cafe",
+                phone_number=f"416-555-{index:04}",
+            )
+            for index in range(5)
+        )
+        ColdCallRecord.objects.bulk_create(
+            ColdCallRecord(prospect=prospect, had_owner_conversation=False)
+            for prospect in prospects[:3]
+        )
+
+    def test_delete_all_queues_job_without_deleting(self):
+        response = self.client.get(reverse("home:prospects-delete-all"))
+
+        purge_job = PurgeJob.objects.get()
+        self.assertRedirects(
+            response, reverse("home:purge-job-detail", args=[purge_job.id])
+        )
+        self.assertEqual(purge_job.target, PurgeJob.TargetChoices.PROSPECTS)
+        self.assertFalse(purge_job.archive)
+        self.assertEqual(Prospect.objects.count(), 5)
+
+    def test_worker_deletes_protected_prospects_in_batches(self):
+        purge_job = PurgeJob.objects.create(
+            target=PurgeJob.TargetChoices.PROSPECTS, batch_size=2
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            call_command("process_purge_jobs", once=True, stdout=StringIO())
+
+        purge_job.refresh_from_db()
+        self.assertEqual(purge_job.status, PurgeJob.StatusChoices.DONE)
+        self.assertEqual(purge_job.rows_total, 8)
+        self.assertEqual(purge_job.rows_deleted, 8)
+        self.assertEqual(Prospect.objects.count(), 0)
+        self.assertEqual(ColdCallRecord.objects.count(), 0)
+        prospect_deletes = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith('DELETE FROM "home_prospect"')
+        ]
+        self.assertEqual(len(prospect_deletes), 3)
+
+        response = self.client.get(
+            reverse("home:purge-job-progress", args=[purge_job.id])
+        )
+        self.assertNotContains(response, "hx-trigger")
+        self.assertContains(response, "Deleted: 8 of 8")
+
+    def test_call_records_purge_keeps_prospects(self):
+        PurgeJob.objects.create(target=PurgeJob.TargetChoices.CALL_RECORDS)
+
+        call_command("process_purge_jobs", once=True, stdout=StringIO())
+
+        self.assertEqual(ColdCallRecord.objects.count(), 0)
+        self.assertEqual(Prospect.objects.count(), 5)
+        self.assertFalse(Prospect.objects.filter(calls_count__gt=0).exists())
+
+    def test_archive_batches(self):
+        purge_job = PurgeJob.objects.create(
+            target=PurgeJob.TargetChoices.PROSPECTS, archive=True, batch_size=4
+        )
+
+        call_command("process_purge_jobs", once=True, stdout=StringIO())
+
+        _, file_names = default_storage.listdir(purge_job.archive_directory)
+        self.assertEqual(len(file_names), 3)
+        rows = []
+        for file_name in file_names:
+            with default_storage.open(
+                f"{purge_job.archive_directory}/{file_name}"
+            ) as file:
+                rows += [json.loads(line) for line in file.read().splitlines()]
+        models = [row["model"] for row in rows]
+        self.assertEqual(models.count("home.coldcallrecord"), 3)
+        self.assertEqual(models.count("home.prospect"), 5)
+
+    def test_failed_job_resumes_where_it_stopped(self):
+        purge_job = PurgeJob.objects.create(
+            target=PurgeJob.TargetChoices.PROSPECTS, batch_size=2
+        )
+        purge_job = services.claim_next_purge_job()
+        services.purge_batch(purge_job)
+        # the worker died after the first batch and the job was queued again
+        PurgeJob.objects.filter(pk=purge_job.pk).update(
+            status=PurgeJob.StatusChoices.PENDING
+        )
+
+        call_command("process_purge_jobs", once=True, stdout=StringIO())
+
+        purge_job.refresh_from_db()
+        self.assertEqual(purge_job.status, PurgeJob.StatusChoices.DONE)
+        self.assertEqual(purge_job.rows_deleted, 8)
+        self.assertEqual(Prospect.objects.count(), 0)
+
+    def test_job_of_dead_worker_resumes_once_stale(self):
+        PurgeJob.objects.create(target=PurgeJob.TargetChoices.PROSPECTS, batch_size=2)
+        purge_job = services.claim_next_purge_job()
+        services.purge_batch(purge_job)
+        # the worker was killed after the first batch, the job is still running
+        self.assertIsNone(services.claim_next_purge_job())
+
+        PurgeJob.objects.filter(pk=purge_job.pk).update(
+            updated_at=timezone.now()
+            - dt.timedelta(minutes=settings.PURGE_JOB_STALE_MINUTES + 1)
+        )
+        call_command("process_purge_jobs", once=True, stdout=StringIO())
+
+        purge_job.refresh_from_db()
+        self.assertEqual(purge_job.status, PurgeJob.StatusChoices.DONE)
+        self.assertEqual(purge_job.rows_deleted, 8)
+
+    def test_admin_resumes_only_abandoned_running_jobs(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(user)
+        running, abandoned = PurgeJob.objects.bulk_create(
+            PurgeJob(
+                target=PurgeJob.TargetChoices.PROSPECTS,
+                status=PurgeJob.StatusChoices.RUNNING,
+            )
+            for _ in range(2)
+        )
+        PurgeJob.objects.filter(pk=abandoned.pk).update(
+            updated_at=timezone.now()
+            - dt.timedelta(minutes=settings.PURGE_JOB_STALE_MINUTES + 1)
+        )
+
+        self.client.post(
+            reverse("admin:home_purgejob_changelist"),
+            {"action": "resume", "_selected_action": [running.pk, abandoned.pk]},
+        )
+
+        running.refresh_from_db()
+        abandoned.refresh_from_db()
+        self.assertEqual(running.status, PurgeJob.StatusChoices.RUNNING)
+        self.assertEqual(abandoned.status, PurgeJob.StatusChoices.PENDING)
+
+
+@override_settings(CALL_ROLLUP_WATERMARK_OVERLAP_SECONDS=0)
+class CallRollupTest(DjangoTestCase):
+    def setUp(self):
+        toronto = timezone.get_current_timezone()
+        self.may_1 = dt.datetime(2024, 5, 1, 10, tzinfo=toronto)
+        # May 2nd in UTC, still May 1st in Toronto
+        self.may_1_late = dt.datetime(2024, 5, 1, 23, 30, tzinfo=toronto)
+        self.may_2 = dt.datetime(2024, 5, 2, 10, tzinfo=toronto)
+        ColdCallRecord.objects.bulk_create(
+            [
+                ColdCallRecord(
+                    date=self.may_1,
+                    opening="hi",
+                    pick_up_status="yes",
+                    had_owner_conversation=True,
+                    outcome="meeting",
+                ),
+                ColdCallRecord(
+                    date=self.may_1_late,
+                    opening="hi",
+                    pick_up_status="yes",
+                    had_owner_conversation=False,
+                    outcome="no",
+                ),
+                ColdCallRecord(
+                    date=self.may_2,
+                    opening=None,
+                    pick_up_status="voicemail",
+                    had_owner_conversation=False,
+                ),
+                ColdCallRecord(
+                    date=self.may_2,
+                    opening="",
+                    pick_up_status="yes",
+                    had_owner_conversation=True,
+                    outcome="yes",
+                ),
+            ]
+        )
+
+    def funnels(self, **filters) -> dict:
+        rollups = CallDailyRollup.objects.filter(**filters)
+        return {
+            funnel["value"]: services.CallFunnel(**funnel)
+            for funnel in services.call_funnels_queryset(rollups, "opening")
+        }
+
+    def test_refresh_groups_calls_by_local_day(self):
+        self.assertEqual(services.refresh_call_rollups(), 2)
+
+        may_1 = self.funnels(day=dt.date(2024, 5, 1))
+        self.assertEqual(list(may_1), ["hi"])
+        self.assertEqual(may_1["hi"].calls, 2)
+        self.assertEqual(may_1["hi"].picked_up, 2)
+        self.assertEqual(may_1["hi"].conversations, 1)
+        self.assertEqual(may_1["hi"].meetings, 1)
+        self.assertEqual(may_1["hi"].conversations_percent, 50)
+        # no opening and an empty opening are the same value
+        may_2 = self.funnels(day=dt.date(2024, 5, 2))
+        self.assertEqual(list(may_2), [""])
+        self.assertEqual(may_2[""].calls, 2)
+        self.assertEqual(may_2[""].yes_outcomes, 1)
+
+    def test_refresh_recomputes_only_written_days(self):
+        services.refresh_call_rollups()
+        ColdCallRecord.objects.create(
+            date=self.may_2, opening="hi", had_owner_conversation=False
+        )
+
+        self.assertEqual(services.refresh_call_rollups(), 1)
+        self.assertEqual(self.funnels(day=dt.date(2024, 5, 2))["hi"].calls, 1)
+        self.assertEqual(self.funnels()["hi"].calls, 3)
+        self.assertEqual(services.refresh_call_rollups(), 0)
+
+    def test_bulk_update_is_seen_by_the_watermark(self):
+        services.refresh_call_rollups()
+        ColdCallRecord.objects.filter(outcome="meeting").update(outcome="yes")
+
+        self.assertEqual(services.refresh_call_rollups(), 1)
+        self.assertEqual(self.funnels()["hi"].meetings, 0)
+        self.assertEqual(self.funnels()["hi"].yes_outcomes, 1)
+
+    def test_deleted_and_moved_calls_mark_days_stale(self):
+        services.refresh_call_rollups()
+        ColdCallRecord.objects.filter(date=self.may_1_late).delete()
+        call_record = ColdCallRecord.objects.get(date=self.may_1)
+        call_record.date = self.may_2
+        call_record.save()
+
+        self.assertEqual(services.refresh_call_rollups(), 2)
+        self.assertFalse(CallDailyRollup.objects.filter(day=dt.date(2024, 5, 1)))
+        self.assertEqual(self.funnels(day=dt.date(2024, 5, 2))["hi"].calls, 1)
+        self.assertFalse(CallRollupStaleDay.objects.exists())
+
+    def test_command_full_rebuild(self):
+        services.refresh_call_rollups()
+        CallDailyRollup.objects.all().delete()
+
+        stdout = StringIO()
+        call_command("refresh_call_rollups", stdout=stdout)
+        self.assertEqual(stdout.getvalue().strip(), "0 days refreshed")
+        call_command("refresh_call_rollups", full=True, stdout=stdout)
+        self.assertEqual(self.funnels()["hi"].calls, 2)
+
+    def test_analytics_page(self):
+        response = self.client.get(reverse("home:analytics"))
+        self.assertContains(response, "Not refreshed yet")
+
+        services.refresh_call_rollups()
+        response = self.client.get(
+            reverse("home:analytics"),
+            {"dimension": "pick_up_status", "day_after": "2024-05-02"},
+        )
+        self.assertEqual(
+            [funnel.value for funnel in response.context["funnels"]],
+            ["voicemail", "yes"],
+        )
+        self.assertEqual(response.context["totals"].calls, 2)
+        self.assertEqual(response.context["totals"].picked_up_percent, 50)
+        self.assertContains(response, "day_after=2024-05-02")
+
+        response = self.client.get(reverse("home:analytics"), {"dimension": "note"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestNormalizePhonesCA(UnittestTestCase):
+    def test_normalize_phones(self):
+        phones = ["(416) 555-1234", "1-416-555-1234", "416.555.1234", None, "555-1234"]
+        self.assertEqual(
+            services.normalize_phones_ca(phones),
+            ["+14165551234", "+14165551234", "+14165551234", None, None],
+        )
+
+    def test_normalize_phone_matches_vectorized(self):
+        for phone in ["(416) 555-1234", "+1 604 555 0000", "12345", None]:
+            self.assertEqual(
+                services.normalize_phone_ca(phone),
+                services.normalize_phones_ca([phone])[0],
+            )
+
+
+class PhoneLookupTest(DjangoTestCase):
+    def test_import_drops_differently_formatted_duplicates(self):
+        rows = [
+            {"Name": "Cafe", "Website": None, "Phone": "(416) 555-1234"},
+            {"Name": "Cafe", "Website": None, "Phone": "416-555-1234"},
+        ]
+        for row in rows:
+            row.update(Address=None, Link=None)
+
+        result = services.import_prospects_from_rows(rows, industry="Cafe")
+
+        self.assertEqual(result.rows_inserted, 1)
+        self.assertEqual(result.rows_skipped, 1)
+        self.assertEqual(Prospect.objects.get().phone_e164, "+14165551234")
+
+    def test_lookup_returns_prospect_card(self):
+        Prospect.objects.create(
+            business_name="Test Business",
+            industry="Retail",
+            phone_number="416-555-1234",
+        )
+
+        response = self.client.get(
+            reverse("home:prospects-lookup"), {"phone": "+1 (416) 555 1234"}
+        )
+
+        self.assertContains(response, "Test Business")
+
+    def test_lookup_without_match(self):
+        response = self.client.get(
+            reverse("home:prospects-lookup"), {"phone": "416-555-0000"}
+        )
+
+        self.assertContains(response, "No prospect")
+
+    def test_backfill_skips_duplicates(self):
+        Prospect.objects.bulk_create(
+            [
+                Prospect(industry="Retail", phone_number="(416) 555-1234"),
+                Prospect(industry="Retail", phone_number="416-555-1234"),
+                Prospect(industry="Retail", phone_number="604-555-0000"),
+            ]
+        )
+
+        filled_count, duplicate_count = services.backfill_phone_e164(batch_size=2)
+
+        self.assertEqual((filled_count, duplicate_count), (2, 1))
+        self.assertEqual(
+            set(Prospect.objects.values_list("phone_e164", flat=True)),
+            {"+14165551234", "+16045550000", None},
+        )
+
+        # the duplicate can still be saved, and keeps no E.164 phone number
+        duplicate = Prospect.objects.get(phone_e164=None)
+        duplicate.business_name = "Cafe"
+        duplicate.save()
+        duplicate.phone_number = "(604) 555-0000"
+        duplicate.save()
+        duplicate.refresh_from_db()
+        self.assertIsNone(duplicate.phone_e164)
+
+    def test_migration_fills_phones_skipping_duplicates(self):
+        migration = importlib.import_module("home.migrations.0004_prospect_phone_e164")
+        Prospect.objects.bulk_create(
+            [
+                Prospect(industry="Retail", phone_number="(416) 555-1234"),
+                Prospect(industry="Retail", phone_number="416-555-1234"),
+                Prospect(industry="Retail", phone_number="604-555-0000"),
+                Prospect(industry="Retail", phone_number="555-0000"),
+            ]
+        )
+
+        migration.fill_phones_e164(apps, None)
+
+        self.assertEqual(
+            list(Prospect.objects.order_by("pk").values_list("phone_e164", flat=True)),
+            ["+14165551234", None, "+16045550000", None],
+        )
+
+    def test_admin_rejects_duplicate_phone_number(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "admin")
+        self.client.force_login(user)
+        Prospect.objects.create(industry="Retail", phone_number="416-555-1234")
+        prospect = Prospect.objects.create(
+            industry="Retail", phone_number="604-555-0000"
+        )
+
+        response = self.client.post(
+            reverse("admin:home_prospect_change", args=[prospect.pk]),
+            {
+                "industry": "Retail",
+                "phone_number": "(416) 555-1234",
+                "existence_status": Prospect.ExistenceChoices.UNKNOWN,
+                "coldcallrecord_set-TOTAL_FORMS": 0,
+                "coldcallrecord_set-INITIAL_FORMS": 0,
+            },
+        )
+
+        self.assertContains(response, "Another prospect has the same phone number.")
+        prospect.refresh_from_db()
+        self.assertEqual(prospect.phone_e164, "+16045550000")
+
+
+class ImportProspectsFromFileTest(DjangoTestCase):
+    rows = pd.DataFrame(
+        [
+            ["Cafe One", None, "416-555-0001", "1 King St W, Toronto, ON", "Extra"],
+            ["Cafe Two", None, "416-555-0002", None, "Extra"],
+        ],
+        columns=[*services.YELLOW_PAGES_CA_COLUMNS[:-1], "Category"],
+    ).assign(Link=None)
+
+    def test_import_csv(self):
+        file = SimpleUploadedFile("export.csv", self.rows.to_csv(index=False).encode())
+
+        result = services.import_prospects_from_file(file, industry="Cafe")
+
+        self.assertEqual(result.rows_inserted, 2)
+        prospect = Prospect.objects.get(phone_number="416-555-0001")
+        self.assertEqual(prospect.city, "Toronto")
+        self.assertIsNone(Prospect.objects.get(phone_number="416-555-0002").city)
+
+    def test_import_records_run(self):
+        content = self.rows.to_csv(index=False).encode()
+        file = SimpleUploadedFile("export.csv", content)
+
+        services.import_prospects_from_file(file, industry="Cafe")
+
+        run = ImportRun.objects.get()
+        self.assertEqual(run.source, "csv")
+        self.assertEqual(run.file_name, "export.csv")
+        self.assertEqual(run.file_size, len(content))
+        self.assertEqual(run.rows_read, 2)
+        self.assertEqual(run.rows_inserted, 2)
+        self.assertGreater(run.write_seconds, 0)
+        self.assertGreaterEqual(
+            run.total_seconds,
+            sum(getattr(run, f"{stage}_seconds") for stage in ImportRun.STAGES),
+        )
+        self.assertIsNone(run.error)
+
+    def test_failed_import_records_run(self):
+        file = SimpleUploadedFile("export.csv", b"Name,Phone\nCafe,416-555-0001\n")
+
+        with self.assertRaises(ValueError):
+            services.import_prospects_from_file(file, industry="Cafe")
+
+        run = ImportRun.objects.get()
+        self.assertEqual(run.error, "CSV columns are not correct")
+        self.assertEqual(run.rows_read, 0)
+
+    def test_import_parquet(self):
+        parquet_io = BytesIO()
+        self.rows.to_parquet(parquet_io, index=False)
+        file = SimpleUploadedFile("export.parquet", parquet_io.getvalue())
+
+        result = services.import_prospects_from_file(file, industry="Cafe")
+
+        self.assertEqual(result.rows_inserted, 2)
+        self.assertEqual(
+            Prospect.objects.get(phone_number="416-555-0001").province, "ON"
+        )
+
+    def test_import_csv_with_incorrect_columns(self):
+        file = SimpleUploadedFile("export.csv", b"Name,Phone\nCafe,416-555-0001\n")
+
+        with self.assertRaises(ValueError):
+            services.import_prospects_from_file(file, industry="Cafe")
+
+    def test_import_unsupported_file(self):
+        file = SimpleUploadedFile("export.pdf", b"")
+
+        with self.assertRaises(ValueError):
+            services.import_prospects_from_file(file, industry="Cafe")
+
+
+class ImportProspectsFromHtmlTest(DjangoTestCase):
+    def test_import_pasted_html(self):
+        with open("home/business_data_extractor/yellow_pages_ca.html") as file:
+            html = file.read()
+
+        response = self.client.post(
+            reverse("home:prospects-import-html"),
+            {"html": html, "industry": "Child Care"},
+        )
+
+        self.assertRedirects(response, reverse("home:prospects-list"))
+        prospect = Prospect.objects.get(phone_number="204-989-4106")
+        self.assertEqual(prospect.business_name, "YMCA")
+        self.assertEqual(prospect.website_url, "http://ymca.ca/")
+        self.assertEqual(prospect.city, "Winnipeg")
+        self.assertEqual(prospect.province, "MB")
+        self.assertEqual(prospect.industry, "Child Care")
+
+    def test_parsing_and_normalization_share_one_pool(self):
+        with open("home/business_data_extractor/yellow_pages_ca.html") as file:
+            html = file.read()
+
+        with (
+            mock.patch(
+                "home.services.ProcessPoolExecutor", wraps=ProcessPoolExecutor
+            ) as import_pool,
+            mock.patch(
+                "home.business_data_extractor.extractor.ProcessPoolExecutor"
+            ) as parsing_pool,
+        ):
+            result = services.import_prospects_from_html(
+                [html, html], industry="Child Care", workers=2
+            )
+
+        self.assertEqual(import_pool.call_count, 1)
+        parsing_pool.assert_not_called()
+        self.assertEqual(result.rows_read, 2 * len(extract_data(html)))
+        self.assertTrue(Prospect.objects.filter(phone_number="204-989-4106").exists())
+
+
+class ImportBenchmarkTest(DjangoTestCase):
+    def test_benchmark_rolls_back_imports(self):
+        rows = benchmark.generate_yellow_pages_rows(50)
+
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ["export.xlsx", "export.csv"]:
+                path = Path(directory) / name
+                benchmark.write_yellow_pages_export(rows, path)
+
+                result = benchmark.benchmark_import(path)
+
+                self.assertEqual(result["rows"], 50)
+                self.assertLess(result["rows_imported"], 50)
+                self.assertEqual(list(result["stages"]), benchmark.STAGES)
+        self.assertFalse(Prospect.objects.exists())
+
+    def test_generated_rows_are_reproducible(self):
+        self.assertEqual(
+            benchmark.generate_yellow_pages_rows(20, seed=1),
+            benchmark.generate_yellow_pages_rows(20, seed=1),
+        )
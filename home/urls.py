@@ -1,12 +1,14 @@
-from django.urls import path
+from django.urls import include, path
 
-from . import views
+from . import api, views
 
 app_name = "home"
 
 urlpatterns = [
     path("", views.home, name="home"),
     path("call-records/", views.call_records_list, name="call-records"),
+    path("analytics/", views.analytics, name="analytics"),
+    path("call-records/export", views.call_records_export, name="call-records-export"),
     path("call-records/create", views.call_record_create, name="call-records-create"),
     path(
         "call-records/delete-all",
@@ -14,6 +16,24 @@ urlpatterns = [
         name="call-records-delete-all",
     ),
     path("prospects/", views.prospects_list, name="prospects-list"),
+    path("prospects/cards", views.prospects_cards, name="prospects-cards"),
+    path("prospects/stats", views.prospects_stats, name="prospects-stats"),
+    path("prospects/count", views.prospects_count, name="prospects-count"),
+    path("prospects/<int:prospect_id>/card", views.prospect_card, name="prospect-card"),
+    path(
+        "prospects/export/<str:file_type>",
+        views.prospects_export,
+        name="prospects-export",
+    ),
+    path("prospects/lookup", views.prospects_lookup, name="prospects-lookup"),
+    path("prospects/search", views.prospects_search, name="prospects-search"),
+    path("dialer/", views.dialer, name="dialer"),
+    path("dialer/next", views.dialer_next, name="dialer-next"),
+    path(
+        "prospects/existence-status",
+        views.prospects_existence_status_update,
+        name="prospects-existence-status-update",
+    ),
     path(
         "prospects/delete-all", views.prospects_delete_all, name="prospects-delete-all"
     ),
@@ -22,11 +42,30 @@ urlpatterns = [
         views.prospects_import_excel,
         name="prospects-import-excel",
     ),
+    path(
+        "prospects/import-html",
+        views.prospects_import_html,
+        name="prospects-import-html",
+    ),
+    path("imports/<int:job_id>", views.import_job_detail, name="import-job-detail"),
+    path(
+        "imports/<int:job_id>/progress",
+        views.import_job_progress,
+        name="import-job-progress",
+    ),
+    path("purges/<int:job_id>", views.purge_job_detail, name="purge-job-detail"),
+    path(
+        "purges/<int:job_id>/progress",
+        views.purge_job_progress,
+        name="purge-job-progress",
+    ),
     path(
         "prospects/<int:prospect_id>/add-call",
         views.prospects__call_record_create,
         name="prospects--call-record-create",
     ),
+    # REST API
+    path("api/", include(api.router.urls)),
     # HTMX
     path("htmx/<str:action>", views.htmx_test, name="htmx"),
 ]
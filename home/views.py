@@ -1,72 +1,300 @@
+import asyncio
 import datetime
 import datetime as dt
+import tempfile
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Exists, OuterRef
-from django.http import HttpResponseBadRequest
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    StreamingHttpResponse,
+)
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.http import require_POST
 
-from . import filters, services
-from .forms import CallRecordForm, ImportXlsxForm
-from .models import ColdCallRecord, Prospect
+from . import exports, filters, services
+from .forms import CallRecordForm, ImportProspectsForm, YellowPagesCaHtmlForm
+from .models import (
+    CallDailyRollup,
+    CallRollupWatermark,
+    ColdCallRecord,
+    ImportJob,
+    Prospect,
+    PurgeJob,
+)
+from .pagination import KeysetPaginator, cursor_query, filters_query
 
 
 def home(request):
     return render(request, "home/home.html")
 
 
-def prospects_list(request):
-    prospects = Prospect.objects.prefetch_related("coldcallrecord_set").annotate(
-        called=Exists(ColdCallRecord.objects.filter(prospect_id=OuterRef("pk"))),
-        conversation=Exists(
-            ColdCallRecord.objects.filter(
-                prospect_id=OuterRef("pk"), had_owner_conversation=True
-            )
+async def prospects_list(request):
+    prospects_filter = filters.ProspectsFilter(
+        request.GET, queryset=services.prospects_with_call_status()
+    )
+    cards_context, stats_context = await asyncio.gather(
+        prospect_cards_context(request, prospects_filter),
+        prospects_stats_context(),
+    )
+    context = {
+        **cards_context,
+        **stats_context,
+        "prospects_filter": prospects_filter,
+        "filters_query": filters_query(request.GET),
+    }
+    # the flashed messages may be read from the session, sync only
+    return await sync_to_async(render)(request, "home/prospects.html", context)
+
+
+async def prospects_cards(request):
+    prospects_filter = filters.ProspectsFilter(
+        request.GET, queryset=services.prospects_with_call_status()
+    )
+    context = await prospect_cards_context(request, prospects_filter)
+    return render(request, "home/htmx/prospect_cards.html", context)
+
+
+async def prospects_stats(request):
+    context = await prospects_stats_context()
+    return render(request, "home/htmx/prospects_stats.html", context)
+
+
+async def prospects_count(request):
+    prospects_filter = filters.ProspectsFilter(
+        request.GET, queryset=services.prospects_with_call_status()
+    )
+    prospects_filtered_count = await services.acached_prospects_count(
+        prospects_filter.qs, filters=prospects_filter.form.cleaned_data
+    )
+    context = {"prospects_filtered_count": prospects_filtered_count}
+    return render(request, "home/htmx/prospects_count.html", context)
+
+
+async def prospect_card(request, prospect_id):
+    prospect = await aget_object_or_404(
+        services.prospects_with_call_status(), id=prospect_id
+    )
+    context = {"prospect": prospect, **prospect_card_context()}
+    return render(request, "home/htmx/prospect_card.html", context)
+
+
+async def prospect_cards_context(request, prospects_filter) -> dict:
+    """
+    Returns the context of a page of prospect cards, shared by the
+    prospects page and the cards fragment loaded while scrolling.
+    """
+    paginator = KeysetPaginator(prospects_filter.qs, 10, ordering="pk")
+    prospects_paginated = await paginator.aget_page(request.GET.get("cursor"))
+    # the page to return to after a call, the same for every card
+    list_url = reverse("home:prospects-list")
+    if query := filters_query(request.GET):
+        list_url += "?" + query
+    return {
+        "prospects_paginated": prospects_paginated,
+        "next_page_query": cursor_query(request.GET, prospects_paginated.next_cursor),
+        "previous_page_query": cursor_query(
+            request.GET, prospects_paginated.previous_cursor
+        ),
+        **prospect_card_context(list_url),
+    }
+
+
+def prospect_card_context(next_url: str | None = None) -> dict:
+    """
+    Returns the context `_prospect_card.html` needs besides the prospect.
+
+    Args:
+        next_url (str | None): Where to return after making a call,
+            the prospects list by default.
+    """
+    return {
+        "call_next_query": urlencode(
+            {"next": next_url or reverse("home:prospects-list")}
         ),
+        "card_cache_timeout": settings.PROSPECT_CARD_CACHE_TIMEOUT,
+    }
+
+
+async def prospects_stats_context() -> dict:
+    """
+    Returns the context of the prospects page header. The filtered
+    prospects are counted by `prospects_count` when asked for, as an exact
+    count scans every matching prospect.
+    """
+    return {
+        "stats": await services.aget_dashboard_stats(),
+        "local_times": services.get_city_local_times(),
+    }
+
+
+def prospects_export(request, file_type: str):
+    if file_type not in exports.EXPORT_CONTENT_TYPES:
+        return HttpResponseBadRequest(f"Not a csv, xlsx or parquet export: {file_type}")
+
+    prospects_filter = filters.ProspectsFilter(
+        request.GET, queryset=Prospect.objects.all()
     )
+    file_name = f"prospects.{file_type}"
+    headers = {"Content-Disposition": f'attachment; filename="{file_name}"'}
+    if file_type == "csv":
+        return StreamingHttpResponse(
+            exports.aiter_prospects_csv(prospects_filter.qs),
+            content_type=exports.EXPORT_CONTENT_TYPES[file_type],
+            headers=headers,
+        )
 
-    prospects_filter = filters.ProspectsFilter(request.GET, queryset=prospects)
+    # xlsx and parquet files are only complete once closed, they are written
+    # to a temporary file first, then streamed from it in blocks
+    file = tempfile.TemporaryFile()
+    exports.write_prospects(prospects_filter.qs, file_type, file)
+    headers["Content-Length"] = str(file.tell())
+    file.seek(0)
+    return StreamingHttpResponse(
+        exports.aiter_file(file, settings.PROSPECTS_EXPORT_FILE_BLOCK_SIZE),
+        content_type=exports.EXPORT_CONTENT_TYPES[file_type],
+        headers=headers,
+    )
+
+
+async def prospects_lookup(request):
+    phone = request.GET.get("phone")
+    if not phone:
+        return HttpResponseBadRequest("phone is not in query param")
 
-    paginator = Paginator(prospects_filter.qs, 10)
-    page_number = request.GET.get("page")
-    prospects_paginated = paginator.get_page(page_number)
     context = {
-        "prospects_paginated": prospects_paginated,
+        "prospect": await services.afind_prospect_by_phone(phone),
+        **prospect_card_context(),
+    }
+    return render(request, "home/htmx/prospect_lookup.html", context)
+
+
+async def prospects_search(request):
+    query = request.GET.get("q", "")
+    prospects = (
+        await services.asearch_prospects(query) if len(query.strip()) >= 2 else []
+    )
+    context = {"prospects": prospects, "query": query}
+    return render(request, "home/htmx/prospect_search.html", context)
+
+
+async def dialer(request):
+    prospects_filter = filters.ProspectsFilter(request.GET)
+    context = {
         "prospects_filter": prospects_filter,
-        "prospects_filtered_count": prospects_filter.qs.count(),
-        "outcome_no_count": services.calls_outcome_no_count(),
-        "total_calls_count": services.calls_total_count(),
-        "calls_today": services.calls_today_count(),
-        "prospects_total_count": services.prospects_total_count(),
-        "local_times": services.get_city_local_times(),
+        "caller": await request.session.aget("dialer_caller", ""),
+        "provinces_in_calling_hours": services.provinces_in_calling_hours(),
     }
-    return render(request, "home/prospects.html", context)
+    return render(request, "home/dialer.html", context)
+
+
+@require_POST
+def dialer_next(request):
+    caller = request.POST.get("caller", "").strip()
+    if not caller:
+        return HttpResponseBadRequest("caller is not in form data")
+    request.session["dialer_caller"] = caller
+
+    prospects_filter = filters.ProspectsFilter(
+        request.POST, queryset=services.prospects_with_call_status()
+    )
+    prospect = services.claim_next_prospect(caller, prospects=prospects_filter.qs)
+    context = {"prospect": prospect, **prospect_card_context(reverse("home:dialer"))}
+    return render(request, "home/htmx/dialer_prospect.html", context)
+
+
+@require_POST
+def prospects_existence_status_update(request):
+    """
+    Sets the existence status of many prospects, from `prospect_id` and
+    `existence_status` form values paired in order. A single
+    `existence_status` applies to every prospect.
+    """
+    prospect_ids = request.POST.getlist("prospect_id")
+    existence_statuses = request.POST.getlist("existence_status")
+    if len(existence_statuses) == 1:
+        existence_statuses *= len(prospect_ids)
+    if not prospect_ids or len(prospect_ids) != len(existence_statuses):
+        return HttpResponseBadRequest(
+            "prospect_id and existence_status are not paired in form data"
+        )
+
+    try:
+        updated = services.update_existence_statuses(
+            dict(zip(map(int, prospect_ids), existence_statuses))
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+
+    context = {"updated": updated}
+    return render(request, "home/htmx/existence_status_updated.html", context)
 
 
 def prospects_delete_all(request):
-    Prospect.objects.all().delete()
-    return redirect("home:prospects-list")
+    purge_job = PurgeJob.objects.create(
+        target=PurgeJob.TargetChoices.PROSPECTS,
+        archive=bool(request.GET.get("archive")),
+    )
+    messages.success(request, "Prospects deletion started")
+    return redirect("home:purge-job-detail", job_id=purge_job.id)
 
 
 def prospects_import_excel(request):
     if request.method == "POST":
-        import_excel_form = ImportXlsxForm(request.POST, request.FILES)
-        if import_excel_form.is_valid():
-            industry = import_excel_form.cleaned_data["industry"]
-            excel_file = request.FILES["excel_file"]
-            services.import_prospects_from_excel(
-                excel_file=excel_file, industry=industry
+        import_form = ImportProspectsForm(request.POST, request.FILES)
+        if import_form.is_valid():
+            import_job = ImportJob.objects.create(
+                file=import_form.cleaned_data["file"],
+                industry=import_form.cleaned_data["industry"],
             )
-            messages.success(request, "Prospects imported")
-            return redirect("home:prospects-list")
+            messages.success(request, "Prospects import started")
+            return redirect("home:import-job-detail", job_id=import_job.id)
     else:
-        import_excel_form = ImportXlsxForm()
+        import_form = ImportProspectsForm()
 
-    context = {"import_excel_form": import_excel_form}
+    context = {"import_form": import_form}
     return render(request, "home/prospects_import_excel.html", context)
 
 
+def prospects_import_html(request):
+    if request.method == "POST":
+        html_form = YellowPagesCaHtmlForm(request.POST)
+        if html_form.is_valid():
+            result = services.import_prospects_from_html(
+                [html_form.cleaned_data["html"]],
+                industry=html_form.cleaned_data["industry"],
+                workers=1,
+            )
+            messages.success(
+                request,
+                f"Prospects imported: {result.rows_inserted} new, "
+                f"{result.rows_updated} updated",
+            )
+            return redirect("home:prospects-list")
+    else:
+        html_form = YellowPagesCaHtmlForm()
+
+    context = {"html_form": html_form}
+    return render(request, "home/prospects_import_html.html", context)
+
+
+async def import_job_detail(request, job_id):
+    import_job = await aget_object_or_404(ImportJob, id=job_id)
+    context = {"import_job": import_job}
+    # the flashed messages may be read from the session, sync only
+    return await sync_to_async(render)(request, "home/import_job.html", context)
+
+
+async def import_job_progress(request, job_id):
+    import_job = await aget_object_or_404(ImportJob, id=job_id)
+    context = {"import_job": import_job}
+    return render(request, "home/htmx/import_job_progress.html", context)
+
+
 def prospects__call_record_create(request, prospect_id):
     prospect = get_object_or_404(Prospect, id=prospect_id)
 
@@ -93,12 +321,67 @@ def prospects__call_record_create(request, prospect_id):
     )
 
 
-def call_records_list(request):
-    call_records = ColdCallRecord.objects.all()
-    context = {"call_records": call_records}
+async def call_records_list(request):
+    call_records_filter = filters.CallRecordsFilter(
+        request.GET, queryset=ColdCallRecord.objects.select_related("prospect")
+    )
+
+    # pk follows the order calls are logged in, and is unique for the cursor
+    paginator = KeysetPaginator(call_records_filter.qs, 50, ordering="-pk")
+    call_records_paginated = await paginator.aget_page(request.GET.get("cursor"))
+    context = {
+        "call_records_paginated": call_records_paginated,
+        "next_page_query": cursor_query(
+            request.GET, call_records_paginated.next_cursor
+        ),
+        "previous_page_query": cursor_query(
+            request.GET, call_records_paginated.previous_cursor
+        ),
+        "filters_query": filters_query(request.GET),
+        "call_records_filter": call_records_filter,
+    }
     return render(request, "home/call_records.html", context)
 
 
+async def analytics(request):
+    dimension = request.GET.get("dimension", "opening")
+    if dimension not in CallDailyRollup.DIMENSIONS:
+        return HttpResponseBadRequest(f"Not a call dimension: {dimension}")
+    call_rollups_filter = filters.CallRollupsFilter(
+        request.GET, queryset=CallDailyRollup.objects.all()
+    )
+    rollups = call_rollups_filter.qs
+    funnels, totals, watermark = await asyncio.gather(
+        sync_to_async(list)(services.call_funnels_queryset(rollups, dimension)),
+        rollups.aaggregate(**services.call_funnel_sums()),
+        CallRollupWatermark.objects.filter(
+            name=services.CALL_ROLLUP_WATERMARK
+        ).afirst(),
+    )
+    context = {
+        "dimension": dimension,
+        "dimensions": CallDailyRollup.DIMENSIONS,
+        "funnels": [services.CallFunnel(**funnel) for funnel in funnels],
+        "totals": services.CallFunnel(value="", **totals),
+        "refreshed_at": watermark.refreshed_at if watermark else None,
+        # the dates, kept when switching dimension
+        "filters_query": filters_query(request.GET, "dimension"),
+        "call_rollups_filter": call_rollups_filter,
+    }
+    return render(request, "home/analytics.html", context)
+
+
+def call_records_export(request):
+    call_records_filter = filters.CallRecordsFilter(
+        request.GET, queryset=ColdCallRecord.objects.all()
+    )
+    return StreamingHttpResponse(
+        services.aiter_call_records_csv(call_records_filter.qs),
+        content_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="call_records.csv"'},
+    )
+
+
 def call_record_create(request):
     if request.method == "POST":
         call_record_form = CallRecordForm(request.POST)
@@ -131,8 +414,25 @@ def call_record_create(request):
 
 
 def call_records_delete_all(request):
-    ColdCallRecord.objects.all().delete()
-    return redirect("home:call-records")
+    purge_job = PurgeJob.objects.create(
+        target=PurgeJob.TargetChoices.CALL_RECORDS,
+        archive=bool(request.GET.get("archive")),
+    )
+    messages.success(request, "Calls deletion started")
+    return redirect("home:purge-job-detail", job_id=purge_job.id)
+
+
+async def purge_job_detail(request, job_id):
+    purge_job = await aget_object_or_404(PurgeJob, id=job_id)
+    context = {"purge_job": purge_job}
+    # the flashed messages may be read from the session, sync only
+    return await sync_to_async(render)(request, "home/purge_job.html", context)
+
+
+async def purge_job_progress(request, job_id):
+    purge_job = await aget_object_or_404(PurgeJob, id=job_id)
+    context = {"purge_job": purge_job}
+    return render(request, "home/htmx/purge_job_progress.html", context)
 
 
 def htmx_test(request, action: str):
@@ -145,10 +445,14 @@ def htmx_test(request, action: str):
             if not prospect_id:
                 return HttpResponseBadRequest("prospect_id is not in query param")
 
-            prospect = Prospect.objects.get(id=prospect_id)
-            prospect.existence_status = existence_status
-            prospect.full_clean()
-            prospect.save()
+            try:
+                updated = services.update_existence_statuses(
+                    {int(prospect_id): existence_status}
+                )
+            except ValueError as error:
+                return HttpResponseBadRequest(str(error))
+            if not updated:
+                raise Http404("Prospect not found")
 
             context = {"existence_status": existence_status}
             return render(request, "home/htmx/test.html", context)